@@ -51,15 +51,36 @@ class RootAgent(Agent):
             if "compliance" in task_text:
                 context.logger.warning("⚠️ Possible legal compliance issue. Review suggested.")
 
+            # Quality audit happens in the background; the caller only waits for the run record
+            run_id, reflection = self.record_run(context, route, task_text, output, meta)
+
             context.complete({
                 "agent": route,
                 "output": output,
-                "reason": reason
+                "reason": reason,
+                "run_id": run_id,
+                "reflection": reflection
             })
         except Exception as e:
             context.logger.error(f"❌ Error routing to agent: {e}")
             context.complete({"error": str(e), "agent": route})
 
+    def record_run(self, context, route, task_text, output, meta):
+        """Store the run and queue it for background reflection (meta: reflect, reflection_priority,
+        reflection_sample_rate). Returns (run_id, reflection status)."""
+        from utils.reflection_queue import get_reflection_queue, get_run_store
+        from agents.reflective_agent import reflect_on_output
+
+        run_id = get_run_store().record(route, task_text, output)
+        if route == "reflective_agent" or not meta.get("reflect", True):
+            return run_id, "none"
+        status = get_reflection_queue(reflect_on_output).submit(
+            run_id, route, output, context.llm,
+            priority=meta.get("reflection_priority"),
+            sample_rate=meta.get("reflection_sample_rate")
+        )
+        return run_id, status
+
     def decide_route(self, task: str, meta: Optional[Dict[str, Any]] = None) -> (Optional[str], str):
         task = task.lower()
         meta = meta or {}
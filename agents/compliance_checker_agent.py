@@ -31,7 +31,17 @@ class ComplianceCheckerAgent(Agent):
         file_metadata = None
         if files and len(files) > 0:
             file_path = files[0]
-            result = load_data(file_path)
+            result = load_data(file_path, chunk_size=10000)
+            if 'error' not in result:
+                # The whole text is analyzed, so it is all kept; chunks are rendered one at a
+                # time, which only avoids a second copy of the file as one large DataFrame.
+                # Read errors (PDF/image extraction, unsupported content) surface here.
+                try:
+                    file_text = '\n'.join(
+                        chunk.to_string(index=False, header=i == 0) for i, chunk in enumerate(result['data'])
+                    )
+                except Exception as e:
+                    result['error'] = str(e)
             if 'error' in result:
                 context.complete({
                     "status": "failed",
@@ -41,7 +51,6 @@ class ComplianceCheckerAgent(Agent):
                     "elapsed_sec": round(time.time() - start_time, 3)
                 })
                 return
-            file_text = result['data'].to_string(index=False) if hasattr(result['data'], 'to_string') else str(result['data'])
             file_metadata = result.get('metadata')
             content = file_text
 
@@ -63,7 +72,7 @@ class ComplianceCheckerAgent(Agent):
         def split_sections(text):
             # Split by paragraphs or headings (customize as needed)
             import re
-            sections = re.split(r'\n{2,}|(?m)^#+ ', text)
+            sections = re.split(r'\n{2,}|^#+ ', text, flags=re.M)
             return [s.strip() for s in sections if s.strip()]
 
         llm = getattr(context, 'llm', None)
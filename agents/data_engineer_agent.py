@@ -1,9 +1,45 @@
 from adk_local import RuntimeContext
 from adk_local import Agent  # optionally alias Agent if needed
 
+import asyncio
 import pandas as pd
 import time
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
+
+
+# DataFrame -> DataFrame steps (or -> (DataFrame, info) to report extra stats);
+# a pipeline chains them over one frame (or one chunk at a time)
+def clean_frame(df: pd.DataFrame, subset=None) -> pd.DataFrame:
+    return df.dropna(subset=subset)
+
+
+def preprocess_frame(df: pd.DataFrame) -> pd.DataFrame:
+    from utils.dtype_optimizer import normalize_categories
+    text_columns = df.select_dtypes(include=["object", "string"]).columns
+    cleaned = {col: df[col].str.lower().str.strip() for col in text_columns}
+    # Categoricals are cleaned once per distinct value, not once per row
+    cleaned.update({col: normalize_categories(df[col]) for col in df.select_dtypes(include=["category"]).columns})
+    return df.assign(**cleaned)
+
+
+def optimize_frame(df: pd.DataFrame, **options):
+    from utils.dtype_optimizer import optimize_dtypes
+    return optimize_dtypes(df, **options)  # (frame, memory report)
+
+
+def process_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Example feature engineering; widen first so a downcast count column cannot overflow
+    incidents = df["incident_count"].astype("int64") if "incident_count" in df else 0
+    return df.assign(risk_score=incidents * 2)
+
+
+PIPELINE_STEPS = {
+    "clean": clean_frame,
+    "preprocess": preprocess_frame,
+    "process": process_frame,
+    "optimize": optimize_frame,
+}
+
 
 class DataEngineerAgent(Agent):
     def __init__(self):
@@ -16,17 +52,32 @@ class DataEngineerAgent(Agent):
     async def run(self, context: RuntimeContext) -> None:
         task = context.task
         context.logger.info(f"[DataEngineerAgent] Task received: {task}")
+        pipeline = task.get("pipeline")
         step = task.get("step", "").lower()
         raw_data = task.get("data", None)
 
-        if not step:
-            context.complete({"error": "Missing 'step'. Choose from: collect, clean, process, preprocess."})
+        if not step and not pipeline:
+            context.complete({"error": "Missing 'step' or 'pipeline'. Choose from: collect, clean, process, preprocess."})
             return
 
         try:
             if step == "collect":
-                result = self.collect_data()
-            elif step == "clean":
+                result = await self.collect_data(task)
+                context.complete({"status": "success", "step": step, "result": result})
+                return
+
+            # {"pipeline": ["clean", "preprocess", {"step": "process"}], "data": ..., "chunk_size": 50000,
+            #  "result_format": "json" | "arrow" (in-process handle) | "arrow_ipc" (memory-mapped file)}
+            # Put "optimize" first to shrink repetitive text columns before the other steps.
+            if pipeline:
+                df, report = self.run_pipeline(raw_data, pipeline, chunk_size=task.get("chunk_size"))
+                start = time.perf_counter()
+                result = self._materialize(df, task.get("result_format", "json"))
+                report["materialize_sec"] = round(time.perf_counter() - start, 4)
+                context.complete({"status": "success", "pipeline": report, "result": result})
+                return
+
+            if step == "clean":
                 result = self.clean_data(raw_data)
             elif step == "preprocess":
                 result = self.preprocess_data(raw_data)
@@ -40,26 +91,114 @@ class DataEngineerAgent(Agent):
             context.logger.error(f"[DataEngineerAgent] Error: {e}")
             context.complete({"status": "error", "message": str(e)})
 
-    def collect_data(self) -> str:
-        time.sleep(1)
-        return "📥 Simulated collection of raw safety logs, sensor files, and CSVs."
+    def run_pipeline(self, data: Any, steps: List[Union[str, Dict]], chunk_size=None):
+        """Run every step over one loaded frame and return (frame, report).
+
+        Steps are names from PIPELINE_STEPS or {"step": name, **kwargs}. With chunk_size
+        the input is streamed and each chunk passes through all steps before the next is
+        read; the processed chunks are concatenated once at the end.
+        """
+        from utils.dtype_optimizer import concat_frames
+        specs = []
+        for spec in steps:
+            spec = {"step": spec} if isinstance(spec, str) else dict(spec)
+            name = spec.pop("step", "").lower()
+            if name not in PIPELINE_STEPS:
+                raise ValueError(f"Unknown pipeline step: {name}. Choose from: {', '.join(PIPELINE_STEPS)}")
+            specs.append((name, PIPELINE_STEPS[name], spec))
+
+        stats = [{"step": name, "rows_in": 0, "rows_out": 0, "seconds": 0.0} for name, _, _ in specs]
+        start = time.perf_counter()
+        load_sec = 0.0
+        outputs = []
+        frames = self._iter_frames(data, chunk_size)
+        while True:
+            t = time.perf_counter()
+            df = next(frames, None)
+            load_sec += time.perf_counter() - t
+            if df is None:
+                break
+            for stat, (_, fn, kwargs) in zip(stats, specs):
+                stat["rows_in"] += len(df)
+                t = time.perf_counter()
+                df = fn(df, **kwargs)
+                if isinstance(df, tuple):
+                    df, info = df
+                    stat.setdefault("info", []).append(info)
+                stat["seconds"] += time.perf_counter() - t
+                stat["rows_out"] += len(df)
+            outputs.append(df)
+
+        # Chunks' categoricals are given one shared dtype so the concatenation keeps them
+        df = concat_frames(outputs) if outputs else pd.DataFrame()
+        for stat in stats:
+            stat["seconds"] = round(stat["seconds"], 4)
+        report = {
+            "steps": stats,
+            "chunks": len(outputs),
+            "rows": len(df),
+            "load_sec": round(load_sec, 4),
+            "total_sec": round(time.perf_counter() - start, 4),
+        }
+        return df, report
+
+    async def collect_data(self, task: Dict = None) -> Dict:
+        """Load new or changed files from the collection directories and run the pipeline on them.
+
+        Task keys: dirs (default COLLECT_DIRS), concurrency, force, pipeline (default
+        clean -> preprocess), result_format. Each file's frame is one pipeline chunk;
+        files with different columns are unioned in the output. Files are marked as
+        collected only after the pipeline succeeded, so a failed run picks them up again.
+        """
+        from utils.data_collection import collect
+        task = task or {}
+        frames, stats, manifest = await collect(
+            dirs=task.get("dirs"),
+            concurrency=task.get("concurrency", 4),
+            force=task.get("force", False),
+            optimize=task.get("optimize", False)
+        )
+        output = {"collection": stats, "files": [
+            {"path": path, "rows": len(df), "columns": list(df.columns)} for path, df in frames
+        ]}
+        if frames:
+            df, report = self.run_pipeline([df for _, df in frames], task.get("pipeline", ["clean", "preprocess"]))
+            output["pipeline"] = report
+            output["result"] = self._materialize(df, task.get("result_format", "json"))
+            await asyncio.to_thread(manifest.save)
+        return output
 
     def clean_data(self, data: Union[Dict, str]) -> str:
-        df = self._load_data(data)
-        df.dropna(inplace=True)
-        return df.to_json(orient="records")
+        return self.run_pipeline(data, ["clean"])[0].to_json(orient="records")
 
     def preprocess_data(self, data: Union[Dict, str]) -> str:
-        df = self._load_data(data)
-        for col in df.select_dtypes(include=["object"]).columns:
-            df[col] = df[col].str.lower().str.strip()
-        return df.to_json(orient="records")
+        return self.run_pipeline(data, ["preprocess"])[0].to_json(orient="records")
 
     def process_data(self, data: Union[Dict, str]) -> str:
-        df = self._load_data(data)
-        df["risk_score"] = df.get("incident_count", 0) * 2  # Example feature engineering
+        return self.run_pipeline(data, ["process"])[0].to_json(orient="records")
+
+    def _materialize(self, df, result_format="json"):
+        if result_format in ("arrow", "arrow_ipc"):
+            from utils.arrow_exchange import share
+            return share(df, cross_process=result_format == "arrow_ipc")
         return df.to_json(orient="records")
 
+    def _iter_frames(self, data, chunk_size=None):
+        # In-memory records/frames/Arrow handles are used as-is; file names go through the loader
+        from utils.arrow_exchange import is_arrow_ref, to_frame
+        if isinstance(data, pd.DataFrame):
+            yield data
+        elif isinstance(data, list) and data and all(isinstance(d, pd.DataFrame) for d in data):
+            yield from data  # already-loaded frames, e.g. from collect_data
+        elif is_arrow_ref(data) or hasattr(data, "to_pandas"):
+            yield to_frame(data)
+        elif isinstance(data, (list, dict)):
+            yield pd.DataFrame(data)
+        elif chunk_size:
+            yield from self._load_data(data, chunk_size=chunk_size)
+        else:
+            yield self._load_data(data)
+
     def _load_data(self, data, columns=None, sheet_name=None, chunk_size=None):
         from utils.advanced_data_loader import load_data
         result = load_data(data, columns=columns, sheet_name=sheet_name, chunk_size=chunk_size)
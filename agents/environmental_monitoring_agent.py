@@ -2,6 +2,23 @@ from adk_local import RuntimeContext
 from adk_local import Agent  # optionally alias Agent if needed
 
 from datetime import datetime
+import numpy as np
+import os
+import threading
+import time
+
+from utils.environmental_alerts import AlertTracker
+from utils.environmental_batch import evaluate_block, summarize_block
+from utils.environmental_store import get_environmental_store
+from utils.environmental_stream import StreamingMonitor
+from utils.sensor_gateway import SensorGateway
+
+# Shared across agent instances so rolling windows and alert states survive between routed calls
+_stream_monitor = None
+_alert_tracker = None
+# Guards both: gateway batches update them on a worker thread while tasks run on the loop
+_state_lock = threading.RLock()
+ALERT_STATE_PATH = os.getenv("ENV_ALERT_STATE_PATH", "data/env_alerts.state")
 
 class EnvironmentalMonitoringAgent(Agent):
     def __init__(self):
@@ -20,8 +37,61 @@ class EnvironmentalMonitoringAgent(Agent):
             "humidity_%": 90
         }
 
+    @property
+    def stream(self):
+        global _stream_monitor
+        with _state_lock:
+            if _stream_monitor is None:
+                _stream_monitor = StreamingMonitor(self.thresholds, alerts=self.alerts)
+            return _stream_monitor
+
+    @property
+    def alerts(self):
+        global _alert_tracker
+        with _state_lock:
+            if _alert_tracker is None:
+                _alert_tracker = AlertTracker(self.thresholds)
+                # Restore open alerts so a restarted worker does not re-raise them
+                _alert_tracker.load(ALERT_STATE_PATH)
+            return _alert_tracker
+
+    def save_alert_state(self):
+        os.makedirs(os.path.dirname(ALERT_STATE_PATH) or ".", exist_ok=True)
+        with _state_lock:
+            self.alerts.save(ALERT_STATE_PATH)
+
+    @property
+    def store(self):
+        return get_environmental_store()
+
+    def ingest(self, site, sensor, readings, ts=None):
+        # Streaming entry point: one snapshot per call, breach events returned incrementally
+        # Safe from the gateway's worker thread: the store locks itself, the monitor is locked here
+        ts = time.time() if ts is None else ts
+        self.store.append(site, sensor, readings, ts)
+        with _state_lock:
+            return self.stream.ingest(site, sensor, readings, ts)
+
+    async def start_gateway(self, host="127.0.0.1", tcp_port=9009, udp_port=None, queue_size=10000,
+                            policy="block", on_events=None):
+        # Direct sensor ingestion over TCP/UDP, bypassing per-snapshot task routing; alert
+        # state is persisted after every batch, as run_stream does after every task
+        gateway = SensorGateway(self.ingest, list(self.thresholds), queue_size=queue_size,
+                                policy=policy, on_events=on_events, flush=self.store.flush,
+                                after_batch=self.save_alert_state)
+        return await gateway.start(host=host, tcp_port=tcp_port, udp_port=udp_port)
+
     async def run(self, context: RuntimeContext) -> None:
         task = context.task
+        if task.get("mode") == "stream":
+            await self.run_stream(context)
+            return
+        if task.get("mode") == "batch":
+            await self.run_batch(context)
+            return
+        if task.get("mode") == "history":
+            await self.run_history(context)
+            return
         sensor_data = task.get("sensor_data", {})
 
         # Required parameters for robust monitoring
@@ -74,6 +144,20 @@ class EnvironmentalMonitoringAgent(Agent):
         if extra_params:
             recommendations.append(f"Unexpected parameters reported: {extra_params}. Check configuration.")
 
+        # Known sensors get history and deduplicated alerts; anonymous snapshots are checked as-is
+        alert_events = None
+        if task.get("site"):
+            now = time.time()
+            try:
+                # Buffered; the store writes in batches (by size or age), not per snapshot
+                self.store.append(task["site"], task.get("sensor", "default"), sensor_data, now)
+            except ValueError as e:
+                context.complete({"status": "failed", "reason": str(e)})
+                return
+            with _state_lock:
+                alert_events = self.alerts.update_many(task["site"], task.get("sensor", "default"), sensor_data, now)
+            self.save_alert_state()
+
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         report = {
             "timestamp": timestamp,
@@ -88,8 +172,15 @@ class EnvironmentalMonitoringAgent(Agent):
             "compliant": len(violations) == 0 and not missing_params and not faulty_params
         }
         report["rules_summary"] = self.rules_summary()
+        if alert_events is not None:
+            report["alert_events"] = alert_events
 
-        if violations or missing_params or faulty_params:
+        if alert_events is not None and not missing_params and not faulty_params:
+            # Only alert transitions are worth a log line; a sensor stuck over threshold stays quiet
+            for event in alert_events:
+                log = context.logger.warning if event["level"] == "violation" else context.logger.info
+                log(f"🚨 Alert {event['type']}: {event['parameter']} = {event['value']} ({event['level']}) at {event['site']}/{event['sensor']}")
+        elif violations or missing_params or faulty_params:
             context.logger.warning(f"🚨 Environmental issues detected: Violations: {violations}, Missing: {missing_params}, Faulty: {faulty_params}")
         elif pre_warnings:
             context.logger.info(f"⚠️ Pre-warning: {pre_warnings}")
@@ -101,6 +192,110 @@ class EnvironmentalMonitoringAgent(Agent):
             "report": report
         })
 
+    async def run_stream(self, context: RuntimeContext) -> None:
+        task = context.task
+        readings = task.get("readings", [])
+        if not readings:
+            context.complete({"status": "failed", "reason": "No streaming readings provided."})
+            return
+
+        events = []
+        touched = set()
+        try:
+            for reading in readings:
+                site = reading.get("site", "default")
+                sensor = reading.get("sensor", "default")
+                events.extend(self.ingest(site, sensor, reading.get("sensor_data", {}), reading.get("ts")))
+                touched.add((site, sensor))
+        except ValueError as e:
+            context.complete({"status": "failed", "reason": str(e)})
+            return
+
+        self.save_alert_state()
+        for event in events:
+            if event["type"] in ("raised", "escalated", "realert") and event["level"] == "violation" \
+                    or event["type"] in ("faulty", "twa_breach"):
+                event["recommendation"] = self.recommend_action(event["parameter"], event["value"])
+                context.logger.warning(f"🚨 {event['type']} at {event['site']}/{event['sensor']}: {event['parameter']} = {event['value']}")
+
+        context.complete({
+            "status": "success",
+            "mode": "stream",
+            "readings_ingested": len(readings),
+            "events": events,
+            "metrics": self._metrics(touched)
+        })
+
+    def _metrics(self, sensors):
+        with _state_lock:
+            return {f"{site}/{sensor}": self.stream.metrics(site, sensor) for site, sensor in sensors}
+
+    def evaluate_batch(self, values, parameters=None, sites=None, sensors=None, timestamps=None, max_flagged=1000):
+        # Columnar entry point: values shaped (site, sensor, parameter, time), NaN = missing
+        parameters = parameters or list(self.thresholds.keys())
+        # JSON tasks send nested lists; summarize_block indexes by tuple, so convert once here
+        values = np.asarray(values, dtype=float)
+        status = evaluate_block(values, parameters, self.thresholds)
+        return summarize_block(values, status, parameters, self.thresholds, recommend=self.recommend_action,
+                               sites=sites, sensors=sensors, timestamps=timestamps, max_flagged=max_flagged)
+
+    async def run_batch(self, context: RuntimeContext) -> None:
+        task = context.task
+        block = task.get("readings_block")
+        if block is None:
+            context.complete({"status": "failed", "reason": "No readings_block provided."})
+            return
+        try:
+            summary = self.evaluate_batch(
+                block,
+                parameters=task.get("parameters"),
+                sites=task.get("sites"),
+                sensors=task.get("sensors"),
+                timestamps=task.get("timestamps"),
+                max_flagged=task.get("max_flagged", 1000),
+            )
+        except (ValueError, TypeError) as e:
+            context.complete({"status": "failed", "reason": str(e)})
+            return
+
+        if summary["flagged_count"]:
+            context.logger.warning(f"🚨 Environmental issues detected in batch: {summary['flagged_count']} of {summary['readings']} readings flagged.")
+        else:
+            context.logger.info("✅ All environmental parameters are within safe limits.")
+        context.complete({"status": "success", "mode": "batch", "report": summary})
+
+    async def run_history(self, context: RuntimeContext) -> None:
+        task = context.task
+        site = task.get("site")
+        if not site:
+            context.complete({"status": "failed", "reason": "No site provided."})
+            return
+        end = task.get("end", time.time())
+        start = task.get("start", end - 3600)
+        resolution = task.get("resolution", "1m")
+        if resolution not in ("raw", "1m", "1h"):
+            context.complete({"status": "failed", "reason": f"Unknown resolution: {resolution}"})
+            return
+
+        sensor = task.get("sensor")
+        parameter = task.get("parameter")
+        try:
+            columns = self.store.query(site, start, end, sensor=sensor, parameter=parameter, resolution=resolution)
+        except ValueError as e:
+            context.complete({"status": "failed", "reason": str(e)})
+            return
+        result = {
+            "status": "success",
+            "mode": "history",
+            "site": site,
+            "resolution": resolution,
+            "rows": len(columns["ts"]),
+            "data": {name: values.tolist() for name, values in columns.items()}
+        }
+        if sensor is not None and parameter is not None:
+            result["twa_8h"] = self.store.twa(site, sensor, parameter, end=end)
+        context.complete(result)
+
     def recommend_action(self, param, value):
         # Actionable recommendations for each parameter
         actions = {
@@ -120,7 +315,11 @@ class EnvironmentalMonitoringAgent(Agent):
             "Provides actionable recommendations for each violation.",
             "Reports parameter-by-parameter breakdown (value, threshold, status, recommendations).",
             "Warns if required parameters are missing or faulty.",
-            "Flags unexpected parameters in the input."
+            "Flags unexpected parameters in the input.",
+            "Batch mode evaluates a site x sensor x parameter x time block with NumPy masks.",
+            "Persists readings to a columnar store with 1-minute and 1-hour rollups for history queries.",
+            "Alerts per site/sensor/parameter use hysteresis, hold times and re-alert intervals; only transitions are reported.",
+            "Stream mode keeps rolling means and 8-hour TWA per sensor and reports breaches as they happen."
         ]
 
 # Support for ADK CLI
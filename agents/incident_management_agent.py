@@ -4,6 +4,8 @@ from adk_local import Agent  # optionally alias Agent if needed
 import spacy
 from datetime import datetime
 
+from utils.incident_store import get_incident_store
+
 class IncidentManagementAgent(Agent):
     def __init__(self):
         super().__init__(
@@ -22,6 +24,7 @@ class IncidentManagementAgent(Agent):
             "Human error": ["Situational awareness", "Fatigue management"],
             "Unclassified": ["General safety re-orientation"]
         }
+        self.store = get_incident_store()
 
     async def run(self, context: RuntimeContext) -> None:
         task = context.task
@@ -53,8 +56,41 @@ class IncidentManagementAgent(Agent):
             else:
                 field_breakdown[field] = {"present": True, "value": value}
 
+        # Passive/vague language detection
+        vague_terms = ["should", "may", "could", "as appropriate", "if possible", "might"]
+        vague_found = [vt for vt in vague_terms if vt in report_text.lower()]
+        for vt in vague_found:
+            recommendations.append(f"Vague language detected: '{vt}'. Use clear, direct statements.")
+
         if not report_text or len(report_text.strip()) < 20:
             recommendations.append("Incident description is too short or missing. Provide a detailed account.")
+        elif task.get("deduplicate", True):
+            # Same event reported by several people: reuse the earlier analysis instead of
+            # re-running NLP, the LLM and the sub-agents. The checks of this report's own
+            # fields and wording are cheap and always come from this report.
+            duplicate = self.store.find_duplicate(report_text)
+            if duplicate:
+                output = dict(duplicate["result"])
+                output.update({
+                    "status": "success",
+                    "duplicate": True,
+                    "duplicate_of": duplicate["incident_id"],
+                    "duplicate_similarity": duplicate["similarity"],
+                    "report_date": datetime.now().strftime("%Y-%m-%d"),
+                    "location": location,
+                    "reporter": reporter,
+                    "field_breakdown": field_breakdown,
+                    "missing_fields": missing_fields,
+                    "recommendations": list(set(recommendations)),
+                    "vague_language": vague_found,
+                })
+                output["incident_id"] = self.store.add(
+                    report_text, output, location=location, reporter=reporter,
+                    root_cause=output.get("root_cause"), duplicate_of=duplicate["incident_id"]
+                )
+                context.logger.info(f"♻️ Duplicate of incident {duplicate['incident_id']} (similarity {duplicate['similarity']}); reused analysis.")
+                context.complete(output)
+                return
 
         # Advanced NLP: NER, action verbs, and cause-effect extraction
         doc = self.nlp(report_text)
@@ -100,16 +136,13 @@ class IncidentManagementAgent(Agent):
         # Recommend training
         suggested_training = self.training_map.get(root_cause, self.training_map["Unclassified"])
 
-        # Passive/vague language detection
-        vague_terms = ["should", "may", "could", "as appropriate", "if possible", "might"]
-        vague_found = [vt for vt in vague_terms if vt in report_text.lower()]
-        for vt in vague_found:
-            recommendations.append(f"Vague language detected: '{vt}'. Use clear, direct statements.")
-
         # Agent integration: call ComplianceCheckerAgent and RiskAssessmentAgent
         compliance_result = await context.call("ComplianceCheckerAgent", {"input": report_text})
         risk_result = await context.call("RiskAssessmentAgent", {"input": report_text})
 
+        # Past incidents with similar wording, and their root causes
+        similar_incidents = self.store.similar(report_text, k=task.get("similar_k", 5))
+
         # Output
         output = {
             "status": "success",
@@ -130,8 +163,13 @@ class IncidentManagementAgent(Agent):
             "vague_language": vague_found,
             "rules_summary": self.rules_summary(),
             "compliance_analysis": compliance_result,
-            "risk_assessment": risk_result
+            "risk_assessment": risk_result,
+            "similar_incidents": similar_incidents,
+            "duplicate": False
         }
+        output["incident_id"] = self.store.add(
+            report_text, output, location=location, reporter=reporter, root_cause=root_cause
+        )
         context.complete(output)
 
     @staticmethod
@@ -142,7 +180,9 @@ class IncidentManagementAgent(Agent):
             "Performs NLP keyword/root cause extraction.",
             "Builds Fishbone (Ishikawa) structure for root cause analysis.",
             "Suggests corrective/preventive actions and training.",
-            "Provides LLM-enhanced incident analysis."
+            "Provides LLM-enhanced incident analysis.",
+            "Reuses the stored analysis for near-duplicate reports of the same event.",
+            "Lists similar past incidents and their root causes."
         ]
 
     def _identify_root_cause(self, keywords):
@@ -1,19 +1,32 @@
 from adk_local import RuntimeContext
 from adk_local import Agent  # optionally alias Agent if needed
 
-from ultralytics import YOLO
-from PIL import Image
-import base64
-import io
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
+import time
+
+import numpy as np
+
+try:
+    import resource  # peak RSS reporting; not available on Windows
+except ImportError:
+    resource = None
+
+from utils.detector_backends import get_detector
+from utils.image_intake import decode_image, image_size
+from utils.tiling import choose_tile_size, make_tiles, nms
+from utils.video_inspection import FrameDeduplicator, ViolationTracker, dhash, iter_sampled_frames, video_info
 
 # Optional reporting tool (make sure this module exists)
 try:
-    from utils.reporting import generate_inspection_report
+    from utils.reporting import MAX_THUMBNAILS, detection_thumbnails, get_report_service
 except ImportError:
-    generate_inspection_report = None  # If not available, skip PDF generation
+    get_report_service = None  # If not available, skip PDF generation
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
 
-os.makedirs("reports", exist_ok=True)
 
 class InspectionAuditAgent(Agent):
     def __init__(self):
@@ -22,39 +35,51 @@ class InspectionAuditAgent(Agent):
             description="Uses computer vision to detect safety violations in construction site images.",
             model="gemini-2.0-pro"
         )
-        self.model = YOLO("yolov5s.pt")  # Ensure yolov5s.pt is available locally or download automatically
+        # Backend (torch / onnx / openvino, optional INT8) comes from INSPECTION_* environment settings;
+        # yolov5s.pt must be available locally or downloadable for the first export.
+        # The warmed-up model is shared by every agent instance in the process.
+        self.model = get_detector()
 
     async def run(self, context: RuntimeContext) -> None:
         task = context.task
-        image_b64 = task.get("image_base64", "")
+        if task.get("images") or task.get("image_dir"):
+            await self.run_batch(context)
+            return
+        if task.get("video_path"):
+            await self.run_video(context)
+            return
+        # File paths and raw buffers (bytes, memoryview, mmap) skip the base64 round-trip
+        source = next((task[key] for key in ("image_path", "image_bytes", "image", "image_base64") if task.get(key) is not None), None)
 
-        if not image_b64:
+        if source is None or (isinstance(source, (str, bytes)) and not source):
             context.complete({"status": "failed", "reason": "No image provided"})
             return
 
         try:
-            image_bytes = base64.b64decode(image_b64)
-            image = Image.open(io.BytesIO(image_bytes))
-
-            results = self.model(image)
-            labels = results[0].names
-            detailed_violations = []
-            summary_violations = []
-            for box in results[0].boxes:
-                cls_id = int(box.cls)
-                confidence = float(box.conf)
-                label = labels[cls_id]
-                xyxy = box.xyxy[0].tolist() if hasattr(box, 'xyxy') else None
-                detailed_violations.append({
-                    "label": label,
-                    "confidence": confidence,
-                    "bbox": xyxy,
-                    "recommendation": self.recommend_action(label)
-                })
-                summary_violations.append(label)
-
-            if generate_inspection_report:
-                generate_inspection_report([v["label"] for v in detailed_violations], "reports/inspection_report.pdf")
+            image = decode_image(source)
+
+            # Large drone shots are tiled so small PPE is not lost to downscaling
+            tiled = task.get("tiled", "auto")
+            tile_size = task.get("tile_size") or choose_tile_size(*image_size(image))
+            tiling_stats = None
+            if tiled is True or (tiled == "auto" and tile_size):
+                detailed_violations, tiling_stats = self.inspect_tiled(
+                    image, tile_size=tile_size, overlap=task.get("tile_overlap", 0.2),
+                    batch_size=task.get("batch_size", 8)
+                )
+            else:
+                results = self.model(image)
+                detailed_violations = self._detections(results[0])
+            summary_violations = [v["label"] for v in detailed_violations]
+
+            # Rendering happens on the report service's worker; the response carries a handle
+            report = None
+            if get_report_service:
+                report = get_report_service().submit(
+                    [f"{v['label']} ({v['confidence']:.2f}): {v['recommendation']}" for v in detailed_violations]
+                    or ["No violations detected."],
+                    thumbnails=detection_thumbnails(image, detailed_violations)
+                )
 
             # Call Compliance, Risk, and Incident agents with a summary of violations
             summary_text = ", ".join(summary_violations) if summary_violations else "No violations detected."
@@ -70,6 +95,8 @@ class InspectionAuditAgent(Agent):
                 "compliance_analysis": compliance_result,
                 "risk_assessment": risk_result,
                 "incident_analysis": incident_result,
+                "tiling": tiling_stats,
+                "report": report,
                 "rules_summary": self.rules_summary()
             })
 
@@ -80,6 +107,295 @@ class InspectionAuditAgent(Agent):
                 "message": str(e)
             })
 
+    async def run_batch(self, context: RuntimeContext) -> None:
+        task = context.task
+        try:
+            sources = task.get("images") or self._list_images(task["image_dir"])
+        except OSError as e:
+            context.complete({"status": "failed", "reason": f"Could not list images: {e}"})
+            return
+        if not sources:
+            context.complete({"status": "failed", "reason": "No images found"})
+            return
+
+        try:
+            thumbnails = [] if get_report_service else None
+            per_image = await self.inspect_batch(
+                sources,
+                batch_size=task.get("batch_size", 16),
+                decode_workers=task.get("decode_workers"),
+                thumbnails=thumbnails,
+            )
+            aggregate = self._aggregate(per_image)
+
+            report = None
+            if get_report_service:
+                report = get_report_service().submit(aggregate["summary_lines"] or ["No violations detected."],
+                                                     title="Site Inspection Report (batch)",
+                                                     thumbnails=thumbnails)
+
+            # Downstream agents run once on the site-level aggregate, not once per image
+            summary_text = aggregate["summary_text"]
+            compliance_result = await context.call("ComplianceCheckerAgent", {"input": summary_text})
+            risk_result = await context.call("RiskAssessmentAgent", {"input": summary_text})
+            incident_result = await context.call("IncidentManagementAgent", {"incident_description": summary_text})
+
+            context.logger.info(f"✅ Batch vision analysis complete: {len(per_image)} images.")
+            context.complete({
+                "status": "success",
+                "images": per_image,
+                "site_summary": aggregate,
+                "compliance_analysis": compliance_result,
+                "risk_assessment": risk_result,
+                "incident_analysis": incident_result,
+                "report": report,
+                "rules_summary": self.rules_summary()
+            })
+        except Exception as e:
+            context.logger.error(f"Error in batch image processing: {e}")
+            context.complete({
+                "status": "error",
+                "message": str(e)
+            })
+
+    async def run_video(self, context: RuntimeContext) -> None:
+        task = context.task
+        video_path = task["video_path"]
+        if not os.path.exists(video_path):
+            context.complete({"status": "failed", "reason": f"Video not found: {video_path}"})
+            return
+
+        try:
+            thumbnails = [] if get_report_service else None
+            result = await self.inspect_video(
+                video_path,
+                sample_fps=task.get("sample_fps", 1.0),
+                hash_distance=task.get("hash_distance", 6),
+                batch_size=task.get("batch_size", 16),
+                thumbnails=thumbnails,
+            )
+            tracks = result["tracked_violations"]
+            label_counts = Counter(t["label"] for t in tracks)
+            summary_lines = [f"{label}: {count} tracked in video" for label, count in label_counts.most_common()]
+            summary_text = "; ".join(summary_lines) if summary_lines else "No violations detected."
+
+            report = None
+            if get_report_service:
+                report = get_report_service().submit(summary_lines or ["No violations detected."],
+                                                     title="Site Inspection Report (video)",
+                                                     thumbnails=thumbnails)
+
+            compliance_result = await context.call("ComplianceCheckerAgent", {"input": summary_text})
+            risk_result = await context.call("RiskAssessmentAgent", {"input": summary_text})
+            incident_result = await context.call("IncidentManagementAgent", {"incident_description": summary_text})
+
+            context.logger.info(
+                f"✅ Video analysis complete: {result['frames_analyzed']} frames analyzed, "
+                f"{result['frames_skipped']} skipped as near-duplicates."
+            )
+            context.complete({
+                "status": "success",
+                **result,
+                "summary_violations": summary_lines,
+                "compliance_analysis": compliance_result,
+                "risk_assessment": risk_result,
+                "incident_analysis": incident_result,
+                "report": report,
+                "rules_summary": self.rules_summary()
+            })
+        except Exception as e:
+            context.logger.error(f"Error in video processing: {e}")
+            context.complete({
+                "status": "error",
+                "message": str(e)
+            })
+
+    async def inspect_video(self, video_path, sample_fps=1.0, hash_distance=6, batch_size=16, thumbnails=None):
+        # Only frames whose perceptual hash differs from every analyzed frame reach the model.
+        # With a `thumbnails` list, each new track's first crop is appended to it for the report.
+        dedupe = FrameDeduplicator(max_distance=hash_distance)
+        tracker = ViolationTracker()
+        sampled = skipped = analyzed = 0
+        batch = []
+
+        async def flush():
+            nonlocal analyzed
+            outputs = await asyncio.to_thread(self.model, [frame for _, _, frame in batch], device="cpu", verbose=False)
+            for (index, ts, frame), output in zip(batch, outputs):
+                known = len(tracker.tracks)
+                tracker.update(index, ts, self._detections(output))
+                if thumbnails is not None and len(thumbnails) < MAX_THUMBNAILS:
+                    new = [{"label": t["label"], "confidence": t["max_confidence"], "bbox": t["bbox"]}
+                           for t in tracker.tracks[known:]]
+                    thumbnails.extend(detection_thumbnails(frame, new, limit=MAX_THUMBNAILS - len(thumbnails)))
+            analyzed += len(batch)
+            batch.clear()
+
+        for index, ts, frame in iter_sampled_frames(video_path, sample_fps):
+            sampled += 1
+            frame_hash = dhash(frame)
+            if not dedupe.is_new(frame_hash):
+                skipped += 1
+                continue
+            dedupe.add(frame_hash)
+            batch.append((index, ts, frame))
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+
+        return {
+            "video": video_info(video_path),
+            "frames_sampled": sampled,
+            "frames_analyzed": analyzed,
+            "frames_skipped": skipped,
+            "tracked_violations": tracker.tracks,
+        }
+
+    async def inspect_batch(self, sources, batch_size=16, decode_workers=None, thumbnails=None):
+        # Decode in a thread pool while the previous batch is on the model; YOLO gets
+        # whole batches instead of one image per call. With a `thumbnails` list, detection
+        # crops are appended to it (up to MAX_THUMBNAILS) while the images are in memory.
+        results = []
+        chunks = [sources[i:i + batch_size] for i in range(0, len(sources), batch_size)]
+        with ThreadPoolExecutor(max_workers=decode_workers or os.cpu_count()) as pool:
+            pending = [pool.submit(self._decode_image, src) for src in chunks[0]]
+            for n, chunk in enumerate(chunks):
+                decoded = []
+                for src, future in zip(chunk, pending):
+                    try:
+                        decoded.append((src, future.result(), None))
+                    except Exception as e:
+                        decoded.append((src, None, str(e)))
+                if n + 1 < len(chunks):
+                    pending = [pool.submit(self._decode_image, src) for src in chunks[n + 1]]
+
+                images = [image for _, image, _ in decoded if image is not None]
+                outputs = iter(await asyncio.to_thread(self.model, images, device="cpu", verbose=False)) if images else iter(())
+                for src, image, error in decoded:
+                    entry = {"source": src if isinstance(src, str) and len(src) < 512 else f"image_{len(results)}"}
+                    if error:
+                        entry.update({"status": "error", "message": error, "detections": []})
+                    else:
+                        entry.update({"status": "success", "detections": self._detections(next(outputs))})
+                        if thumbnails is not None and len(thumbnails) < MAX_THUMBNAILS:
+                            thumbnails.extend(detection_thumbnails(image, entry["detections"],
+                                                                   limit=MAX_THUMBNAILS - len(thumbnails)))
+                    results.append(entry)
+        return results
+
+    def inspect_tiled(self, image, tile_size=None, overlap=0.2, batch_size=8, include_full=True,
+                      merge_threshold=0.5):
+        # Overlapping tiles are batched through the model; tile boxes are shifted back to
+        # image coordinates and merged across tile borders with NMS. A full-image pass
+        # keeps large objects that no single tile contains.
+        start = time.perf_counter()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+        pixels = decode_image(image)  # BGR array; a no-op for already-decoded input
+        width, height = image_size(pixels)
+        tile_size = tile_size or choose_tile_size(width, height) or max(width, height)
+        windows = make_tiles(width, height, tile_size, overlap)
+
+        boxes, scores, classes, names = [], [], [], {}
+        tile_buffer_bytes = 0
+
+        def collect(result, x0, y0):
+            names.update(result.names)
+            for box in result.boxes:
+                x1, y1, x2, y2 = box.xyxy[0].tolist()
+                boxes.append([x1 + x0, y1 + y0, x2 + x0, y2 + y0])
+                scores.append(float(box.conf))
+                classes.append(int(box.cls))
+
+        for i in range(0, len(windows), batch_size):
+            chunk = windows[i:i + batch_size]
+            tiles = [np.ascontiguousarray(pixels[y0:y1, x0:x1]) for x0, y0, x1, y1 in chunk]
+            tile_buffer_bytes = max(tile_buffer_bytes, sum(t.nbytes for t in tiles))
+            for (x0, y0, _, _), result in zip(chunk, self.model(tiles, device="cpu", verbose=False)):
+                collect(result, x0, y0)
+        if include_full and len(windows) > 1:
+            collect(self.model(pixels, device="cpu", verbose=False)[0], 0, 0)
+
+        keep = nms(boxes, scores, classes, threshold=merge_threshold)
+        detections = [{
+            "label": names[classes[k]],
+            "confidence": scores[k],
+            "bbox": boxes[k],
+            "recommendation": self.recommend_action(names[classes[k]])
+        } for k in keep]
+
+        elapsed = time.perf_counter() - start
+        megapixels = width * height / 1e6
+        stats = {
+            "image_size": [width, height],
+            "megapixels": round(megapixels, 2),
+            "tile_size": tile_size,
+            "tiles": len(windows),
+            "raw_detections": len(boxes),
+            "merged_detections": len(detections),
+            "latency_sec": round(elapsed, 3),
+            "ms_per_megapixel": round(elapsed * 1000 / megapixels, 1) if megapixels else None,
+            "tile_buffer_mb": round(tile_buffer_bytes / 2**20, 1),
+            "tile_buffer_mb_per_megapixel": round(tile_buffer_bytes / 2**20 / megapixels, 2) if megapixels else None,
+        }
+        if resource:
+            # ru_maxrss is in KiB on Linux; growth of the peak during this call
+            stats["peak_rss_growth_mb"] = round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1)
+        return detections, stats
+
+    @staticmethod
+    def _list_images(directory):
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+
+    @staticmethod
+    def _decode_image(source):
+        # Accepts a file path, raw buffer or base64 string
+        return decode_image(source)
+
+    def _detections(self, result):
+        labels = result.names
+        detections = []
+        for box in result.boxes:
+            cls_id = int(box.cls)
+            label = labels[cls_id]
+            detections.append({
+                "label": label,
+                "confidence": float(box.conf),
+                "bbox": box.xyxy[0].tolist() if hasattr(box, 'xyxy') else None,
+                "recommendation": self.recommend_action(label)
+            })
+        return detections
+
+    def _aggregate(self, per_image):
+        label_counts = Counter()
+        images_per_label = Counter()
+        max_confidence = {}
+        for entry in per_image:
+            labels = [d["label"] for d in entry["detections"]]
+            label_counts.update(labels)
+            images_per_label.update(set(labels))
+            for d in entry["detections"]:
+                max_confidence[d["label"]] = max(max_confidence.get(d["label"], 0.0), d["confidence"])
+        n_images = len(per_image)
+        summary_lines = [
+            f"{label}: {count} detections in {images_per_label[label]} of {n_images} images"
+            for label, count in label_counts.most_common()
+        ]
+        return {
+            "images_total": n_images,
+            "images_failed": sum(1 for e in per_image if e["status"] != "success"),
+            "images_with_detections": sum(1 for e in per_image if e["detections"]),
+            "label_counts": dict(label_counts),
+            "images_per_label": dict(images_per_label),
+            "max_confidence": max_confidence,
+            "recommendations": {label: self.recommend_action(label) for label in label_counts},
+            "summary_lines": summary_lines,
+            "summary_text": "; ".join(summary_lines) if summary_lines else "No violations detected."
+        }
+
     @staticmethod
     def recommend_action(label):
         # Map label to recommended action
@@ -102,7 +418,10 @@ class InspectionAuditAgent(Agent):
             "Detects safety violations in images using YOLO.",
             "Outputs bounding box, label, confidence, and recommended action for each detection.",
             "Calls ComplianceCheckerAgent, RiskAssessmentAgent, and IncidentManagementAgent with detected violations.",
-            "Aggregates and reports all results for explainability."
+            "Aggregates and reports all results for explainability.",
+            "Images larger than the model input are tiled with overlap and merged across borders with NMS.",
+            "Video mode samples frames, skips near-duplicates by perceptual hash and tracks violations across frames.",
+            "Batch mode runs YOLO over image lists or directories in batches and calls downstream agents once per site."
         ]
 
 # ADK CLI support
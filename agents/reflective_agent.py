@@ -1,6 +1,21 @@
 from google.adk import Agent
 
 
+async def reflect_on_output(original_agent, original_output, llm) -> str:
+    """One reflection; used inline by ReflectiveAgent and by the background reflection queue."""
+    prompt = (
+        f"You are an expert auditor and reflective analyst.\n"
+        f"Review the output from the agent named '{original_agent}'. Assess:\n"
+        "- Was the output logically structured?\n"
+        "- Did it fully address the input task?\n"
+        "- Are there any missing assumptions, biases, or risks?\n"
+        "- Suggest one improvement or clarification.\n\n"
+        f"Output to reflect on:\n{original_output}"
+    )
+    result = await llm.complete(prompt)
+    return result.text.strip()
+
+
 class ReflectiveAgent(Agent):
     def __init__(self):
         super().__init__(
@@ -12,9 +27,10 @@ class ReflectiveAgent(Agent):
     async def run(self, context) -> None:
         task = context.task
         # Advanced loader
-        from utils.advanced_data_loader import load_data
+        from utils.advanced_data_loader import load_preview
         if isinstance(task, str):
-            result = load_data(task)
+            # Only the first rows are read, however large the file is
+            result = load_preview(task)
             if 'error' in result:
                 context.complete({'error': result['error']})
                 return
@@ -32,6 +48,21 @@ class ReflectiveAgent(Agent):
                 context.logger.info(f"Loaded CSV for reflection: {file_path}, shape: {df.shape}")
                 context.complete({"csv_preview": df.head().to_dict()})
                 return
+        # Reflections queued by RootAgent are read back from the run record
+        if task.get("run_id") and not task.get("output"):
+            from utils.reflection_queue import get_run_store
+            record = get_run_store().get(task["run_id"])
+            if record is None:
+                context.complete({"status": "failed", "reason": f"Unknown run_id: {task['run_id']}"})
+                return
+            context.complete({
+                "status": "success",
+                "run_id": record["run_id"],
+                "agent_reviewed": record["agent"],
+                "reflection_status": record["reflection_status"],
+                "reflection": record["reflection"]
+            })
+            return
         original_agent = task.get("source_agent", "")
         original_output = task.get("output", "")
 
@@ -45,18 +76,7 @@ class ReflectiveAgent(Agent):
 
         context.logger.info(f"🔎 Reflecting on output from {original_agent}...")
 
-        prompt = (
-            f"You are an expert auditor and reflective analyst.\n"
-            f"Review the output from the agent named '{original_agent}'. Assess:\n"
-            "- Was the output logically structured?\n"
-            "- Did it fully address the input task?\n"
-            "- Are there any missing assumptions, biases, or risks?\n"
-            "- Suggest one improvement or clarification.\n\n"
-            f"Output to reflect on:\n{original_output}"
-        )
-
-        result = await context.llm.complete(prompt)
-        reflection = result.text.strip()
+        reflection = await reflect_on_output(original_agent, original_output, context.llm)
 
         context.logger.info("🪞 Reflection complete.")
         context.complete({
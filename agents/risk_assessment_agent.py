@@ -9,7 +9,7 @@ import time
 import asyncio
 
 from utils.logger import logger
-from utils.advanced_data_loader import load_data
+from utils.advanced_data_loader import load_preview
 
 class RiskAssessmentAgent(BaseAgent):
     def __init__(self):
@@ -46,7 +46,7 @@ class RiskAssessmentAgent(BaseAgent):
 
         if file_path:
             try:
-                result = load_data(file_path)
+                result = load_preview(file_path)
                 elapsed = round(time.time() - start_time, 3)
                 if 'error' in result:
                     logger.error(f"File load failed: {result['error']}")
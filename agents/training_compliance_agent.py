@@ -1,8 +1,6 @@
 from google.adk import Agent
 
-from datetime import datetime
-import sqlite3
-import os
+from utils.training_db import get_training_store
 
 class TrainingComplianceAgent(Agent):
     def __init__(self):
@@ -12,29 +10,16 @@ class TrainingComplianceAgent(Agent):
             model="gemini-2.0-pro"
         )
         self.db_path = "data/training.db"
-        os.makedirs("data", exist_ok=True)
-        self._init_db()
-
-    def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS training_records (
-                    worker_id TEXT,
-                    name TEXT,
-                    role TEXT,
-                    cert_type TEXT,
-                    issued_date TEXT,
-                    expiry_date TEXT
-                )
-            """)
-            conn.commit()
+        # Shared pooled connections; schema and indexes are created once per process
+        self.store = get_training_store(self.db_path)
 
     async def run(self, context) -> None:
         task = context.task
         # Advanced loader
-        from utils.advanced_data_loader import load_data
+        from utils.advanced_data_loader import load_preview
         if isinstance(task, str):
-            result = load_data(task)
+            # Only the first rows are read, however large the file is
+            result = load_preview(task)
             if 'error' in result:
                 context.complete({'error': result['error']})
                 return
@@ -52,6 +37,47 @@ class TrainingComplianceAgent(Agent):
                 context.logger.info(f"Loaded CSV for training compliance: {file_path}, shape: {df.shape}")
                 context.complete({"csv_preview": df.head().to_dict()})
                 return
+        # Bulk HR import: {"import_file": "hr_export.xlsx", "column_map": {...}}
+        if task.get("import_file"):
+            import asyncio
+            from utils.training_import import import_training_records
+
+            def log_progress(stats):
+                context.logger.info(
+                    f"Imported {stats['rows_read']} rows ({stats['rows_per_sec']} rows/s), "
+                    f"{stats['rows_rejected']} rejected"
+                )
+
+            try:
+                stats = await asyncio.to_thread(
+                    import_training_records,
+                    task["import_file"],
+                    db_path=self.db_path,
+                    chunk_size=task.get("chunk_size", 50000),
+                    column_map=task.get("column_map"),
+                    sheet_name=task.get("sheet_name"),
+                    on_progress=log_progress
+                )
+            except (FileNotFoundError, ValueError) as e:
+                context.complete({"status": "failed", "reason": str(e)})
+                return
+            context.complete({"status": "success", "import": stats})
+            return
+        # Supervisor dashboards: {"expiring_within_days": 30, "site": ..., "role": ...}
+        if task.get("expiring_within_days") is not None:
+            from utils.expiry_calendar import get_expiry_calendar
+            calendar = get_expiry_calendar(self.db_path)
+            days = task["expiring_within_days"]
+            context.complete({
+                "status": "success",
+                "days": days,
+                "site": task.get("site"),
+                "role": task.get("role"),
+                "expiring_count": calendar.count(days, site=task.get("site"), role=task.get("role")),
+                "expiring": calendar.expiring(days, site=task.get("site"), role=task.get("role"),
+                                              limit=task.get("page_size", 100))
+            })
+            return
         role = task.get("role")
         experience = task.get("experience_years", 0)
         gaps = task.get("skill_gaps", [])
@@ -78,19 +104,24 @@ class TrainingComplianceAgent(Agent):
 
         recommended = list(recommended)
 
-        # 2. Check Expiring Certifications
-        expired = []
-        with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute("""
-                SELECT name, cert_type, expiry_date FROM training_records
-                WHERE expiry_date < ?
-            """, (datetime.now().strftime("%Y-%m-%d"),)).fetchall()
-            for row in rows:
-                expired.append({
-                    "name": row[0],
-                    "certification": row[1],
-                    "expired_on": row[2]
-                })
+        # 2. Check Expired Certifications for this role (optionally one site or worker), one page
+        try:
+            records, next_cursor = self.store.expired_certifications(
+                role=role,
+                site=task.get("site"),
+                worker_id=task.get("worker_id"),
+                limit=task.get("page_size", 100),
+                cursor=task.get("cursor")
+            )
+        except ValueError as e:
+            context.complete({"status": "failed", "reason": str(e)})
+            return
+        expired = [{
+            "worker_id": r["worker_id"],
+            "name": r["name"],
+            "certification": r["cert_type"],
+            "expired_on": r["expiry_date"]
+        } for r in records]
 
         # 3. Summary to share with LearningAnalyticsAgent
         summary = {
@@ -117,6 +148,7 @@ class TrainingComplianceAgent(Agent):
             "role": role,
             "recommended_training": recommended,
             "expired_certifications": expired,
+            "next_cursor": next_cursor,
             "learning_insights": insights
         })
 
@@ -11,29 +11,35 @@ class TranslationAgent(Agent):
 
     async def run(self, context) -> None:
         content = context.input
-        # Advanced loader
+        languages = None
+        if isinstance(content, dict):
+            languages = content.get("languages")
+            content = content.get("file") or content.get("text")
+        llm = context.llm if hasattr(context.llm, 'complete') else None
+        # Advanced loader: translate the first column, each distinct row once
         from utils.advanced_data_loader import load_data
+        from utils.translation_memory import normalize_segment, translate_segments
         if isinstance(content, str):
-            result = load_data(content)
-            if 'error' in result:
-                context.complete({'error': result['error']})
-                return
-            df = result['data']
-            context.logger.info(f"Loaded file for translation: {content}, shape: {df.shape}")
-            translated = df.iloc[:,0].apply(lambda x: f"[translated] {x}")
-            context.complete({"translated": translated.tolist(), "metadata": result.get('metadata'), "tables": result.get('tables')})
-            return
-        # CSV support
-        if isinstance(content, str) and content.endswith('.csv'):
-            import os
-            import pandas as pd
-            file_path = os.path.join('data', content) if not os.path.isabs(content) else content
-            if os.path.exists(file_path):
-                df = pd.read_csv(file_path)
-                context.logger.info(f"Loaded CSV for translation: {file_path}, shape: {df.shape}")
-                # Example: translate first column
-                translated = df.iloc[:,0].apply(lambda x: f"[translated] {x}")
-                context.complete({"translated": translated.tolist()})
+            try:
+                result = load_data(content, chunk_size=10000)
+            except FileNotFoundError:
+                result = None  # plain instruction text, handled below
+            if result is not None:
+                if 'error' in result:
+                    context.complete({"status": "failed", "error": result['error']})
+                    return
+                rows = []
+                for df in result['data']:
+                    rows.extend(df.iloc[:,0].astype(str).tolist())
+                context.logger.info(f"Loaded file for translation: {content}, rows: {len(rows)}")
+                translations, stats = await translate_segments(rows, languages, llm=llm)
+                keys = [normalize_segment(row) for row in rows]
+                # One entry per row; rows the model failed on are blank, as in the text branch
+                translated = {
+                    language: [table.get(key, "") for key in keys]
+                    for language, table in translations.items()
+                }
+                context.complete(self._response(translated, stats, result.get('metadata'), result.get('tables')))
                 return
         context.logger.info("[TranslationAgent] Translating construction or operational instruction.")
 
@@ -44,43 +50,31 @@ class TranslationAgent(Agent):
             })
             return
 
-        if hasattr(context.llm, 'complete'):
-            prompt = (
-                "You are a professional translator specializing in translating critical construction and field operations instructions "
-                "into local African and international languages, ensuring clarity, accuracy, and tone suitable for workers on construction sites. "
-                "Translate the following safety or operational instruction into:\n"
-                "- French\n"
-                "- Spanish\n"
-                "- Arabic\n"
-                "- Hausa (Nigeria)\n"
-                "- Yoruba (Nigeria)\n"
-                "- Swahili (East Africa)\n"
-                "- Zulu (South Africa)\n"
-                "- Igbo (Nigeria)\n"
-                "- Portuguese (Mozambique, Angola)\n"
-                "- Amharic (Ethiopia)\n\n"
-                f"Text:\n{content}"
-            )
-            result = await context.llm.complete(prompt)
-            translations = result.text.strip()
-        else:
-            translations = {
-                "French": f"[Stub] French: {content}",
-                "Spanish": f"[Stub] Spanish: {content}",
-                "Arabic": f"[Stub] Arabic: {content}",
-                "Hausa": f"[Stub] Hausa: {content}",
-                "Yoruba": f"[Stub] Yoruba: {content}",
-                "Swahili": f"[Stub] Swahili: {content}",
-                "Zulu": f"[Stub] Zulu: {content}",
-                "Igbo": f"[Stub] Igbo: {content}",
-                "Portuguese": f"[Stub] Portuguese: {content}",
-                "Amharic": f"[Stub] Amharic: {content}"
-            }
+        # Line by line, so repeated toolbox-talk lines come from the translation memory
+        lines = [line for line in str(content).splitlines() if line.strip()]
+        translations, stats = await translate_segments(lines, languages, llm=llm)
+        # Lines the model failed on are left blank and listed in translation_memory["untranslated"]
+        translated = {
+            language: "\n".join(table.get(normalize_segment(line), "") for line in lines)
+            for language, table in translations.items()
+        }
+        context.logger.info(
+            f"[TranslationAgent] {stats['unique_segments']} segments x {stats['languages']} languages, "
+            f"hit rate {stats['hit_rate']}, {stats['prompts']} prompts"
+        )
+
+        context.complete(self._response(translated, stats))
 
-        context.complete({
-            "status": "success",
-            "translations": translations
-        })
+    @staticmethod
+    def _response(translations, stats, metadata=None, tables=None):
+        # Text and file input answer with the same keys; "partial" when any segment failed
+        return {
+            "status": "partial" if stats["failed"] else "success",
+            "translations": translations,
+            "translation_memory": stats,
+            "metadata": metadata,
+            "tables": tables,
+        }
 
 async def run_with_adk(task: dict) -> dict:
     agent = TranslationAgent()
@@ -0,0 +1,59 @@
+# bench_data_cache.py
+# Cold parse versus warm columnar-cache load through utils.advanced_data_loader.load_data.
+# Run from the repository root: python benchmarks/bench_data_cache.py [file.xlsx|file.csv]
+# Without an argument a 200k-row CSV is generated (Excel parsing needs openpyxl).
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+
+def make_sample(path, rows=200_000):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "site": rng.choice(["north", "south", "east", "west"], rows),
+        "hazard": rng.choice(["fall", "electrical", "fire", "noise", "dust"], rows),
+        "likelihood": rng.integers(1, 6, rows),
+        "severity": rng.integers(1, 6, rows),
+        "score": rng.random(rows) * 25,
+        "notes": [f"inspection note {i}" for i in range(rows)],
+    }).to_csv(path, index=False)
+
+
+def best_of(fn, runs=5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp()
+    os.environ["DATA_CACHE_DIR"] = os.path.join(workdir, "cache")
+    from utils.advanced_data_loader import load_data
+    from utils.data_cache import get_data_cache
+
+    if len(sys.argv) > 1:
+        sample = os.path.abspath(sys.argv[1])
+    else:
+        sample = os.path.join(workdir, "risk_register.csv")
+        make_sample(sample)
+    print(f"Sample: {sample} ({os.path.getsize(sample) / 2**20:.1f} MB)")
+
+    cold = best_of(lambda: load_data(sample, use_cache=False))
+    load_data(sample)  # populate
+    warm = best_of(lambda: load_data(sample))
+    projected = best_of(lambda: load_data(sample, columns=["site", "score"]))
+
+    print(f"{'load':<22}{'ms':>9}")
+    print(f"{'parse (no cache)':<22}{cold * 1000:>9.1f}")
+    print(f"{'warm cache':<22}{warm * 1000:>9.1f}   {cold / warm:.1f}x")
+    print(f"{'warm, 2 columns':<22}{projected * 1000:>9.1f}   {cold / projected:.1f}x")
+    print(get_data_cache().stats())
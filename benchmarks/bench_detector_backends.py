@@ -0,0 +1,85 @@
+# bench_detector_backends.py
+# Latency and agreement of exported CPU detector backends against eager PyTorch.
+# Run from the repository root:
+#   python benchmarks/bench_detector_backends.py path/to/images [--backends torch onnx onnx-int8 openvino]
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from utils.detector_backends import load_detector
+from utils.video_inspection import iou
+
+parser = argparse.ArgumentParser()
+parser.add_argument("image_dir")
+parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8", "openvino", "openvino-int8"])
+parser.add_argument("--weights", default="yolov5s.pt")
+parser.add_argument("--repeats", type=int, default=3)
+args = parser.parse_args()
+
+paths = sorted(
+    os.path.join(args.image_dir, n) for n in os.listdir(args.image_dir)
+    if n.lower().endswith((".jpg", ".jpeg", ".png"))
+)
+images = [Image.open(p).convert("RGB") for p in paths]
+print(f"{len(images)} images from {args.image_dir}")
+
+
+def detect(model, image):
+    result = model(image, device="cpu", verbose=False)[0]
+    return [(result.names[int(b.cls)], b.xyxy[0].tolist()) for b in result.boxes]
+
+
+def agreement(reference, candidate):
+    # Greedy label + IoU >= 0.5 matching, with eager PyTorch as ground truth
+    matched = 0
+    unused = list(candidate)
+    for label, box in reference:
+        for other in unused:
+            if other[0] == label and iou(box, other[1]) >= 0.5:
+                unused.remove(other)
+                matched += 1
+                break
+    precision = matched / len(candidate) if candidate else 1.0
+    recall = matched / len(reference) if reference else 1.0
+    return precision, recall
+
+
+reference = None
+print(f"{'backend':<16}{'load s':>8}{'median ms':>11}{'p90 ms':>9}{'precision':>11}{'recall':>8}")
+for name in args.backends:
+    backend, _, suffix = name.partition("-")
+    try:
+        start = time.perf_counter()
+        model = load_detector(backend, weights=args.weights, int8=suffix == "int8")
+        load_sec = time.perf_counter() - start
+    except Exception as e:
+        print(f"{name:<16} unavailable: {e}")
+        continue
+
+    latencies, outputs = [], []
+    for image in images:
+        runs = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            detections = detect(model, image)
+            runs.append((time.perf_counter() - start) * 1000)
+        latencies.append(min(runs))
+        outputs.append(detections)
+    if backend == "torch" and not suffix:
+        reference = outputs
+
+    if reference is not None:
+        scores = [agreement(r, c) for r, c in zip(reference, outputs)]
+        precision = statistics.mean(p for p, _ in scores)
+        recall = statistics.mean(r for _, r in scores)
+        accuracy = f"{precision:>11.3f}{recall:>8.3f}"
+    else:
+        accuracy = f"{'n/a':>11}{'n/a':>8}"
+    p90 = sorted(latencies)[int(0.9 * (len(latencies) - 1))]
+    print(f"{name:<16}{load_sec:>8.1f}{statistics.median(latencies):>11.1f}{p90:>9.1f}{accuracy}")
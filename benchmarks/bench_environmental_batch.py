@@ -0,0 +1,38 @@
+# bench_environmental_batch.py
+# Throughput of vectorized threshold evaluation on a synthetic site x sensor x parameter x time block.
+# Run from the repository root: python benchmarks/bench_environmental_batch.py
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.environmental_batch import evaluate_block, summarize_block
+
+THRESHOLDS = {"PM2.5": 35, "noise_dB": 85, "CO_ppm": 50, "temperature_C": 45, "humidity_%": 90}
+PARAMETERS = list(THRESHOLDS)
+
+# 10 sites x 100 sensors x 5 parameters x 400 samples = 2,000,000 readings
+rng = np.random.default_rng(0)
+limits = np.array([THRESHOLDS[p] for p in PARAMETERS]).reshape(1, 1, -1, 1)
+values = rng.uniform(0, 1.1, size=(10, 100, len(PARAMETERS), 400)) * limits
+values[rng.random(values.shape) < 0.001] = np.nan   # missing
+values[rng.random(values.shape) < 0.0005] = -1      # faulty
+
+evaluate_block(values[:1, :1], PARAMETERS, THRESHOLDS)  # warm-up
+
+runs = 5
+start = time.perf_counter()
+for _ in range(runs):
+    status = evaluate_block(values, PARAMETERS, THRESHOLDS)
+elapsed = (time.perf_counter() - start) / runs
+
+start = time.perf_counter()
+summary = summarize_block(values, status, PARAMETERS, THRESHOLDS)
+summary_elapsed = time.perf_counter() - start
+
+print(f"Readings:            {values.size:,}")
+print(f"Evaluate (masks):    {elapsed * 1000:.1f} ms  ->  {values.size / elapsed:,.0f} readings/s")
+print(f"Summary + messages:  {summary_elapsed * 1000:.1f} ms for {len(summary['flagged'])} of {summary['flagged_count']:,} flagged rows")
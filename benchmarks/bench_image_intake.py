@@ -0,0 +1,74 @@
+# bench_image_intake.py
+# Decode time and peak memory of the old base64 -> BytesIO -> PIL intake versus
+# utils.image_intake.decode_image on paths and raw buffers.
+# Each measurement runs in a fresh process so peak RSS growth is not shared between methods.
+# Run from the repository root: python benchmarks/bench_image_intake.py [image.jpg]
+import base64
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def make_sample(path):
+    # 20-megapixel JPEG with texture, roughly what a drone survey produces
+    import cv2
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 255, (456, 684, 3), dtype=np.uint8)
+    image = cv2.resize(small, (5472, 3648), interpolation=cv2.INTER_CUBIC)
+    cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+
+def measure(method, path, queue):
+    from PIL import Image
+    from utils.image_intake import decode_image
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    encoded = base64.b64encode(raw).decode("ascii") if method == "base64_pil" else None
+    if method != "bytes":
+        del raw
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if method == "base64_pil":
+        image = Image.open(io.BytesIO(base64.b64decode(encoded)))
+        array = np.asarray(image.convert("RGB"))  # the model needs an array either way
+    elif method == "path_mmap":
+        array = decode_image(path)
+    else:
+        array = decode_image(memoryview(raw))
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, (peak - baseline) / 1024, array.shape))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sample = sys.argv[1]
+    else:
+        sample = os.path.join(tempfile.mkdtemp(), "sample.jpg")
+        make_sample(sample)
+    print(f"Sample: {sample} ({os.path.getsize(sample) / 2**20:.1f} MB encoded)")
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'method':<14}{'decode ms':>11}{'peak RSS growth MB':>21}")
+    for method in ("base64_pil", "path_mmap", "bytes"):
+        times, peaks = [], []
+        for _ in range(3):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=measure, args=(method, sample, queue))
+            proc.start()
+            elapsed, peak_mb, shape = queue.get()
+            proc.join()
+            times.append(elapsed)
+            peaks.append(peak_mb)
+        print(f"{method:<14}{min(times) * 1000:>11.1f}{min(peaks):>21.1f}")
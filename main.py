@@ -1,13 +1,16 @@
 # main.py
 from agents.root_agent import get_agent
 from adk_local import RuntimeContext
+from utils.arrow_exchange import jsonify
+import json
 
 async def main():
     agent = get_agent()
     task = input("🧠 Enter your task: ")
     context = RuntimeContext(task)
     await agent.run(context)
-    print("✅ Final Output:\n", context.output)
+    # Arrow handles and frames are turned into JSON only here, at the outer boundary
+    print("✅ Final Output:\n", json.dumps(jsonify(context.output), indent=2, default=str))
 
 if __name__ == "__main__":
     import asyncio
@@ -0,0 +1,49 @@
+import importlib.util
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repo root is itself a package (root __init__.py); put it on the path so tests
+# import `utils.*` the way the agents do.
+sys.path.insert(0, ROOT)
+
+
+class _StubAgent:
+    # Stands in for the ADK Agent base class: agents only pass name/description/model
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+def _install_agent_stubs():
+    # Agent modules subclass google.adk's or adk_local's Agent and some import spacy at
+    # module level; where those are not installed, minimal stand-ins let tests import
+    # one agent module and exercise its logic (models are never loaded in tests).
+    import adk_local
+
+    if not hasattr(adk_local, "Agent"):
+        adk_local.Agent = _StubAgent
+    try:
+        import google.adk  # noqa: F401
+    except ImportError:
+        google = sys.modules.setdefault("google", types.ModuleType("google"))
+        if not hasattr(google, "__path__"):
+            google.__path__ = []
+        adk = types.ModuleType("google.adk")
+        adk.Agent = adk.BaseAgent = _StubAgent
+        google.adk = adk
+        sys.modules["google.adk"] = adk
+    if importlib.util.find_spec("spacy") is None:
+        sys.modules["spacy"] = types.ModuleType("spacy")
+
+    # agents/__init__.py imports every agent and all of their dependencies; tests import
+    # single agent modules, so the package is registered without running it.
+    if "agents" not in sys.modules:
+        package = types.ModuleType("agents")
+        package.__path__ = [os.path.join(ROOT, "agents")]
+        sys.modules["agents"] = package
+
+
+_install_agent_stubs()
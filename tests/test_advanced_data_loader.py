@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from utils import pdf_extract
+from utils.advanced_data_loader import iter_data, load_data, load_preview
+from utils.pdf_extract import PdfPageCache
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "incidents.csv"
+    pd.DataFrame({"site": ["a", "b", "c", "d", "e"], "count": [1, 2, 3, 4, 5]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_chunked_load_streams_frames(csv_file):
+    result = load_data(csv_file, chunk_size=2)
+    chunks = list(result["data"])
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert result["metadata"]["streamed"]
+    assert len(load_preview(csv_file, rows=3)["data"]) == 3
+
+
+def test_chunked_pdf_errors_surface_while_iterating(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_extract, "_cache", PdfPageCache(str(tmp_path / "pages.db")))
+    path = tmp_path / "policy.pdf"
+    path.write_bytes(b"not really a pdf")
+    result = load_data(str(path), chunk_size=10)
+    assert "error" not in result
+    with pytest.raises(ValueError):
+        list(result["data"])
+
+
+def test_missing_and_unsupported_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_data(str(tmp_path / "missing.csv")))
+    path = tmp_path / "drawing.dwg"
+    path.write_bytes(b"\x00")
+    assert load_data(str(path))["error"] == "Unsupported file format: .dwg"
+    assert load_data(str(path), chunk_size=10)["error"] == "Unsupported file format: .dwg"
+
+
+def test_missing_column_raises_with_or_without_the_cache(csv_file, tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_CACHE_DIR", str(tmp_path / "cache"))
+    assert load_data(csv_file, columns=["count", "site"], use_cache=False)["data"].columns.tolist() == ["count", "site"]
+    for use_cache in (False, True, True):
+        with pytest.raises(KeyError, match="nope"):
+            load_data(csv_file, columns=["site", "nope"], use_cache=use_cache)
@@ -0,0 +1,47 @@
+import gc
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from utils.arrow_exchange import ArrowHandle, is_arrow_ref, jsonify, resolve, share, sweep, to_frame
+
+
+def test_plain_values_pass_through():
+    df = pd.DataFrame({"a": [1]})
+    assert to_frame(df) is df
+    assert to_frame([{"a": 1}]).to_dict(orient="records") == [{"a": 1}]
+    assert resolve({"a": 1}) == {"a": 1} and not is_arrow_ref({"a": 1})
+    assert jsonify({"rows": df}) == {"rows": [{"a": 1}]}
+
+
+def test_share_rejects_unsupported_data():
+    pytest.importorskip("pyarrow")
+    with pytest.raises(TypeError):
+        share("not a table")
+
+
+def test_ipc_file_lives_as_long_as_its_handle(tmp_path):
+    pytest.importorskip("pyarrow")
+    handle = share(pd.DataFrame({"a": [1, 2, 3]}), cross_process=True, directory=str(tmp_path))
+    path = handle.path
+    assert to_frame(ArrowHandle(path=path))["a"].tolist() == [1, 2, 3]
+    del handle
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_handed_out_references_are_swept_after_the_ttl(tmp_path):
+    pytest.importorskip("pyarrow")
+    handle = share(pd.DataFrame({"a": [1]}), directory=str(tmp_path))
+    ref = handle.to_dict()
+    assert os.path.dirname(ref["path"]) == str(tmp_path)
+    del handle
+    gc.collect()
+    assert to_frame(ref)["a"].tolist() == [1]  # still readable by the receiver
+    assert sweep(str(tmp_path), ttl_seconds=3600) == 0
+    old = time.time() - 7200
+    os.utime(ref["path"], (old, old))
+    assert sweep(str(tmp_path), ttl_seconds=3600) == 1
+    assert not os.path.exists(ref["path"])
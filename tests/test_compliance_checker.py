@@ -0,0 +1,26 @@
+import asyncio
+
+from adk_local import RuntimeContext
+from agents import compliance_checker_agent as compliance
+
+
+def run(tmp_path, monkeypatch, file_name, content):
+    path = tmp_path / file_name
+    path.write_bytes(content)
+    monkeypatch.setattr("utils.standards_updater.get_latest_standards", lambda force_refresh=False: {"ISO 45001": ""})
+    context = RuntimeContext({})
+    context.input = None
+    context.files = [str(path)]
+    context.llm = None
+    asyncio.run(compliance.ComplianceCheckerAgent().run(context))
+    return context.output
+
+
+def test_csv_file_is_checked(tmp_path, monkeypatch):
+    output = run(tmp_path, monkeypatch, "policy.csv", b"section\nWorkers must wear PPE\n")
+    assert output["status"] != "failed"
+
+
+def test_unreadable_pdf_returns_failed_status(tmp_path, monkeypatch):
+    output = run(tmp_path, monkeypatch, "policy.pdf", b"not really a pdf")
+    assert output["status"] == "failed" and output["reason"]
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from utils.data_cache import DataCache, cache_key  # noqa: E402
+
+
+def test_entries_round_trip_with_projection(tmp_path):
+    source = tmp_path / "src.csv"
+    source.write_text("a,b\n1,x\n")
+    cache = DataCache(str(tmp_path / "cache"))
+    key = cache_key(str(source))
+    assert cache.get(key) is None
+    assert cache.put(key, pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+    assert cache.get(key, ["b"])["b"].tolist() == ["x", "y"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_missing_column_is_an_error_not_a_miss(tmp_path):
+    cache = DataCache(str(tmp_path / "cache"))
+    cache.put("k", pd.DataFrame({"a": [1]}))
+    with pytest.raises(KeyError):
+        cache.get("k", ["a", "zzz"])
+    assert cache.stats()["misses"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DataCache(str(tmp_path / "cache"))
+    cache.put("old", pd.DataFrame({"a": range(100)}))
+    cache.max_bytes = int((tmp_path / "cache" / "old.feather").stat().st_size * 1.5)
+    cache.put("new", pd.DataFrame({"a": range(100)}))
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_frames_with_non_string_labels_are_not_cached(tmp_path):
+    cache = DataCache(str(tmp_path / "cache"))
+    assert not cache.put("k", pd.DataFrame([[1, "x"]]))
+    assert not cache.put("k", pd.DataFrame({2024: [1], "site": ["north"]}))
+    assert cache.get("k") is None
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+from utils.data_collection import CollectionManifest, collect, scan
+
+
+def make_dir(tmp_path):
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    (src / "a.csv").write_text("site,count\nnorth,1\n")
+    (src / "nested" / "b.csv").write_text("site,count\nsouth,2\n")
+    (src / ".hidden.csv").write_text("x\n1\n")
+    (src / "notes.md").write_text("ignored")
+    return src
+
+
+def run(src, manifest, **kwargs):
+    return asyncio.run(collect([str(src)], manifest_path=str(manifest), use_cache=False, **kwargs))
+
+
+def test_scan_skips_hidden_and_unknown_files(tmp_path):
+    src = make_dir(tmp_path)
+    assert [os.path.basename(p) for p, _ in scan([str(src)])] == ["a.csv", "b.csv"]
+
+
+def test_files_are_only_skipped_once_the_manifest_is_saved(tmp_path):
+    src, manifest_path = make_dir(tmp_path), tmp_path / "manifest.json"
+    frames, stats, manifest = run(src, manifest_path)
+    assert stats["files_loaded"] == 2 and stats["errors"] == []
+    assert not manifest_path.exists()
+
+    # Processing "failed": nothing was saved, so the next run collects the files again
+    frames, stats, manifest = run(src, manifest_path)
+    assert stats["files_loaded"] == 2
+    manifest.save()
+
+    frames, stats, _ = run(src, manifest_path)
+    assert frames == [] and stats["files_skipped"] == 2
+    (src / "a.csv").write_text("site,count\nnorth,1\neast,3\n")
+    frames, stats, _ = run(src, manifest_path)
+    assert [len(df) for _, df in frames] == [2]
+
+
+def test_unreadable_files_are_reported_and_not_recorded(tmp_path):
+    src, manifest_path = make_dir(tmp_path), tmp_path / "manifest.json"
+    (src / "broken.json").write_text("{not json")
+    frames, stats, manifest = run(src, manifest_path)
+    assert [os.path.basename(e["path"]) for e in stats["errors"]] == ["broken.json"]
+    assert len(frames) == 2
+    manifest.save()
+    assert all(not p.endswith("broken.json") for p in CollectionManifest(str(manifest_path)).entries)
@@ -0,0 +1,29 @@
+import asyncio
+
+import pandas as pd
+from adk_local import RuntimeContext
+from agents import data_engineer_agent as data_engineer
+
+
+def make_agent():
+    return data_engineer.DataEngineerAgent.__new__(data_engineer.DataEngineerAgent)
+
+
+def test_pipeline_runs_every_step_and_reports_rows():
+    data = [{"site": " North ", "incident_count": 2}, {"site": None, "incident_count": 1}]
+    df, report = make_agent().run_pipeline(data, ["clean", "preprocess", {"step": "process"}])
+    assert df.to_dict(orient="records") == [{"site": "north", "incident_count": 2, "risk_score": 4}]
+    assert [(s["step"], s["rows_in"], s["rows_out"]) for s in report["steps"]] == [
+        ("clean", 2, 1), ("preprocess", 1, 1), ("process", 1, 1)]
+
+
+def test_chunks_pass_through_all_steps_before_concatenation():
+    frames = [pd.DataFrame({"kind": ["a", "b"]}), pd.DataFrame({"kind": ["c", "a"]})]
+    df, report = make_agent().run_pipeline(frames, ["optimize"])
+    assert report["chunks"] == 2 and df["kind"].tolist() == ["a", "b", "c", "a"]
+
+
+def test_unknown_step_fails_the_task():
+    context = RuntimeContext({"pipeline": ["clean", "explode"], "data": [{"a": 1}]})
+    asyncio.run(make_agent().run(context))
+    assert context.output["status"] == "error" and "Unknown pipeline step: explode" in context.output["message"]
@@ -0,0 +1,50 @@
+import sys
+import types
+
+import pytest
+
+from utils import detector_backends
+from utils.detector_backends import get_detector, load_detector
+
+
+class FakeYOLO:
+    loaded = []
+
+    def __init__(self, weights, task=None):
+        self.weights = weights
+        self.calls = 0
+        FakeYOLO.loaded.append(weights)
+
+    def __call__(self, images, **kwargs):
+        self.calls += 1
+        return []
+
+
+@pytest.fixture(autouse=True)
+def fake_ultralytics(monkeypatch):
+    FakeYOLO.loaded = []
+    monkeypatch.setitem(sys.modules, "ultralytics", types.SimpleNamespace(YOLO=FakeYOLO))
+    monkeypatch.setattr(detector_backends, "_detectors", {})
+    for name in ("INSPECTION_BACKEND", "INSPECTION_WEIGHTS", "INSPECTION_INT8"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_detector_is_loaded_and_warmed_once():
+    first = get_detector()
+    assert get_detector() is first
+    assert FakeYOLO.loaded == ["yolov5s.pt"] and first.calls == 1
+    assert first.backend_name == "torch"
+
+
+def test_torch_int8_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="INT8"):
+        load_detector("torch", int8=True)
+    monkeypatch.setenv("INSPECTION_INT8", "1")
+    with pytest.raises(ValueError, match="INT8"):
+        get_detector()
+    assert FakeYOLO.loaded == []
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown detector backend"):
+        load_detector("tensorrt")
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from utils.dtype_optimizer import concat_frames, normalize_categories, optimize_dtypes
+
+
+def test_repetitive_text_becomes_categorical_and_ints_are_kept():
+    df = pd.DataFrame({"site": ["north", "south"] * 500, "count": np.arange(1000, dtype="int64")})
+    out, report = optimize_dtypes(df)
+    assert isinstance(out["site"].dtype, pd.CategoricalDtype)
+    assert out["count"].dtype == "int64"
+    assert report["memory_after_mb"] <= report["memory_before_mb"]
+    assert list(report["converted"]) == ["site"]
+
+
+def test_integer_downcast_is_opt_in():
+    df = pd.DataFrame({"count": np.arange(200, dtype="int64")})
+    out, _ = optimize_dtypes(df, downcast_ints=True)
+    assert out["count"].dtype == "uint8"
+
+
+def test_mixed_object_columns_are_not_categorized():
+    df = pd.DataFrame({"code": pd.Series(["A", 1, "a ", 1] * 50, dtype=object)})
+    out, report = optimize_dtypes(df, arrow_strings=False)
+    assert out["code"].dtype == object and report["converted"] == {}
+
+
+def test_normalize_categories_merges_strings_and_keeps_other_values():
+    series = pd.Series(["Crane ", "crane", 3, "LIFT", None, 3], dtype="category")
+    out = normalize_categories(series)
+    assert out.tolist()[:4] == ["crane", "crane", 3, "lift"] and pd.isna(out[4])
+    assert sorted(map(str, out.cat.categories)) == ["3", "crane", "lift"]
+
+
+def test_concat_keeps_a_shared_categorical_dtype():
+    chunks = [pd.DataFrame({"site": pd.Series(["north", "north"], dtype="category")}),
+              pd.DataFrame({"site": pd.Series(["south", "east"], dtype="category")}),
+              pd.DataFrame({"site": pd.Series(["west"], dtype=object)})]
+    out = concat_frames(chunks)
+    assert isinstance(out["site"].dtype, pd.CategoricalDtype)
+    assert out["site"].tolist() == ["north", "north", "south", "east", "west"]
+    assert list(out.index) == list(range(5))
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+
+from agents import environmental_monitoring_agent as env_agent
+from utils.environmental_alerts import AlertTracker
+from utils.environmental_store import EnvironmentalStore
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    store = EnvironmentalStore(str(tmp_path / "store"))
+    monkeypatch.setattr(env_agent, "ALERT_STATE_PATH", str(tmp_path / "alerts.state"))
+    monkeypatch.setattr(env_agent, "_alert_tracker", None)
+    monkeypatch.setattr(env_agent, "_stream_monitor", None)
+    monkeypatch.setattr(env_agent, "get_environmental_store", lambda: store)
+    return env_agent.EnvironmentalMonitoringAgent()
+
+
+def test_gateway_alerts_are_persisted(agent, tmp_path):
+    async def scenario():
+        gateway = await agent.start_gateway(tcp_port=0)
+        _, writer = await asyncio.open_connection(*gateway.addresses()["tcp"])
+        writer.write(b"site1,s1,PM2.5,80,1000\n")
+        await writer.drain()
+        writer.close()
+        while not gateway.metrics()["sites"].get("site1", {}).get("processed"):
+            await asyncio.sleep(0.01)
+        await gateway.stop()
+
+    asyncio.run(scenario())
+    restored = AlertTracker(agent.thresholds)
+    restored.load(str(tmp_path / "alerts.state"))
+    assert [(a["site"], a["parameter"], a["level"]) for a in restored.active()] == [("site1", "PM2.5", "violation")]
+
+
+def test_gateway_keeps_serving_when_alert_state_cannot_be_saved(agent, monkeypatch):
+    monkeypatch.setattr(env_agent, "ALERT_STATE_PATH", "/dev/null/alerts.state")
+
+    async def scenario():
+        gateway = await agent.start_gateway(tcp_port=None, policy="drop_newest")
+        gateway._offer_nowait(("site1", "s1", {"PM2.5": 80.0}, 1000.0))
+        await gateway.stop()
+        return gateway.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["sites"]["site1"]["processed"] == 1 and metrics["after_batch_errors"] == 1
+
+
+def test_worker_thread_ingest_waits_for_state_held_on_the_loop(agent):
+    agent.ingest("site1", "s1", {"PM2.5": 10.0}, 1000.0)
+    with env_agent._state_lock:
+        worker = threading.Thread(target=agent.ingest, args=("site1", "s2", {"PM2.5": 10.0}, 1001.0))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive() and agent.stream.metrics("site1", "s2") is None
+    worker.join()
+    assert agent.stream.metrics("site1", "s2")["PM2.5"]["rolling_mean"] == 10.0
+
+
+def test_concurrent_ingest_registers_every_sensor(agent):
+    threads = [threading.Thread(target=agent.ingest, args=("site1", f"s{i}", {"PM2.5": float(i)}, 1000.0 + i))
+               for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(agent.stream.metrics("site1", f"s{i}")["PM2.5"]["rolling_mean"] == float(i) for i in range(16))
@@ -0,0 +1,89 @@
+import os
+
+from utils.environmental_alerts import AlertTracker
+from utils.environmental_stream import StreamingMonitor
+
+THRESHOLDS = {"PM2.5": 35, "noise_dB": 85}
+
+
+def test_violation_is_raised_once_and_cleared_after_hold():
+    tracker = AlertTracker(THRESHOLDS, clear_hold_seconds=60)
+    assert [e["type"] for e in tracker.update("s", "a", "PM2.5", 50, 0)] == ["raised"]
+    assert tracker.update("s", "a", "PM2.5", 51, 10) == []
+    assert tracker.update("s", "a", "PM2.5", 10, 20) == []
+    assert [e["type"] for e in tracker.update("s", "a", "PM2.5", 10, 80)] == ["cleared"]
+    assert tracker.active() == []
+
+
+def test_out_of_range_readings_never_raise_or_clear_alerts():
+    tracker = AlertTracker(THRESHOLDS, clear_hold_seconds=0)
+    assert tracker.update_many("s", "a", {"PM2.5": 99999, "noise_dB": -3}, 0) == []
+    assert tracker.active() == []
+
+    tracker.update("s", "a", "PM2.5", 50, 1)
+    assert tracker.update("s", "a", "PM2.5", 99999, 2) == []
+    assert [a["level"] for a in tracker.active()] == ["violation"]
+
+
+def test_stream_reports_faulty_reading_without_an_alert():
+    monitor = StreamingMonitor(THRESHOLDS, alerts=AlertTracker(THRESHOLDS))
+    events = monitor.ingest("s", "a", {"PM2.5": 99999}, ts=0)
+    assert [e["type"] for e in events] == ["faulty"]
+
+
+def test_saves_append_changes_and_reload_matches(tmp_path):
+    path = str(tmp_path / "alerts.state")
+    tracker = AlertTracker(THRESHOLDS, clear_hold_seconds=0, compact_every=3)
+    tracker.update("s", "a", "PM2.5", 50, 0)
+    tracker.save(path)  # first save writes the snapshot
+    tracker.update("s", "b", "noise_dB", 90, 1)
+    tracker.save(path)
+    tracker.save(path)  # nothing changed: no journal record
+    tracker.update("s", "a", "PM2.5", 5, 2)  # cleared, dropped from the state
+    tracker.save(path)
+    with open(path + ".journal") as f:
+        assert len(f.readlines()) == 2
+
+    restored = AlertTracker(THRESHOLDS)
+    restored.load(path)
+    assert restored.active() == tracker.active()
+    assert [(a["sensor"], a["parameter"]) for a in restored.active()] == [("b", "noise_dB")]
+
+
+def test_journal_is_compacted_and_torn_tail_ignored(tmp_path):
+    path = str(tmp_path / "alerts.state")
+    tracker = AlertTracker(THRESHOLDS, compact_every=2)
+    tracker.save(path)
+    for i in range(2):
+        tracker.update("s", f"sensor{i}", "PM2.5", 50, i)
+        tracker.save(path)
+    tracker.update("s", "late", "PM2.5", 50, 5)
+    tracker.save(path)  # journal full: folded into the snapshot
+    assert not os.path.exists(path + ".journal")
+
+    with open(path + ".journal", "w") as f:
+        f.write('{"v":1,"states":[["s","torn"')
+    restored = AlertTracker(THRESHOLDS)
+    restored.load(path)
+    assert len(restored.active()) == 3
+
+
+def test_saves_after_a_torn_record_survive_the_next_load(tmp_path):
+    path = str(tmp_path / "alerts.state")
+    tracker = AlertTracker(THRESHOLDS, clear_hold_seconds=0)
+    tracker.save(path)
+    tracker.update("s", "a", "PM2.5", 50, 0)
+    tracker.save(path)
+    with open(path + ".journal", "a") as f:
+        f.write('{"v":1,"states":[["s","torn"')  # crash mid-save
+
+    restarted = AlertTracker(THRESHOLDS, clear_hold_seconds=0)
+    restarted.load(path)
+    restarted.update("s", "a", "PM2.5", 5, 10)  # cleared after the restart
+    restarted.save(path)
+
+    again = AlertTracker(THRESHOLDS)
+    again.load(path)
+    assert again.active() == []
+    with open(path + ".journal") as f:
+        assert len(f.readlines()) == 2
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from utils.environmental_batch import evaluate_block, summarize_block
+
+THRESHOLDS = {"PM2.5": 35, "Noise": 85}
+PARAMETERS = ["PM2.5", "Noise"]
+
+
+def test_nested_list_block_is_summarized():
+    # One site, two sensors, two parameters, three readings each, as a JSON task sends it
+    block = [[
+        [[10, 33, 40], [70, 80, None]],
+        [[-5, 12, 12], [90, 60, 60]],
+    ]]
+    values = np.asarray(block, dtype=float)
+    status = evaluate_block(block, PARAMETERS, THRESHOLDS)
+    summary = summarize_block(block, status, PARAMETERS, THRESHOLDS, sites=["A"], sensors=["s1", "s2"])
+
+    assert summary["readings"] == values.size
+    assert summary["counts"]["PM2.5"] == {"OK": 3, "pre-warning": 1, "violation": 1, "faulty": 1, "missing": 0}
+    assert summary["counts"]["Noise"]["missing"] == 1
+    flagged = {(f["sensor"], f["parameter"], f["time"]): f for f in summary["flagged"]}
+    assert flagged[("s1", "PM2.5", 2)]["status"] == "violation"
+    assert flagged[("s1", "Noise", 2)]["value"] is None
+    assert flagged[("s2", "PM2.5", 0)]["status"] == "faulty"
+
+
+def test_flagged_rows_are_capped_but_counts_are_not():
+    values = np.full((2, 3, 2, 50), 50.0)
+    status = evaluate_block(values, PARAMETERS, THRESHOLDS)
+    summary = summarize_block(values, status, PARAMETERS, THRESHOLDS, max_flagged=10)
+    assert summary["flagged_count"] == 2 * 3 * 50  # PM2.5 over its limit, Noise fine
+    assert len(summary["flagged"]) == 10
+    assert summary["flagged_truncated"]
+
+
+def test_block_shape_must_match_parameters():
+    with pytest.raises(ValueError):
+        evaluate_block(np.zeros((1, 1, 3, 4)), PARAMETERS, THRESHOLDS)
+    with pytest.raises(ValueError):
+        evaluate_block([[1, 2], [3, 4]], PARAMETERS, THRESHOLDS)
+
+
+@pytest.mark.parametrize("labels", [{"sites": []}, {"sensors": ["s1"]}, {"timestamps": ["t0"]}])
+def test_short_axis_labels_are_rejected(labels):
+    values = np.full((1, 2, 2, 3), 50.0)
+    status = evaluate_block(values, PARAMETERS, THRESHOLDS)
+    with pytest.raises(ValueError, match="labels"):
+        summarize_block(values, status, PARAMETERS, THRESHOLDS, **labels)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from utils.environmental_store import ROLLUP_DTYPE, EnvironmentalStore
+
+DAY = 1_700_006_400  # 2023-11-15 00:00 UTC
+
+
+def test_readings_round_trip_with_one_rollup_row_per_bucket(tmp_path):
+    store = EnvironmentalStore(str(tmp_path), flush_every=3, flush_seconds=3600)
+    for i in range(10):
+        # Flushed every 3 readings, so the 1m bucket at DAY spans several flushes
+        store.append("site-1", "a", {"PM2.5": float(i), "noise_dB": 70}, DAY + i)
+
+    raw = store.query("site-1", DAY, DAY + 60, parameter="PM2.5", resolution="raw")
+    assert raw["value"].tolist() == [float(i) for i in range(10)]
+
+    minute = store.query("site-1", DAY, DAY + 60, resolution="1m")
+    assert len(minute["ts"]) == 2  # one row per parameter
+    pm = minute["parameter"] == "PM2.5"
+    assert minute["count"][pm].tolist() == [10]
+    assert (minute["min"][pm][0], minute["max"][pm][0], minute["mean"][pm][0]) == (0.0, 9.0, 4.5)
+    rollup = np.fromfile(tmp_path / "site-1" / "2023-11-15" / "rollup_1h.bin", dtype=ROLLUP_DTYPE)
+    assert rollup.size == 2
+
+
+def test_late_reading_is_merged_into_its_bucket(tmp_path):
+    store = EnvironmentalStore(str(tmp_path), flush_every=1)
+    store.append("s", "a", {"CO_ppm": 10}, DAY + 120)
+    store.append("s", "a", {"CO_ppm": 30}, DAY + 5)
+    store.append("s", "a", {"CO_ppm": 20}, DAY + 130)
+    minute = store.query("s", DAY, DAY + 3600, resolution="1m")
+    assert minute["count"].tolist() == [1, 2]
+    assert minute["mean"].tolist() == [30.0, 15.0]
+
+
+def test_buffer_is_written_by_age_and_before_queries(tmp_path):
+    store = EnvironmentalStore(str(tmp_path), flush_every=1000, flush_seconds=3600)
+    store.append("s", "a", {"PM2.5": 12}, DAY)
+    assert not (tmp_path / "s" / "2023-11-15").exists()
+    assert store.query("s", DAY, DAY + 1)["value"].tolist() == [12.0]
+
+    store.flush_seconds = 0
+    store.append("s", "a", {"PM2.5": 13}, DAY + 1)
+    assert store.stats("s")["readings"] == 2
+
+
+@pytest.mark.parametrize("site", ["../escape", "a/b", "..", ".hidden", "", None])
+def test_site_names_cannot_leave_the_store(tmp_path, site):
+    store = EnvironmentalStore(str(tmp_path / "store"))
+    with pytest.raises(ValueError, match="Invalid site name"):
+        store.append(site, "a", {"PM2.5": 1}, DAY)
+    with pytest.raises(ValueError):
+        store.query(site, DAY, DAY + 1)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["store"]
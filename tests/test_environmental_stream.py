@@ -0,0 +1,42 @@
+from utils.environmental_stream import StreamingMonitor
+
+
+def make_monitor(**kwargs):
+    return StreamingMonitor({"noise_dB": 90, "PM2.5": 35}, window=3, capacity=1, **kwargs)
+
+
+def test_rolling_mean_and_status_transitions():
+    monitor = make_monitor()
+    assert monitor.ingest("a", "s1", {"PM2.5": 10}, ts=0) == []
+    events = monitor.ingest("a", "s1", {"PM2.5": 40}, ts=60)
+    assert [e["type"] for e in events] == ["violation"]
+    monitor.ingest("a", "s1", {"PM2.5": 10}, ts=120)
+    monitor.ingest("a", "s1", {"PM2.5": 10}, ts=180)
+    metrics = monitor.metrics("a", "s1")["PM2.5"]
+    assert metrics["rolling_mean"] == 20.0 and metrics["status"] == "OK"
+
+
+def test_rows_grow_past_capacity():
+    monitor = make_monitor()
+    for sensor in range(5):
+        monitor.ingest("a", f"s{sensor}", {"PM2.5": sensor}, ts=0)
+    assert monitor.capacity >= 5 and monitor.metrics("a", "s4")["PM2.5"]["rolling_mean"] == 4.0
+
+
+def test_twa_breach_is_reported_once():
+    monitor = StreamingMonitor({"PM2.5": 1000}, twa_hours=1, bucket_seconds=60)
+    types = []
+    for minute in range(61):
+        types += [e["type"] for e in monitor.ingest("a", "s1", {"PM2.5": 50}, ts=minute * 60)]
+    assert types.count("twa_breach") == 1
+    assert monitor.metrics("a", "s1")["PM2.5"]["twa_breached"]
+
+
+def test_invalid_readings_mark_the_sensor_faulty():
+    monitor = make_monitor()
+    monitor.ingest("a", "s1", {"PM2.5": 10}, ts=0)
+    events = monitor.ingest("a", "s1", {"PM2.5": "n/a", "unknown": 5}, ts=60)
+    assert [e["type"] for e in events] == ["faulty"]
+    metrics = monitor.metrics("a", "s1")["PM2.5"]
+    assert metrics["status"] == "faulty" and metrics["rolling_mean"] == 10.0
+    assert monitor.metrics("a", "missing") is None
@@ -0,0 +1,79 @@
+import random
+import threading
+
+from utils.expiry_calendar import ExpiryCalendar
+from utils.training_db import TrainingRecordStore
+
+
+def row(worker, cert, expiry, role="electrician", site="north"):
+    return (worker, None, role, cert, None, expiry, site)
+
+
+def brute_force(store, as_of, days_end, site=None, role=None):
+    records, _ = store.records(site=site, role=role, limit=10**6)
+    return sorted((r["expiry_date"], r["worker_id"], r["cert_type"]) for r in records
+                  if r["expiry_date"] and as_of <= r["expiry_date"] < days_end)
+
+
+def test_calendar_follows_bulk_upserts_and_renewals(tmp_path):
+    store = TrainingRecordStore(str(tmp_path / "t.db"))
+    store.upsert([row("w0", "LOTO", "2026-01-05")])
+    calendar = ExpiryCalendar(store)
+    rng = random.Random(7)
+    for _ in range(3):
+        store.upsert([row(f"w{rng.randrange(300)}", f"c{rng.randrange(3)}", f"2026-01-{rng.randint(1, 28):02d}",
+                          role=rng.choice(["rigger", "electrician"]), site=rng.choice(["north", "south"]))
+                      for _ in range(500)])
+    store.upsert([row("w0", "LOTO", "2026-03-01")])  # small renewal, moved out of January
+
+    for site, role in [(None, None), ("north", None), (None, "rigger"), ("south", "electrician")]:
+        got = [(r["expiry_date"], r["worker_id"], r["cert_type"])
+               for r in calendar.expiring(31, site=site, role=role, as_of="2026-01-01")]
+        assert got == brute_force(store, "2026-01-01", "2026-02-01", site=site, role=role)
+        assert calendar.count(31, site=site, role=role, as_of="2026-01-01") == len(got)
+
+
+def test_repeated_key_in_one_chunk_keeps_the_last_row(tmp_path):
+    store = TrainingRecordStore(str(tmp_path / "t.db"))
+    calendar = ExpiryCalendar(store)
+    store.upsert([row("w1", "LOTO", "2026-01-02"), row("w1", "LOTO", "2026-01-09")])
+    assert [r["expiry_date"] for r in calendar.expiring(30, as_of="2026-01-01")] == ["2026-01-09"]
+    store.upsert([row("w1", "LOTO", None)])
+    assert calendar.count(365, as_of="2026-01-01") == 0
+
+
+def test_concurrent_upserts_apply_in_commit_order(tmp_path):
+    store = TrainingRecordStore(str(tmp_path / "t.db"))
+    calendar = ExpiryCalendar(store)
+
+    def renew(day):
+        for _ in range(20):
+            store.upsert([row(f"w{i}", "LOTO", f"2026-01-{day:02d}") for i in range(50)])
+
+    threads = [threading.Thread(target=renew, args=(day,)) for day in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    got = [(r["expiry_date"], r["worker_id"], r["cert_type"]) for r in calendar.expiring(60, as_of="2026-01-01")]
+    assert got == brute_force(store, "2026-01-01", "2026-03-02")
+
+
+def test_upsert_racing_the_initial_load_is_not_indexed_twice(tmp_path):
+    store = TrainingRecordStore(str(tmp_path / "t.db"))
+    add_listener = store.add_listener
+    writers = []
+
+    def add_listener_then_upsert(callback):
+        # Commit an upsert between listener registration and the load
+        add_listener(callback)
+        writer = threading.Thread(target=store.upsert, args=([row("w1", "LOTO", "2026-01-09")],))
+        writer.start()
+        writer.join(0.2)
+        writers.append(writer)
+
+    store.add_listener = add_listener_then_upsert
+    calendar = ExpiryCalendar(store)
+    writers[0].join()
+    assert [r["worker_id"] for r in calendar.expiring(30, as_of="2026-01-01")] == ["w1"]
+    assert calendar.count(30, as_of="2026-01-01") == 1
@@ -0,0 +1,44 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.image_intake import decode_image, image_size
+
+
+@pytest.fixture
+def png_bytes():
+    image = np.zeros((20, 30, 3), dtype=np.uint8)
+    image[:, :, 2] = 255  # red in BGR
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return encoded.tobytes()
+
+
+def test_paths_buffers_and_base64_decode_alike(tmp_path, png_bytes):
+    path = tmp_path / "image.png"
+    path.write_bytes(png_bytes)
+    sources = [str(path), path, png_bytes, memoryview(png_bytes), base64.b64encode(png_bytes).decode()]
+    for source in sources:
+        image = decode_image(source)
+        assert image_size(image) == (30, 20) and image[0, 0].tolist() == [0, 0, 255]
+
+
+def test_decoded_arrays_pass_through():
+    image = np.zeros((5, 5, 3), dtype=np.uint8)
+    assert decode_image(image) is image
+
+
+def test_undecodable_or_unsupported_sources_raise():
+    with pytest.raises(ValueError, match="Could not decode"):
+        decode_image(b"not an image")
+    with pytest.raises(TypeError, match="Unsupported image source"):
+        decode_image(42)
+
+
+def test_missing_paths_raise_file_not_found(tmp_path):
+    missing = tmp_path / "site" / "a.jpg"
+    for source in (missing, str(missing), "photos/missing.png"):
+        with pytest.raises(FileNotFoundError, match="missing|a.jpg"):
+            decode_image(source)
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from adk_local import RuntimeContext
+from agents import incident_management_agent as incident
+from utils.incident_store import IncidentStore
+
+REPORT = ("Worker slipped on a wet scaffold plank on level three and fell two metres "
+          "because the guard rail had been removed for material deliveries.")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return IncidentStore(str(tmp_path / "incidents.db"))
+
+
+def test_near_duplicate_is_found_and_similar_ranked(store):
+    original = store.add(REPORT, {"root_cause": "Slip/Trip/Fall hazard"}, root_cause="Slip/Trip/Fall hazard")
+    store.add("Electrical panel left open near the site office with exposed live wiring.", {})
+    duplicate = store.find_duplicate(REPORT + " Reported by the foreman.")
+    assert duplicate["incident_id"] == original and duplicate["similarity"] >= 0.8
+    assert store.similar(REPORT, k=1)[0]["incident_id"] == original
+
+
+def test_unrelated_or_empty_reports_have_no_duplicate(store):
+    store.add(REPORT, {})
+    assert store.find_duplicate("Forklift reversed into a stack of pallets in the yard.") is None
+    assert store.find_duplicate("") is None
+
+
+def test_duplicate_keeps_its_own_field_checks(store):
+    store.add(REPORT, {"root_cause": "Slip/Trip/Fall hazard", "recommendations": ["Add date to the report."],
+                       "vague_language": ["should"]})
+    agent = incident.IncidentManagementAgent.__new__(incident.IncidentManagementAgent)
+    agent.store = store
+    context = RuntimeContext({
+        "incident_description": REPORT, "location": "Block B", "reporter": "J. Doe", "date": "2026-10-01",
+        "time": "09:00", "people_involved": "1", "immediate_action": "First aid given",
+    })
+    asyncio.run(agent.run(context))
+    output = context.output
+    assert output["duplicate"] is True
+    assert output["missing_fields"] == [] and output["recommendations"] == [] and output["vague_language"] == []
@@ -0,0 +1,32 @@
+import asyncio
+
+import cv2
+import numpy as np
+from adk_local import RuntimeContext
+from agents import inspection_audit_agent as inspection
+
+
+class FakeResult:
+    names = {0: "helmet"}
+    boxes = []
+
+
+def make_agent():
+    agent = inspection.InspectionAuditAgent.__new__(inspection.InspectionAuditAgent)
+    agent.model = lambda images, **kwargs: [FakeResult() for _ in images]
+    return agent
+
+
+def test_batch_reports_each_image(tmp_path):
+    good = tmp_path / "a.png"
+    cv2.imwrite(str(good), np.zeros((32, 32, 3), dtype=np.uint8))
+    bad = tmp_path / "b.png"
+    bad.write_bytes(b"not an image")
+    results = asyncio.run(make_agent().inspect_batch([str(good), str(bad)], batch_size=1))
+    assert [r["status"] for r in results] == ["success", "error"]
+
+
+def test_missing_image_dir_returns_failed(tmp_path):
+    context = RuntimeContext({"image_dir": str(tmp_path / "missing")})
+    asyncio.run(make_agent().run_batch(context))
+    assert context.output["status"] == "failed" and "missing" in context.output["reason"]
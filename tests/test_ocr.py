@@ -0,0 +1,65 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from utils import ocr
+
+
+@pytest.fixture
+def fake_ocr(tmp_path, monkeypatch):
+    """OCR without tesseract: the text is the file's content, and 'bad' files fail."""
+    monkeypatch.setitem(sys.modules, "pytesseract", types.ModuleType("pytesseract"))
+    monkeypatch.setattr(ocr, "_cache", ocr.OcrCache(str(tmp_path / "ocr.db")))
+    calls = []
+
+    def ocr_one(path, options):
+        calls.append(path)
+        content = open(path).read()
+        if content == "bad":
+            raise ValueError("cannot decode image")
+        return f"text of {content}"
+
+    monkeypatch.setattr(ocr, "_ocr_one", ocr_one)
+    return calls
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def test_duplicates_run_once_and_later_batches_hit_the_cache(tmp_path, fake_ocr):
+    a = write(tmp_path, "a.png", "permit 1")
+    copy = write(tmp_path, "copy.png", "permit 1")
+    batch = ocr.ocr_images([a, copy], workers=1)
+    assert [r["text"] for r in batch["results"]] == ["text of permit 1"] * 2
+    assert batch["ocr_runs"] == 1 and len(fake_ocr) == 1
+
+    again = ocr.ocr_images([copy], workers=1)
+    assert again["results"][0]["cached"] and again["hit_rate"] == 1.0 and len(fake_ocr) == 1
+
+
+def test_one_failing_image_does_not_lose_the_batch(tmp_path, fake_ocr):
+    good = write(tmp_path, "good.png", "permit 2")
+    bad = write(tmp_path, "bad.png", "bad")
+    missing = str(tmp_path / "missing.png")
+    batch = ocr.ocr_images([good, bad, missing], workers=1)
+    good_result, bad_result, missing_result = batch["results"]
+    assert good_result["text"] == "text of permit 2" and "error" not in good_result
+    assert bad_result["text"] is None and bad_result["error"] == "cannot decode image"
+    assert "error" in missing_result and batch["errors"] == 2
+
+    # The good image was cached; the failed one is retried
+    again = ocr.ocr_images([good, bad], workers=1)
+    assert again["results"][0]["cached"] and not again["results"][1]["cached"]
+    assert fake_ocr.count(bad) == 2
+
+
+def test_preprocess_converts_and_downscales():
+    pytest.importorskip("cv2")
+    image = np.full((400, 3000, 3), 255, dtype=np.uint8)
+    out = ocr.preprocess(image, max_side=1500)
+    assert out.ndim == 2 and max(out.shape) == 1500
@@ -0,0 +1,57 @@
+import pytest
+
+from utils import pdf_extract
+from utils.pdf_extract import PdfPageCache, extract_pdf_text, get_pdf_pool, parse_pages
+
+
+def test_parse_pages_specs():
+    assert parse_pages("1-3,5", 6) == [1, 2, 3, 5]
+    assert parse_pages("4-", 6) == [4, 5, 6]
+    assert parse_pages([2, 9], 6) == [2]
+    assert parse_pages(None, 3) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("-3", "no first page"),
+    ("a", "not a page number"),
+    ("5-2", "ends before it starts"),
+    ("0", "numbered from 1"),
+])
+def test_invalid_page_specs_explain_the_problem(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_pages(spec, 6)
+
+
+@pytest.fixture
+def fake_pdf(tmp_path, monkeypatch):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF stand-in")
+    calls = []
+    monkeypatch.setattr(pdf_extract, "_cache", PdfPageCache(str(tmp_path / "pages.db")))
+    monkeypatch.setattr(pdf_extract, "page_count", lambda file_path: 4)
+
+    def extract_range(file_path, pages):
+        calls.append(list(pages))
+        return [(p, f"page {p}") for p in pages]
+
+    monkeypatch.setattr(pdf_extract, "_extract_range", extract_range)
+    return str(path), calls
+
+
+def test_extracted_pages_are_cached(fake_pdf):
+    path, calls = fake_pdf
+    first = extract_pdf_text(path, pages="1-2")
+    second = extract_pdf_text(path, pages="1-3")
+    assert first["pages"] == [(1, "page 1"), (2, "page 2")]
+    assert second["cached_pages"] == 2 and calls == [[1, 2], [3]]
+
+
+def test_invalid_spec_is_rejected_before_extraction(fake_pdf):
+    path, calls = fake_pdf
+    with pytest.raises(ValueError):
+        extract_pdf_text(path, pages="-3")
+    assert calls == []
+
+
+def test_pool_is_shared():
+    assert get_pdf_pool() is get_pdf_pool()
@@ -0,0 +1,62 @@
+import asyncio
+
+from utils.reflection_queue import PRIORITY_FAILED, ReflectionQueue, RunStore, default_priority
+
+
+class LoopBoundLLM:
+    """Stands in for a client that only works on the loop it was created on."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+
+async def reflect(agent, output, llm):
+    if asyncio.get_running_loop() is not llm.loop:
+        raise RuntimeError("bound to a different event loop")
+    if output.get("fail"):
+        raise ValueError("model unavailable")
+    return f"{agent}: looks fine"
+
+
+def test_reflections_run_on_the_serving_loop(tmp_path):
+    store = RunStore(str(tmp_path / "runs.db"))
+
+    async def serve():
+        queue = ReflectionQueue(reflect, store, workers=2)
+        llm = LoopBoundLLM()
+        ok = store.record("risk_agent", "task", {"status": "success"})
+        bad = store.record("risk_agent", "task", {"fail": True})
+        assert queue.submit(ok, "risk_agent", {"status": "success"}, llm) == "queued"
+        assert queue.submit(bad, "risk_agent", {"fail": True}, llm) == "queued"
+        queued = store.get(ok)
+        assert (queued["reflection_status"], queued["reflected_at"]) == ("queued", None)
+        await queue.wait()
+        return queue.stats(), ok, bad
+
+    stats, ok, bad = asyncio.run(serve())
+    assert stats["done"] == 1 and stats["error"] == 1 and stats["pending"] == 0
+    done, failed = store.get(ok), store.get(bad)
+    assert done["reflection"] == "risk_agent: looks fine" and done["reflected_at"]
+    assert failed["reflection_status"] == "error" and failed["reflection"] == "model unavailable"
+
+
+def test_full_queue_drops_and_sampling_skips(tmp_path):
+    store = RunStore(str(tmp_path / "runs.db"))
+
+    async def serve():
+        queue = ReflectionQueue(reflect, store, workers=1, max_pending=1)
+        llm = LoopBoundLLM()
+        ids = [store.record("a", "t", {}) for _ in range(3)]
+        statuses = [queue.submit(ids[0], "a", {}, llm), queue.submit(ids[1], "a", {}, llm),
+                    queue.submit(ids[2], "a", {}, llm, sample_rate=0.0)]
+        await queue.wait()
+        return ids, statuses
+
+    ids, statuses = asyncio.run(serve())
+    assert statuses == ["queued", "dropped", "skipped"]
+    assert store.get(ids[1])["reflected_at"] is None
+
+
+def test_failed_runs_are_reviewed_first():
+    assert default_priority("x", {"status": "failed"}) == PRIORITY_FAILED
+    assert default_priority("compliance_agent", {}) < default_priority("x", {})
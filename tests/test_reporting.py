@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+from utils.reporting import ReportService, detection_thumbnails
+
+
+def test_reports_render_with_thumbnails(tmp_path):
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    crops = detection_thumbnails(image, [{"label": "helmet", "confidence": 0.9, "bbox": [10, 10, 50, 60]}])
+    service = ReportService(str(tmp_path))
+    handle = service.submit(["helmet (0.90)"], title="Batch", thumbnails=crops)
+    service.wait()
+    assert service.status(handle["report_id"])["status"] == "done"
+    assert os.path.getsize(handle["path"]) > 0
+
+
+def test_grayscale_and_bgra_images_give_bgr_thumbnails(tmp_path):
+    detections = [{"label": "helmet", "confidence": 0.9, "bbox": [10, 10, 50, 60]}]
+    service = ReportService(str(tmp_path))
+    for image in (np.zeros((100, 100), dtype=np.uint8), np.zeros((100, 100, 4), dtype=np.uint8)):
+        crops = detection_thumbnails(image, detections)
+        assert crops[0][0].shape == (50, 40, 3)
+        handle = service.submit(["helmet (0.90)"], thumbnails=crops)
+        service.wait()
+        assert service.status(handle["report_id"])["status"] == "done"
+
+
+def test_failed_render_is_reported(tmp_path):
+    service = ReportService(str(tmp_path))
+    handle = service.submit(["line"], thumbnails=[(np.zeros((4, 4), dtype=np.uint8), "bad crop")])
+    service.wait()
+    status = service.status(handle["report_id"])
+    assert status["status"] == "error" and status["error"]
+
+
+def test_finished_jobs_are_evicted(tmp_path):
+    service = ReportService(str(tmp_path), keep_finished=2)
+    handles = [service.submit([f"line {i}"]) for i in range(3)]
+    service.wait()
+    assert service.status(handles[0]["report_id"]) is None
+    assert [service.status(h["report_id"])["status"] for h in handles[1:]] == ["done", "done"]
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.sensor_gateway import SensorGateway
+
+PARAMETERS = ["PM2.5", "noise_dB"]
+
+
+def test_parse_line_formats():
+    gateway = SensorGateway(lambda *args: None, PARAMETERS)
+    assert gateway.parse_line("s1,a,PM2.5,12.5,100") == ("s1", "a", {"PM2.5": 12.5}, 100.0)
+    assert gateway.parse_line('{"site": "s1", "sensor": "a", "sensor_data": {"PM2.5": 3}, "ts": 5}') \
+        == ("s1", "a", {"PM2.5": 3}, 5.0)
+    site, _, _, ts = gateway.parse_line('{"parameter": "PM2.5", "value": 1, "ts": null}')
+    assert site == "default" and ts > 0
+    assert gateway.parse_line("   ") is None
+
+
+@pytest.mark.parametrize("line", [
+    '{"sensor_data": {"PM2.5": 1}, "ts": "later"}',
+    '{"sensor_data": [1, 2]}',
+    '{"sensor_data": {"PM2.5": 1}, "ts": [1]}',
+    '[1, 2]',
+    "s1,a,PM2.5",
+    "s1,a,PM2.5,nan-ish,1",
+])
+def test_parse_line_rejects_malformed_messages(line):
+    gateway = SensorGateway(lambda *args: None, PARAMETERS)
+    with pytest.raises((ValueError, TypeError, KeyError)):
+        gateway.parse_line(line)
+
+
+def test_bad_messages_are_rejected_without_closing_the_connection():
+    received, flushed, threads = [], [], set()
+
+    def handler(site, sensor, readings, ts):
+        threads.add(threading.get_ident())
+        received.append((site, sensor, readings))
+
+    async def scenario():
+        gateway = SensorGateway(handler, PARAMETERS, flush=lambda: flushed.append(True))
+        await gateway.start(tcp_port=0, udp_port=0)
+        addrs = gateway.addresses()
+        _, writer = await asyncio.open_connection(*addrs["tcp"])
+        writer.write(b'{"site": "s1", "sensor_data": {"PM2.5": 1}, "ts": null}\n'
+                     b'{"site": "s1", "sensor_data": [1]}\n'
+                     b"not,a,reading\n"
+                     b"s1,b,PM2.5,20,1\n"
+                     + gateway.encode_binary(2, 7, "noise_dB", 80.0, 1.0))
+        await writer.drain()
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=addrs["udp"])
+        transport.sendto(b'{"ts": null, "sensor_data": "x"}\ns1,c,PM2.5,5,1\n')
+        await asyncio.sleep(0.2)
+        transport.close()
+        writer.close()
+        await gateway.stop()
+        return gateway.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert sorted(r[1] for r in received) == ["7", "b", "c", "default"]
+    assert metrics["sites"]["_unknown"]["rejected"] == 3
+    assert metrics["sites"]["s1"]["processed"] == 3
+    assert flushed == [True]
+    assert threading.get_ident() not in threads
+
+
+def test_handler_errors_are_counted_per_site():
+    def handler(site, sensor, readings, ts):
+        raise OSError("disk full")
+
+    async def scenario():
+        gateway = SensorGateway(handler, PARAMETERS, policy="drop_newest")
+        await gateway.start(tcp_port=None)
+        gateway._offer_nowait(("s1", "a", {"PM2.5": 1.0}, 0.0))
+        await gateway.stop()
+        return gateway.metrics()
+
+    assert asyncio.run(scenario())["sites"]["s1"]["errors"] == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        SensorGateway(lambda *args: None, PARAMETERS, policy="spill")
@@ -0,0 +1,25 @@
+from utils.tiling import choose_tile_size, make_tiles, nms
+
+
+def test_small_images_are_not_tiled():
+    assert choose_tile_size(640, 480) is None
+    assert choose_tile_size(4000, 3000) >= 640
+
+
+def test_tiles_cover_the_image_with_overlap():
+    tiles = make_tiles(2000, 1000, 800, overlap=0.2)
+    assert tiles[0] == (0, 0, 800, 800)
+    assert max(x1 for _, _, x1, _ in tiles) == 2000 and max(y1 for _, _, _, y1 in tiles) == 1000
+    assert all(x1 - x0 == 800 and y1 - y0 == 800 for x0, y0, x1, y1 in tiles)
+
+
+def test_nms_merges_border_fragments_per_class():
+    boxes = [[0, 0, 100, 100], [50, 0, 100, 100], [0, 0, 100, 100]]
+    keep = nms(boxes, [0.9, 0.6, 0.8], [0, 0, 1])
+    assert sorted(keep.tolist()) == [0, 2]
+    # Classic IoU keeps the half box that only overlaps by half
+    assert sorted(nms(boxes, [0.9, 0.6, 0.8], [0, 0, 1], metric="iou").tolist()) == [0, 1, 2]
+
+
+def test_nms_without_boxes():
+    assert nms([], [], []).size == 0
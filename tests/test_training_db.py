@@ -0,0 +1,47 @@
+import pytest
+
+from utils.training_db import TrainingRecordStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrainingRecordStore(str(tmp_path / "training.db"), pool_size=2)
+    store.upsert([
+        (f"w{i}", f"Worker {i}", "rigger" if i % 2 else "welder", "working_at_height",
+         "2020-01-01", f"2024-0{1 + i % 5}-01", "north" if i < 5 else "south")
+        for i in range(10)
+    ])
+    return store
+
+
+def test_expired_pages_follow_expiry_order_without_gaps(store):
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.expired_certifications(as_of="2024-04-15", limit=3, cursor=cursor)
+        seen += page
+        if cursor is None:
+            break
+    dates = [r["expiry_date"] for r in seen]
+    assert dates == sorted(dates) and len(seen) == 8
+    assert len({r["worker_id"] for r in seen}) == 8
+
+
+def test_filters_are_applied_in_sql(store):
+    records, cursor = store.expired_certifications(as_of="2025-01-01", role="rigger", site="north")
+    assert {r["worker_id"] for r in records} == {"w1", "w3"} and cursor is None
+    records, _ = store.expiring_between("2024-02-01", "2024-03-01")
+    assert {r["worker_id"] for r in records} == {"w1", "w6"}
+
+
+def test_records_paginate_by_insertion(store):
+    first, cursor = store.records(limit=4)
+    second, _ = store.records(limit=4, cursor=cursor)
+    assert [r["worker_id"] for r in first + second] == [f"w{i}" for i in range(8)]
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "2024-01-01|x"])
+def test_malformed_cursors_are_rejected(store, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        store.expired_certifications(as_of="2025-01-01", cursor=cursor)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        store.records(cursor=cursor)
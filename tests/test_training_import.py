@@ -0,0 +1,65 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils.training_db import TrainingRecordStore, dedupe_certificates
+from utils.training_import import _normalize_dates, import_training_records, normalize_chunk
+
+
+def test_dates_keep_month_for_iso_datetimes_and_read_text_day_first():
+    series = pd.Series(["2024-01-02", "2024-01-02 00:00:00", "2024-01-02T08:30:00",
+                        "2024/01/02", "02/01/2024", "31/12/2025", "not a date", None], dtype=object)
+    assert _normalize_dates(series).tolist()[:6] == [
+        "2024-01-02", "2024-01-02", "2024-01-02", "2024-01-02", "2024-01-02", "2025-12-31"]
+    assert _normalize_dates(series)[6:].isna().all()
+
+
+def test_normalize_chunk_rejects_incomplete_rows_and_keeps_last_duplicate():
+    chunk = pd.DataFrame({
+        "Worker ID": ["w1", "w2", "w1", ""],
+        "Cert Type": ["First Aid", "LOTO", "First Aid", "LOTO"],
+        "Expiry Date": ["2024-01-01", "bad", "2025-06-30", "2025-01-01"],
+    }, dtype=str)
+    clean, rejected = normalize_chunk(chunk)
+    assert rejected == 2
+    assert clean[["worker_id", "expiry_date"]].values.tolist() == [["w1", "2025-06-30"]]
+
+
+def test_normalize_chunk_requires_key_columns():
+    with pytest.raises(ValueError, match="Missing required columns"):
+        normalize_chunk(pd.DataFrame({"worker_id": ["w1"], "cert_type": ["LOTO"]}))
+
+
+def test_import_upserts_renewals(tmp_path):
+    path = tmp_path / "hr.csv"
+    path.write_text("worker_id,cert_type,expiry_date,role\n"
+                    "w1,LOTO,2024-01-02 00:00:00,electrician\n"
+                    "w2,LOTO,15/03/2025,electrician\n")
+    db = str(tmp_path / "training.db")
+    stats = import_training_records(str(path), db_path=db)
+    assert stats["rows_upserted"] == 2
+
+    path.write_text("worker_id,cert_type,expiry_date\nw1,LOTO,2026-01-02\n")
+    import_training_records(str(path), db_path=db)
+    records, _ = TrainingRecordStore(db).records()
+    assert {(r["worker_id"], r["expiry_date"]) for r in records} == {("w1", "2026-01-02"), ("w2", "2025-03-15")}
+
+
+def test_store_refuses_duplicates_until_deduped(tmp_path):
+    db = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE training_records (worker_id TEXT, name TEXT, role TEXT, cert_type TEXT, "
+                 "issued_date TEXT, expiry_date TEXT, site TEXT)")
+    conn.executemany("INSERT INTO training_records (worker_id, cert_type, expiry_date) VALUES (?, ?, ?)",
+                     [("w1", "LOTO", "2023-01-01"), ("w1", "LOTO", "2024-01-01"), ("w2", "LOTO", "2024-01-01")])
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(ValueError, match="duplicated"):
+        TrainingRecordStore(db)
+    assert sqlite3.connect(db).execute("SELECT COUNT(*) FROM training_records").fetchone()[0] == 3
+
+    assert dedupe_certificates(db) == 1
+    records, _ = TrainingRecordStore(db).records(worker_id="w1")
+    assert [r["expiry_date"] for r in records] == ["2024-01-01"]
@@ -0,0 +1,106 @@
+import asyncio
+import re
+import sqlite3
+from types import SimpleNamespace
+
+from adk_local import SimpleLLM
+from utils.translation_memory import TranslationMemory, make_batches, parse_numbered, translate_segments
+
+
+class FakeLLM:
+    """Numbered replies; `broken` lines get an error reply, `merge` breaks every batch prompt."""
+
+    def __init__(self, broken=(), merge=False, fail=False, echo=(), model=None):
+        self.broken, self.merge, self.fail, self.echo = set(broken), merge, fail, set(echo)
+        self.prompts = 0
+        if model:
+            self.model = model
+
+    async def complete(self, prompt):
+        self.prompts += 1
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        lines = re.findall(r"^(\d+)\. (.*)$", prompt, re.M)
+        if self.merge and len(lines) > 1:
+            return SimpleNamespace(text="All lines translated.")
+        if any(text in self.broken for _, text in lines):
+            return SimpleNamespace(text="Error: quota exceeded")
+        return SimpleNamespace(text="\n".join(f"{n}. {text}" if text in self.echo else f"{n}. fr:{text}"
+                                               for n, text in lines))
+
+
+def test_segments_are_deduplicated_and_served_from_memory(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.db"))
+    llm = FakeLLM()
+    segments = ["Wear a Hard Hat", "wear a  hard hat", "Check the harness"]
+    translations, stats = asyncio.run(translate_segments(segments, ["French"], llm=llm, memory=memory))
+    assert translations["French"] == {"wear a hard hat": "fr:Wear a Hard Hat",
+                                      "check the harness": "fr:Check the harness"}
+    assert (stats["unique_segments"], stats["misses"], stats["prompts"], stats["failed"]) == (2, 2, 1, 0)
+
+    again, stats = asyncio.run(translate_segments(segments, ["French"], llm=llm, memory=memory))
+    assert again == translations and stats["hit_rate"] == 1.0 and llm.prompts == 1
+
+
+def test_unparsed_replies_are_never_stored(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.db"))
+    llm = FakeLLM(broken={"Lock out the panel"}, merge=True)
+    segments = ["Lock out the panel", "Clear the area"]
+    translations, stats = asyncio.run(translate_segments(segments, ["French"], llm=llm, memory=memory))
+    assert translations["French"] == {"clear the area": "fr:Clear the area"}
+    assert stats["failed"] == 1 and stats["untranslated"] == {"French": ["Lock out the panel"]}
+    assert memory.lookup(["lock out the panel", "clear the area"], "French", "FakeLLM") == {
+        "clear the area": "fr:Clear the area"}
+
+
+def test_failed_calls_leave_segments_untranslated(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.db"))
+    translations, stats = asyncio.run(translate_segments(["Clear the area"], ["French", "Spanish"],
+                                                         llm=FakeLLM(fail=True), memory=memory))
+    assert translations == {"French": {}, "Spanish": {}}
+    assert stats["failed"] == 2 and stats["prompts"] == 2
+    assert memory.lookup(["clear the area"], "French", "FakeLLM") == {}
+
+
+def test_batches_and_numbered_parsing():
+    assert make_batches(["a" * 10] * 5, max_chars=25) == [["a" * 10] * 2] * 2 + [["a" * 10]]
+    assert parse_numbered("1. un\n2) deux", 2) == ["un", "deux"]
+    assert parse_numbered("1. un", 2) is None
+
+
+def test_echoed_source_lines_are_not_translations(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.db"))
+    llm = FakeLLM(echo={"Wear your helmet at all times."})
+    segments = ["Wear your helmet at all times.", "Clear the area"]
+    translations, stats = asyncio.run(translate_segments(segments, ["French"], llm=llm, memory=memory))
+    assert translations["French"] == {"clear the area": "fr:Clear the area"}
+    assert stats["untranslated"] == {"French": ["Wear your helmet at all times."]}
+
+
+def test_stub_llm_output_is_never_stored(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.db"))
+    translations, stats = asyncio.run(translate_segments(["Clear the area"], ["French"], llm=SimpleLLM(),
+                                                         memory=memory))
+    assert translations["French"]["clear the area"].startswith("[Stub]") and stats["prompts"] == 0
+    assert memory.conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0] == 0
+
+
+def test_memory_is_keyed_by_model(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.db"))
+    asyncio.run(translate_segments(["Clear the area"], ["French"], llm=FakeLLM(model="model-a"), memory=memory))
+    other = FakeLLM(model="model-b")
+    _, stats = asyncio.run(translate_segments(["Clear the area"], ["French"], llm=other, memory=memory))
+    assert stats["hits"] == 0 and other.prompts == 1
+
+
+def test_unkeyed_memories_are_migrated_but_not_served(tmp_path):
+    path = str(tmp_path / "tm.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE translation_memory (segment TEXT, language TEXT, translation TEXT, "
+                 "hits INTEGER DEFAULT 0, created_at TEXT, PRIMARY KEY (segment, language))")
+    conn.execute("INSERT INTO translation_memory VALUES ('clear the area', 'French', 'Clear the area', 0, '')")
+    conn.commit()
+    conn.close()
+    memory = TranslationMemory(path)
+    assert memory.lookup(["clear the area"], "French", "FakeLLM") == {}
+    assert memory.lookup(["clear the area"], "French", "unknown") == {"clear the area": "Clear the area"}
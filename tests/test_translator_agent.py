@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from adk_local import RuntimeContext
+from agents import translator_agent
+from utils import translation_memory
+from utils.translation_memory import TranslationMemory
+
+
+class FailingLLM:
+    model = "failing"
+
+    async def complete(self, prompt):
+        if "Clear the area" in prompt and "Wear" in prompt:
+            return SimpleNamespace(text="merged")  # forces per-line retries
+        if "Clear the area" in prompt:
+            raise RuntimeError("quota exceeded")
+        return SimpleNamespace(text="1. Portez le casque")
+
+
+@pytest.fixture(autouse=True)
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation_memory, "_memory", TranslationMemory(str(tmp_path / "tm.db")))
+
+
+def run(task):
+    context = RuntimeContext(task, llm=FailingLLM())
+    asyncio.run(translator_agent.TranslationAgent().run(context))
+    return context.output
+
+
+def test_text_and_file_input_answer_with_the_same_keys(tmp_path):
+    path = tmp_path / "lines.csv"
+    path.write_text("line\nWear the helmet\nClear the area\n")
+    text = run({"text": "Wear the helmet\nClear the area", "languages": ["French"]})
+    from_file = run({"file": str(path), "languages": ["French"]})
+    assert text.keys() == from_file.keys()
+    assert text["status"] == from_file["status"] == "partial"
+    assert from_file["translations"]["French"] == ["Portez le casque", ""]
+
+
+def test_missing_file_content_fails():
+    assert run({"text": ""})["status"] == "failed"
@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+import pytest
+
+from utils.video_inspection import FrameDeduplicator, ViolationTracker, dhash, iter_sampled_frames, video_info
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("no MJPG encoder in this OpenCV build")
+    for i in range(30):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[:, : 2 * i + 2] = 255
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_frames_are_sampled_at_the_requested_rate(video):
+    frames = list(iter_sampled_frames(video, sample_fps=2))
+    assert [index for index, _, _ in frames] == [0, 5, 10, 15, 20, 25]
+    assert frames[1][1] == pytest.approx(0.5)
+    assert video_info(video)["frame_count"] == 30
+
+
+def test_missing_video_raises(tmp_path):
+    with pytest.raises(ValueError, match="Could not open video"):
+        list(iter_sampled_frames(str(tmp_path / "missing.mp4")))
+
+
+def test_near_identical_frames_are_skipped():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    dedupe = FrameDeduplicator(max_distance=4)
+    dedupe.add(dhash(frame))
+    assert not dedupe.is_new(dhash(np.clip(frame.astype(int) + 2, 0, 255).astype(np.uint8)))
+    assert dedupe.is_new(dhash(frame[::-1, ::-1]))
+
+
+def test_tracker_merges_overlapping_detections():
+    tracker = ViolationTracker(max_gap_sec=2.0)
+    det = {"label": "no_helmet", "confidence": 0.6, "bbox": [0, 0, 10, 10]}
+    tracker.update(0, 0.0, [det])
+    tracker.update(10, 1.0, [dict(det, confidence=0.9, bbox=[1, 1, 11, 11])])
+    tracker.update(50, 5.0, [det])  # after the gap: a new track
+    assert [(t["hits"], t["max_confidence"]) for t in tracker.tracks] == [(2, 0.9), (1, 0.6)]
@@ -2,77 +2,234 @@ import os
 import mimetypes
 import pandas as pd
 
-def load_data(file_name, columns=None, sheet_name=None, chunk_size=None):
+def _resolve_path(file_name):
     file_path = os.path.join('data', file_name) if not os.path.isabs(file_name) else file_name
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    mime, _ = mimetypes.guess_type(file_path)
-    ext = os.path.splitext(file_path)[1].lower()
-    result = {}
+    return file_path
 
-    # Metadata extraction
-    result['metadata'] = {
+STREAMING_EXTENSIONS = ['.csv', '.jsonl', '.ndjson', '.txt', '.xlsx', '.xlsm']
+EXCEL_EXTENSIONS = ['.xlsx', '.xlsm', '.xls']
+TABLE_EXTENSIONS = ['.csv', '.json', '.jsonl', '.ndjson'] + EXCEL_EXTENSIONS
+
+def _metadata(file_path, chunk_size=None):
+    ext = os.path.splitext(file_path)[1].lower()
+    mime, _ = mimetypes.guess_type(file_path)
+    return {
         'file_name': os.path.basename(file_path),
         'size_bytes': os.path.getsize(file_path),
         'mime_type': mime,
-        'extension': ext
+        'extension': ext,
+        'chunk_size': chunk_size,
+        'streamed': bool(chunk_size) and ext in STREAMING_EXTENSIONS
     }
 
-    # CSV
+def _project(df, columns):
+    # Missing columns raise KeyError, whether the frame came from the file or the cache
+    if not columns:
+        return df
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"Columns not found: {missing}")
+    return df[list(columns)]
+
+def _iter_lines(file_path, chunk_size):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = []
+        for line in f:
+            lines.append(line)
+            if len(lines) == chunk_size:
+                yield pd.DataFrame({'text': lines})
+                lines = []
+        if lines:
+            yield pd.DataFrame({'text': lines})
+
+def _iter_excel(file_path, columns, chunk_size, sheet_name, dtype):
+    # openpyxl's read-only mode parses the sheet XML lazily, one row at a time
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        df = pd.read_excel(file_path, usecols=columns, sheet_name=sheet_name or 0, dtype=dtype)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name or 0]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(h) if h is not None else f'column_{i}' for i, h in enumerate(next(rows, ()))]
+        keep = [i for i, h in enumerate(header) if not columns or h in columns]
+        names = [header[i] for i in keep]
+        batch = []
+        for row in rows:
+            batch.append([row[i] if i < len(row) else None for i in keep])
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=names, dtype=dtype)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=names, dtype=dtype)
+    finally:
+        wb.close()
+
+def iter_data(file_name, columns=None, chunk_size=100000, sheet_name=None, dtype=None):
+    """Yield the file as DataFrame chunks of at most chunk_size rows.
+
+    CSV, JSON lines, TXT and .xlsx are read incrementally with the column projection
+    applied by the reader, so memory stays bounded by one chunk. Other formats are
+    loaded whole and then sliced.
+    """
+    file_path = _resolve_path(file_name)
+    ext = os.path.splitext(file_path)[1].lower()
     if ext == '.csv':
+        yield from pd.read_csv(file_path, usecols=columns, chunksize=chunk_size, dtype=dtype)
+        return
+    if ext in ['.jsonl', '.ndjson']:
+        with pd.read_json(file_path, lines=True, chunksize=chunk_size, dtype=dtype) as reader:
+            for chunk in reader:
+                yield _project(chunk, columns)
+        return
+    if ext == '.txt':
+        yield from _iter_lines(file_path, chunk_size)
+        return
+    if ext in ['.xlsx', '.xlsm']:
+        yield from _iter_excel(file_path, columns, chunk_size, sheet_name, dtype)
+        return
+    result = load_data(file_name, columns=columns, sheet_name=sheet_name)
+    if 'error' in result:
+        raise ValueError(result['error'])
+    df = result['data']
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def load_preview(file_name, rows=1000, columns=None, sheet_name=None):
+    """Like load_data, but 'data' is only the first `rows` rows, read without loading the rest."""
+    file_path = _resolve_path(file_name)
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in STREAMING_EXTENSIONS:
+        result = load_data(file_name, columns=columns, sheet_name=sheet_name)
+        if 'data' in result and isinstance(result['data'], pd.DataFrame):
+            result['data'] = result['data'].head(rows)
+        return result
+    chunks = iter_data(file_name, columns=columns, chunk_size=rows, sheet_name=sheet_name)
+    try:
+        data = next(chunks, None)
+    finally:
+        chunks.close()
+    result = {'metadata': _metadata(file_path, rows)}
+    result['data'] = data if data is not None else pd.DataFrame()
+    return result
+
+def _read_table(file_path, ext, columns, sheet_name):
+    # The readers skip unwanted columns; _project then checks for missing ones
+    usecols = (lambda c, wanted=set(columns): c in wanted) if columns else None
+    if ext == '.csv':
+        return _project(pd.read_csv(file_path, usecols=usecols), columns)
+    if ext in EXCEL_EXTENSIONS:
+        return _project(pd.read_excel(file_path, usecols=usecols, sheet_name=sheet_name or 0), columns)
+    if ext == '.json':
+        return _project(pd.read_json(file_path), columns)
+    return _project(pd.read_json(file_path, lines=True), columns)
+
+def _optimize_chunks(chunks):
+    from utils.dtype_optimizer import optimize_dtypes
+    for chunk in chunks:
+        yield optimize_dtypes(chunk)[0]
+
+def load_data(file_name, columns=None, sheet_name=None, chunk_size=None, use_cache=True,
+              pages=None, extract_tables=False, optimize=False):
+    """Load a file into result['data'] (a DataFrame), with metadata and any PDF tables.
+
+    With chunk_size, result['data'] is instead a generator of DataFrame chunks
+    (see iter_data); nothing is read until it is iterated. Whole-file loads of tabular
+    formats go through utils.data_cache unless use_cache is False. For PDFs, `pages`
+    selects a page range ("1-5,8") and tables are extracted only with extract_tables=True
+    (or later through utils.pdf_extract.extract_pdf_tables). With optimize=True frames get
+    memory-optimized dtypes (utils.dtype_optimizer); the report lands in metadata['dtypes'].
+    """
+    result = _load(file_name, columns, sheet_name, chunk_size, use_cache, pages, extract_tables)
+    if optimize and 'data' in result:
         if chunk_size:
-            reader = pd.read_csv(file_path, usecols=columns, chunksize=chunk_size)
-            result['data'] = next(reader)
+            result['data'] = _optimize_chunks(result['data'])
         else:
-            result['data'] = pd.read_csv(file_path, usecols=columns)
-        return result
-    # Excel
-    elif ext in ['.xlsx', '.xls']:
-        result['data'] = pd.read_excel(file_path, usecols=columns, sheet_name=sheet_name)
+            from utils.dtype_optimizer import optimize_dtypes
+            result['data'], result['metadata']['dtypes'] = optimize_dtypes(result['data'])
+    return result
+
+def _load(file_name, columns, sheet_name, chunk_size, use_cache, pages, extract_tables):
+    file_path = _resolve_path(file_name)
+    ext = os.path.splitext(file_path)[1].lower()
+    result = {'metadata': _metadata(file_path, chunk_size)}
+
+    if chunk_size:
+        if ext not in STREAMING_EXTENSIONS + ['.xls', '.json', '.pdf', '.png', '.jpg', '.jpeg']:
+            result['error'] = f'Unsupported file format: {ext}'
+            return result
+        result['data'] = iter_data(file_name, columns=columns, chunk_size=chunk_size, sheet_name=sheet_name)
         return result
-    # JSON
-    elif ext == '.json':
-        result['data'] = pd.read_json(file_path)
+
+    # Tabular formats, served from the columnar cache when the source is unchanged
+    if ext in TABLE_EXTENSIONS:
+        cache = None
+        if use_cache:
+            from utils.data_cache import cache_key, get_data_cache
+            try:
+                cache = get_data_cache()
+            except ImportError:
+                result['metadata']['cached'] = False  # pyarrow missing: read directly
+        if cache is not None:
+            key = cache_key(file_path, (sheet_name or 0) if ext in EXCEL_EXTENSIONS else None)
+            df = cache.get(key, columns)
+            result['metadata']['cached'] = df is not None
+            if df is None:
+                # Cache the full frame so every later projection is a hit
+                df = _read_table(file_path, ext, None, sheet_name)
+                cache.put(key, df)
+                df = _project(df, columns)
+            result['data'] = df
+        else:
+            result['data'] = _read_table(file_path, ext, columns, sheet_name)
         return result
     # TXT
-    elif ext == '.txt':
+    if ext == '.txt':
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
         result['data'] = pd.DataFrame({'text': lines})
         return result
-    # PDF (text and table extraction)
+    # PDF: page-parallel text, cached per page; tables only when asked for
     elif ext == '.pdf':
+        from utils.pdf_extract import extract_pdf_tables, extract_pdf_text
         try:
-            import pdfplumber
-            with pdfplumber.open(file_path) as pdf:
-                text = '\n'.join(page.extract_text() or '' for page in pdf.pages)
-            result['data'] = pd.DataFrame({'text': [text]})
+            extraction = extract_pdf_text(file_path, pages=pages)
         except ImportError:
+            result['error'] = 'PDF support requires pdfplumber or PyPDF2'
+            return result
+        except ValueError as e:
+            result['error'] = str(e)
+            return result
+        result['data'] = pd.DataFrame({'text': ['\n'.join(text for _, text in extraction['pages'])]})
+        result['metadata']['pdf'] = {k: v for k, v in extraction.items() if k != 'pages'}
+        if extract_tables:
             try:
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    text = '\n'.join(page.extract_text() or '' for page in reader.pages)
-                result['data'] = pd.DataFrame({'text': [text]})
+                result['tables'] = extract_pdf_tables(file_path, pages=pages or 'all')
             except Exception:
-                result['error'] = 'PDF support requires pdfplumber or PyPDF2'
-        # Table extraction
-        try:
-            import camelot
-            tables = camelot.read_pdf(file_path, pages='all')
-            result['tables'] = [t.df for t in tables]
-        except Exception:
-            result['tables'] = []
+                result['tables'] = []
         return result
-    # Images (OCR)
+    # Images (OCR, cached by content hash; use utils.ocr.ocr_images for batches)
     elif ext in ['.png', '.jpg', '.jpeg']:
+        from utils.ocr import ocr_images
         try:
-            import pytesseract
-            from PIL import Image
-            text = pytesseract.image_to_string(Image.open(file_path))
-            result['data'] = pd.DataFrame({'text': [text]})
-        except Exception:
-            result['error'] = 'OCR support requires pytesseract and Pillow'
+            ocr = ocr_images([file_path])
+        except ImportError:
+            result['error'] = 'OCR support requires pytesseract and opencv-python'
+            return result
+        except Exception as e:
+            result['error'] = f'OCR failed: {e}'
+            return result
+        if 'error' in ocr['results'][0]:
+            result['error'] = f"OCR failed: {ocr['results'][0]['error']}"
+            return result
+        result['data'] = pd.DataFrame({'text': [ocr['results'][0]['text']]})
+        result['metadata']['ocr'] = {k: v for k, v in ocr.items() if k != 'results'}
         return result
     else:
         result['error'] = f'Unsupported file format: {ext}'
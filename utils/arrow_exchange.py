@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+import uuid
+import weakref
+
+import pandas as pd
+
+# IPC files not released by their handle are deleted by sweep() once this old
+EXCHANGE_TTL_SECONDS = float(os.getenv("ARROW_EXCHANGE_TTL", 3600))
+SWEEP_INTERVAL_SECONDS = 60
+
+
+def _pa():
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401  (registers pa.ipc)
+    return pa
+
+
+def _as_table(data):
+    pa = _pa()
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    raise TypeError(f"Cannot share {type(data).__name__} as an Arrow table")
+
+
+class ArrowHandle:
+    """Reference to a tabular result, passed between agents instead of serialized rows.
+
+    In-process handles hold the Arrow table itself; `context.call` passes the handle
+    object, so nothing is copied. IPC handles point at an Arrow IPC file that another
+    process memory-maps, so column buffers are paged in on use rather than parsed.
+    `to_dict()` gives a JSON-safe reference (spilling an in-process table to a file first).
+
+    A file written by `spill` is deleted with the handle that wrote it (or by `release`).
+    Once handed out through `to_dict` the reference may outlive the handle, so the file
+    is instead left to `sweep`, which deletes exchange files older than the TTL.
+    Files go to `directory` (default ARROW_EXCHANGE_DIR), whenever they are written.
+    """
+
+    def __init__(self, table=None, path=None, num_rows=None, columns=None, directory=None):
+        self._table = table
+        self.path = path
+        self.directory = directory
+        self._finalizer = None
+        self.num_rows = table.num_rows if table is not None else num_rows
+        self.columns = table.column_names if table is not None else columns
+
+    @property
+    def kind(self):
+        return "memory" if self._table is not None else "ipc"
+
+    def table(self):
+        if self._table is not None:
+            return self._table
+        pa = _pa()
+        # Buffers keep a reference to the map, so the table stays valid after we return
+        return pa.ipc.open_file(pa.memory_map(self.path, "r")).read_all()
+
+    def batches(self):
+        """Record batches one at a time (IPC files are not read past the current batch)."""
+        if self._table is not None:
+            yield from self._table.to_batches()
+            return
+        pa = _pa()
+        reader = pa.ipc.open_file(pa.memory_map(self.path, "r"))
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+    def to_pandas(self):
+        return self.table().to_pandas()
+
+    def spill(self, directory=None):
+        """Write the table to an IPC file so other processes can map it."""
+        if self.path is None:
+            self.path = _write_ipc(self._table, directory or self.directory)
+            self._finalizer = weakref.finalize(self, _remove, self.path)
+        return self
+
+    def release(self):
+        self._table = None
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        if self.path:
+            _remove(self.path)
+
+    def to_dict(self):
+        self.spill()
+        if self._finalizer is not None:
+            self._finalizer.detach()  # the reference may outlive this handle; sweep() cleans up
+        return {"__arrow__": "ipc", "path": self.path, "num_rows": self.num_rows, "columns": self.columns}
+
+    @classmethod
+    def from_dict(cls, ref):
+        return cls(path=ref["path"], num_rows=ref.get("num_rows"), columns=ref.get("columns"))
+
+    def __repr__(self):
+        return f"ArrowHandle({self.kind}, rows={self.num_rows}, columns={self.columns})"
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _exchange_dir(directory=None):
+    return directory or os.getenv("ARROW_EXCHANGE_DIR", "data/.cache/arrow")
+
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+def sweep(directory=None, ttl_seconds=None):
+    """Delete exchange IPC files older than `ttl_seconds` (ARROW_EXCHANGE_TTL); returns the count."""
+    directory = _exchange_dir(directory)
+    cutoff = time.time() - (EXCHANGE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith(".arrow") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _maybe_sweep(directory):
+    # Writers sweep at most once a minute, so abandoned files do not pile up
+    global _last_sweep
+    with _sweep_lock:
+        if time.monotonic() - _last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        _last_sweep = time.monotonic()
+    sweep(directory)
+
+
+def _write_ipc(table, directory=None, max_chunksize=65536):
+    pa = _pa()
+    directory = _exchange_dir(directory)
+    os.makedirs(directory, exist_ok=True)
+    _maybe_sweep(directory)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}.arrow")
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max_chunksize)
+    return path
+
+
+def share(data, cross_process=False, directory=None):
+    """Wrap a DataFrame, Arrow table or record batch in an ArrowHandle.
+
+    pandas frames are converted to Arrow once here; with cross_process the table is also
+    written to an IPC file that receivers memory-map. `directory` is where the file goes,
+    now or when an in-process handle is later spilled by `to_dict()`.
+    """
+    handle = ArrowHandle(_as_table(data), directory=directory)
+    return handle.spill() if cross_process else handle
+
+
+def is_arrow_ref(value):
+    return isinstance(value, ArrowHandle) or (isinstance(value, dict) and "__arrow__" in value)
+
+
+def resolve(value):
+    """The Arrow table behind a handle or handle dict; other values are returned unchanged."""
+    if isinstance(value, dict) and "__arrow__" in value:
+        value = ArrowHandle.from_dict(value)
+    if isinstance(value, ArrowHandle):
+        return value.table()
+    return value
+
+
+def to_frame(value):
+    """A pandas DataFrame from a handle, handle dict, Arrow table, frame or records."""
+    value = resolve(value)
+    if isinstance(value, pd.DataFrame):
+        return value
+    if hasattr(value, "to_pandas"):
+        return value.to_pandas()
+    return pd.DataFrame(value)
+
+
+def jsonify(obj):
+    """Materialize handles, tables and frames as records; for the outer API boundary only."""
+    if isinstance(obj, ArrowHandle):
+        return obj.table().to_pylist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
+    if isinstance(obj, dict):
+        if "__arrow__" in obj:
+            return ArrowHandle.from_dict(obj).table().to_pylist()
+        return {k: jsonify(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [jsonify(v) for v in obj]
+    if hasattr(obj, "to_pylist"):  # pyarrow Table / RecordBatch
+        return obj.to_pylist()
+    return obj
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+
+def cache_key(file_path, sheet_name=None, options=None):
+    """Identity of one parsed source: path, mtime, size, sheet and read options."""
+    st = os.stat(file_path)
+    ident = {
+        "path": os.path.abspath(file_path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sheet": sheet_name,
+        "options": options or {},
+    }
+    return hashlib.sha1(json.dumps(ident, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class DataCache:
+    """Feather copies of parsed source files, evicted least-recently-used by total size.
+
+    Entries hold the whole parsed frame, so any column projection is served from one
+    entry, reading only the requested columns. Files are written under a temp name and
+    renamed, so readers never see a partial entry; a changed source gets a new key and
+    its stale entry ages out. Requires pyarrow.
+    """
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024):
+        if pyarrow is None:
+            raise ImportError("The data cache stores Feather files and requires pyarrow")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.feather")
+
+    def get(self, key, columns=None):
+        """The cached frame (only `columns`, if given), or None on a miss.
+
+        Raises KeyError for columns the cached frame does not have, as a direct read does.
+        """
+        path = self._path(key)
+        try:
+            if columns:
+                with pyarrow.memory_map(path) as source:
+                    names = set(pyarrow.ipc.open_file(source).schema.names)
+                missing = [c for c in columns if c not in names]
+                if missing:
+                    raise KeyError(f"Columns not found: {missing}")
+            df = pd.read_feather(path, columns=columns)
+            os.utime(path)  # mtime doubles as the LRU clock
+        except (OSError, pyarrow.ArrowInvalid):
+            # Absent, evicted meanwhile, or unreadable: parse the source again
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return df
+
+    def put(self, key, df):
+        """Store a frame; returns False when it cannot be stored columnar (e.g. mixed-type columns).
+
+        Frames with non-string column labels (header=None reads, numeric headers) are not
+        stored: Feather keeps only string names, so a warm read would differ from a cold one.
+        """
+        if not all(isinstance(c, str) for c in df.columns):
+            return False
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        frame = df.reset_index(drop=True)
+        try:
+            frame.to_feather(tmp)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        os.replace(tmp, path)
+        self.evict()
+        return True
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(self.root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "format": "feather",
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_data_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DataCache(
+                os.getenv("DATA_CACHE_DIR", "data/.cache/frames"),
+                int(os.getenv("DATA_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+            )
+        return _cache
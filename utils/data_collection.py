@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import time
+
+from utils.advanced_data_loader import TABLE_EXTENSIONS, load_data
+
+COLLECT_EXTENSIONS = TABLE_EXTENSIONS + ['.txt']
+
+
+def collect_dirs():
+    """Directories to scan, from COLLECT_DIRS (os.pathsep separated), default data/."""
+    return [d for d in os.getenv("COLLECT_DIRS", "data").split(os.pathsep) if d]
+
+
+def scan(dirs, extensions=None):
+    """(path, fingerprint) for every matching file under `dirs`, skipping hidden entries."""
+    extensions = set(extensions or COLLECT_EXTENSIONS)
+    found = []
+    stack = list(dirs)
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in extensions:
+                st = entry.stat()
+                found.append((os.path.abspath(entry.path), {"mtime_ns": st.st_mtime_ns, "size": st.st_size}))
+    return sorted(found)
+
+
+class CollectionManifest:
+    """Fingerprints (mtime, size) of files already collected, kept as one JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def changed(self, path, fingerprint):
+        return self.entries.get(path) != fingerprint
+
+    def record(self, path, fingerprint):
+        self.entries[path] = fingerprint
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+async def collect(dirs=None, concurrency=4, extensions=None, force=False, manifest_path=None, **load_options):
+    """Load new or changed files under `dirs` concurrently; returns (frames, stats, manifest).
+
+    Parsing runs in worker threads, at most `concurrency` at a time, so the event loop
+    stays free. `frames` is a list of (path, DataFrame). Fingerprints of the loaded files
+    are recorded in `manifest` but not saved: the caller calls manifest.save() once the
+    frames have been processed, so files whose processing failed are collected again.
+    """
+    start = time.perf_counter()
+    dirs = dirs or collect_dirs()
+    manifest = CollectionManifest(manifest_path or os.getenv(
+        "COLLECT_MANIFEST_PATH", os.path.join("data", ".cache", "collect_manifest.json")))
+    files = await asyncio.to_thread(scan, dirs, extensions)
+    todo = [(p, fp) for p, fp in files if force or manifest.changed(p, fp)]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    frames, errors = [], []
+
+    async def load(path, fingerprint):
+        async with semaphore:
+            try:
+                result = await asyncio.to_thread(load_data, path, **load_options)
+            except Exception as e:
+                result = {"error": str(e)}
+        if "error" in result:
+            errors.append({"path": path, "error": result["error"]})
+        else:
+            frames.append((path, result["data"]))
+            manifest.record(path, fingerprint)
+
+    await asyncio.gather(*(load(p, fp) for p, fp in todo))
+
+    frames.sort(key=lambda item: item[0])
+    elapsed = time.perf_counter() - start
+    loaded_bytes = sum(fp["size"] for p, fp in todo if not manifest.changed(p, fp))
+    return frames, {
+        "dirs": dirs,
+        "files_found": len(files),
+        "files_skipped": len(files) - len(todo),
+        "files_loaded": len(frames),
+        "errors": errors,
+        "bytes_loaded": loaded_bytes,
+        "elapsed_sec": round(elapsed, 3),
+        "files_per_sec": round(len(frames) / elapsed, 1) if elapsed else None,
+        "mb_per_sec": round(loaded_bytes / 2**20 / elapsed, 2) if elapsed else None,
+    }, manifest
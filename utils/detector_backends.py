@@ -0,0 +1,91 @@
+import os
+import threading
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx", "openvino")
+
+
+def _env_flag(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def export_model(weights, backend, int8=False, imgsz=640, calibration_data=None):
+    """Export (once) a PyTorch YOLO checkpoint for CPU inference and return the model path.
+
+    ONNX INT8 uses onnxruntime dynamic weight quantization, which needs no calibration
+    set; OpenVINO INT8 uses Ultralytics' NNCF path and calibrates on `calibration_data`.
+    """
+    from ultralytics import YOLO
+
+    stem = os.path.splitext(weights)[0]
+    if backend == "onnx":
+        fp32_path = stem + ".onnx"
+        if not os.path.exists(fp32_path):
+            fp32_path = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        if not int8:
+            return fp32_path
+        int8_path = stem + ".int8.onnx"
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        return int8_path
+    if backend == "openvino":
+        path = stem + ("_int8_openvino_model" if int8 else "_openvino_model")
+        if not os.path.exists(path):
+            path = YOLO(weights).export(format="openvino", imgsz=imgsz, dynamic=True, int8=int8,
+                                        data=calibration_data or "coco8.yaml")
+        return path
+    raise ValueError(f"Unknown detector backend: {backend}. Choose from: {', '.join(BACKENDS)}")
+
+
+def load_detector(backend=None, weights=None, int8=None, imgsz=640, warmup=True):
+    """Load the inspection detector for the configured backend.
+
+    Defaults come from INSPECTION_BACKEND (torch|onnx|openvino), INSPECTION_WEIGHTS and
+    INSPECTION_INT8. Every backend is returned as an Ultralytics YOLO object, so callers
+    keep using `model(images)` and `result.boxes` unchanged. INT8 is only available for
+    the onnx and openvino backends; asking for it with torch raises ValueError.
+    Each call loads (and warms up) a new model; agents share one through get_detector().
+    """
+    backend, weights, int8 = _resolve(backend, weights, int8)
+    from ultralytics import YOLO
+
+    if backend == "torch":
+        model = YOLO(weights)
+    else:
+        model = YOLO(export_model(weights, backend, int8=int8, imgsz=imgsz), task="detect")
+
+    if warmup:
+        # First call builds the runtime session / graph; pay for it at load time, not on a request
+        model(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), device="cpu", verbose=False)
+    model.backend_name = f"{backend}{'-int8' if int8 else ''}"
+    return model
+
+
+def _resolve(backend, weights, int8):
+    backend = (backend or os.getenv("INSPECTION_BACKEND", "torch")).lower()
+    weights = weights or os.getenv("INSPECTION_WEIGHTS", "yolov5s.pt")
+    int8 = _env_flag("INSPECTION_INT8") if int8 is None else bool(int8)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend}. Choose from: {', '.join(BACKENDS)}")
+    if int8 and backend == "torch":
+        raise ValueError("INT8 needs the onnx or openvino backend; set INSPECTION_BACKEND "
+                         "or unset INSPECTION_INT8 to run the torch model in FP32")
+    return backend, weights, int8
+
+
+_detectors = {}
+_detectors_lock = threading.Lock()
+
+
+def get_detector(backend=None, weights=None, int8=None, imgsz=640):
+    """The process-wide warmed-up detector for a configuration, loaded on first use."""
+    key = (*_resolve(backend, weights, int8), imgsz)
+    with _detectors_lock:
+        if key not in _detectors:
+            _detectors[key] = load_detector(*key[:3], imgsz=imgsz)
+        return _detectors[key]
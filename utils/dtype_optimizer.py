@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+
+SAMPLE_ROWS = 10000
+
+
+def memory_mb(df):
+    return round(float(df.memory_usage(deep=True).sum()) / 2**20, 2)
+
+
+def _low_cardinality(series, max_ratio):
+    # A sample that is already mostly distinct (ids, free text) skips the full nunique pass
+    if len(series) > SAMPLE_ROWS and series.iloc[:SAMPLE_ROWS].nunique(dropna=True) > max_ratio * SAMPLE_ROWS:
+        return False
+    return series.nunique(dropna=True) <= max_ratio * len(series)
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _is_pure_text(series):
+    # Object columns mixing strings with numbers or other objects are left as they are
+    if not pd.api.types.is_object_dtype(series.dtype):
+        return True
+    return pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+
+
+def _arrow_strings_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def optimize_dtypes(df, max_category_ratio=0.5, downcast_ints=False, downcast_floats=False, arrow_strings=True):
+    """Shrink a frame's memory: categoricals for repetitive text, smaller numeric types.
+
+    Text columns holding only strings, with distinct values at most `max_category_ratio`
+    of the rows, become categoricals; other string columns become Arrow-backed strings
+    when pyarrow is installed.
+
+    Numeric downcasts are opt-in. With downcast_ints, integers get the smallest type
+    holding their current range (e.g. uint8), so later arithmetic on them can overflow
+    silently: widen before computing (see process_frame). With downcast_floats, floats
+    become float32 and lose precision.
+    Returns (frame, report) with memory before and after and the converted columns.
+    """
+    before = memory_mb(df)
+    use_arrow = arrow_strings and _arrow_strings_available()
+    changes = {}
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        old = str(series.dtype)
+        if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if _is_text(series):
+            if not _is_pure_text(series):
+                continue
+            try:
+                if len(series) and _low_cardinality(series, max_category_ratio):
+                    series = series.astype("category")
+                elif use_arrow and getattr(series.dtype, "storage", None) != "pyarrow":
+                    series = series.astype("string[pyarrow]")
+            except TypeError:
+                continue  # unhashable objects (lists, dicts) stay as they are
+        elif pd.api.types.is_integer_dtype(series.dtype) and downcast_ints:
+            kind = "unsigned" if len(series) and series.min() >= 0 else "integer"
+            series = pd.to_numeric(series, downcast=kind)
+        elif pd.api.types.is_float_dtype(series.dtype) and downcast_floats:
+            series = pd.to_numeric(series, downcast="float")
+        if str(series.dtype) != old:
+            columns[name] = series
+            changes[name] = f"{old} -> {series.dtype}"
+    if columns:
+        df = df.assign(**columns)
+    after = memory_mb(df)
+    return df, {
+        "memory_before_mb": before,
+        "memory_after_mb": after,
+        "reduction_pct": round(100 * (1 - after / before), 1) if before else 0.0,
+        "converted": changes,
+    }
+
+
+def normalize_categories(series):
+    """lower().strip() a categorical through its categories, merging ones that collide.
+
+    Only string categories are cleaned; numbers and other values are kept as they are.
+    """
+    cleaned = pd.Index([c.lower().strip() if isinstance(c, str) else c for c in series.cat.categories],
+                       dtype=object)
+    # factorize, unlike np.unique, does not sort, so mixed-type categories are fine
+    inverse, merged = pd.factorize(cleaned)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, inverse[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=merged), index=series.index, name=series.name)
+
+
+def concat_frames(frames):
+    """pd.concat for chunks of one table, keeping categorical columns categorical.
+
+    Each chunk builds its own categories, and pd.concat falls back to object when they
+    differ; the categories are unioned into one shared dtype first.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    categorical = {name for frame in frames for name, dtype in frame.dtypes.items()
+                   if isinstance(dtype, pd.CategoricalDtype)}
+    if categorical:
+        frames = list(frames)
+        for name in categorical:
+            parts = [frame[name] if isinstance(frame[name].dtype, pd.CategoricalDtype)
+                     else frame[name].astype("category") for frame in frames if name in frame]
+            categories = parts[0].cat.categories
+            for part in parts[1:]:
+                categories = categories.append(part.cat.categories)
+            shared = pd.CategoricalDtype(categories.unique())
+            frames = [frame.assign(**{name: frame[name].astype(shared)}) if name in frame else frame
+                      for frame in frames]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,202 @@
+import json
+import os
+import zlib
+
+from utils.environmental_batch import VALID_MAX, VALID_MIN
+from utils.logger import logger
+
+LEVEL_CLEAR, LEVEL_PRE_WARNING, LEVEL_VIOLATION = 0, 1, 2
+LEVEL_NAMES = {LEVEL_CLEAR: "clear", LEVEL_PRE_WARNING: "pre-warning", LEVEL_VIOLATION: "violation"}
+
+SNAPSHOT_VERSION = 1
+
+# Per-key state: [level, pending_level, pending_since, raised_at, last_alert_at]
+_LEVEL, _PENDING, _PENDING_SINCE, _RAISED_AT, _LAST_ALERT = range(5)
+
+
+class AlertTracker:
+    """Hysteresis and deduplication for threshold alerts, per (site, sensor, parameter).
+
+    A level is entered when the value crosses its limit and left only once the value
+    falls below the limit minus the hysteresis band. Changes must persist for the hold
+    time before they count. Only transitions (raised, escalated, cleared) and periodic
+    re-alerts for still-active alerts produce events; each update is O(1). Readings
+    outside the plausible range are faulty, not threshold breaches, and are skipped.
+
+    `save` appends only the states changed since the previous save to a journal next to
+    the snapshot, and folds the journal into a fresh snapshot every `compact_every` saves.
+    `load` replays the journal up to the first torn record and cuts the file there, so
+    later saves append after the last intact record.
+    """
+
+    def __init__(self, thresholds, pre_warning_ratio=0.9, hysteresis=0.05,
+                 raise_hold_seconds=0, clear_hold_seconds=60, realert_seconds=3600, compact_every=1000):
+        self.thresholds = dict(thresholds)
+        self.pre_warning_ratio = pre_warning_ratio
+        self.hysteresis = hysteresis
+        self.raise_hold_seconds = raise_hold_seconds
+        self.clear_hold_seconds = clear_hold_seconds
+        self.realert_seconds = realert_seconds
+        self.compact_every = compact_every
+        self._states = {}
+        self._dirty = set()  # keys changed (or dropped) since the last save
+        self._journal_records = 0
+
+    def _observed_level(self, value, threshold, current):
+        band = 1 - self.hysteresis
+        if value > threshold or (current >= LEVEL_VIOLATION and value >= threshold * band):
+            return LEVEL_VIOLATION
+        pre = threshold * self.pre_warning_ratio
+        if value > pre or (current >= LEVEL_PRE_WARNING and value >= pre * band):
+            return LEVEL_PRE_WARNING
+        return LEVEL_CLEAR
+
+    def update(self, site, sensor, parameter, value, ts):
+        """Feed one reading; returns a (possibly empty) list of alert events."""
+        threshold = self.thresholds.get(parameter)
+        if threshold is None or not isinstance(value, (int, float)) or isinstance(value, bool) \
+                or not (VALID_MIN <= value <= VALID_MAX):
+            return []
+        key = (site, sensor, parameter)
+        state = self._states.get(key)
+        before = None if state is None else list(state)
+        if state is None:
+            state = [LEVEL_CLEAR, LEVEL_CLEAR, ts, None, None]
+            self._states[key] = state
+
+        level = state[_LEVEL]
+        observed = self._observed_level(value, threshold, level)
+        events = []
+        if observed == level:
+            state[_PENDING] = level
+            if level > LEVEL_CLEAR and ts - state[_LAST_ALERT] >= self.realert_seconds:
+                state[_LAST_ALERT] = ts
+                events.append(self._event("realert", key, level, level, value, threshold, ts, state))
+        else:
+            if state[_PENDING] != observed:
+                state[_PENDING] = observed
+                state[_PENDING_SINCE] = ts
+            hold = self.raise_hold_seconds if observed > level else self.clear_hold_seconds
+            if ts - state[_PENDING_SINCE] >= hold:
+                state[_LEVEL] = observed
+                if observed > level:
+                    kind = "raised" if level == LEVEL_CLEAR else "escalated"
+                    if level == LEVEL_CLEAR:
+                        state[_RAISED_AT] = ts
+                    state[_LAST_ALERT] = ts
+                    events.append(self._event(kind, key, level, observed, value, threshold, ts, state))
+                elif observed == LEVEL_CLEAR:
+                    events.append(self._event("cleared", key, level, observed, value, threshold, ts, state))
+                    state[_RAISED_AT] = state[_LAST_ALERT] = None
+                # violation -> pre-warning keeps the alert open without a new event
+
+        if state[_LEVEL] == LEVEL_CLEAR and state[_PENDING] == LEVEL_CLEAR:
+            # Quiet keys carry no information; dropping them keeps memory and snapshots small.
+            del self._states[key]
+            if before is not None:
+                self._dirty.add(key)
+        elif state != before:
+            self._dirty.add(key)
+        return events
+
+    def update_many(self, site, sensor, readings, ts):
+        events = []
+        for parameter, value in readings.items():
+            events.extend(self.update(site, sensor, parameter, value, ts))
+        return events
+
+    @staticmethod
+    def _event(kind, key, previous, level, value, threshold, ts, state):
+        site, sensor, parameter = key
+        return {
+            "type": kind,
+            "site": site,
+            "sensor": sensor,
+            "parameter": parameter,
+            "level": LEVEL_NAMES[level],
+            "previous_level": LEVEL_NAMES[previous],
+            "value": value,
+            "threshold": threshold,
+            "timestamp": ts,
+            "active_since": state[_RAISED_AT],
+        }
+
+    def active(self):
+        return [
+            {"site": site, "sensor": sensor, "parameter": parameter,
+             "level": LEVEL_NAMES[state[_LEVEL]], "active_since": state[_RAISED_AT]}
+            for (site, sensor, parameter), state in self._states.items()
+            if state[_LEVEL] > LEVEL_CLEAR
+        ]
+
+    def snapshot(self):
+        """Compact, versioned bytes holding every non-quiet alert state."""
+        rows = [[site, sensor, parameter] + state for (site, sensor, parameter), state in self._states.items()]
+        payload = json.dumps({"v": SNAPSHOT_VERSION, "states": rows}, separators=(",", ":"))
+        return zlib.compress(payload.encode("utf-8"))
+
+    def restore(self, data):
+        payload = json.loads(zlib.decompress(data).decode("utf-8"))
+        if payload.get("v") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported alert snapshot version: {payload.get('v')}")
+        self._states = {(row[0], row[1], row[2]): list(row[3:]) for row in payload["states"]}
+        self._dirty.clear()
+
+    def save(self, path):
+        journal = path + ".journal"
+        if self._journal_records >= self.compact_every or not os.path.exists(path):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.snapshot())
+            os.replace(tmp, path)
+            # The snapshot already holds every journaled change
+            if os.path.exists(journal):
+                os.remove(journal)
+            self._journal_records = 0
+            self._dirty.clear()
+            return
+        if not self._dirty:
+            return
+        changed, cleared = [], []
+        for key in self._dirty:
+            state = self._states.get(key)
+            if state is None:
+                cleared.append(list(key))
+            else:
+                changed.append(list(key) + state)
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"v": SNAPSHOT_VERSION, "states": changed, "cleared": cleared},
+                               separators=(",", ":")) + "\n")
+        self._journal_records += 1
+        self._dirty.clear()
+
+    def load(self, path):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self.restore(f.read())
+        self._journal_records = 0
+        journal = path + ".journal"
+        if not os.path.exists(journal):
+            return
+        intact = 0  # bytes of whole, readable records
+        with open(journal, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated record")
+                    record = json.loads(line)
+                    changed, cleared = record["states"], record["cleared"]
+                except (ValueError, KeyError, TypeError):
+                    break  # a save cut short by a crash; everything before it is intact
+                for row in changed:
+                    self._states[(row[0], row[1], row[2])] = list(row[3:])
+                for site, sensor, parameter in cleared:
+                    self._states.pop((site, sensor, parameter), None)
+                self._journal_records += 1
+                intact += len(line)
+        if intact < os.path.getsize(journal):
+            # Drop the torn tail; otherwise the next record would follow (or join) it and
+            # every later record would be skipped on the next load
+            logger.warning(f"Alert journal {journal}: discarded a torn record after {self._journal_records} records")
+            with open(journal, "r+b") as f:
+                f.truncate(intact)
@@ -0,0 +1,90 @@
+import numpy as np
+
+from utils.environmental_stream import (
+    STATUS_FAULTY, STATUS_NAMES, STATUS_OK, STATUS_PRE_WARNING, STATUS_VIOLATION,
+)
+
+STATUS_MISSING = 4
+BATCH_STATUS_NAMES = {**STATUS_NAMES, STATUS_MISSING: "missing"}
+
+# Same plausible-range check as the single-snapshot path
+VALID_MIN, VALID_MAX = 0, 10000
+
+
+def evaluate_block(values, parameters, thresholds, pre_warning_ratio=0.9):
+    """Status codes for a (site, sensor, parameter, time) block of readings.
+
+    `values` is a float array with NaN for missing readings; `parameters` names the
+    third axis. Returns an int8 array of the same shape (see BATCH_STATUS_NAMES).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 4 or values.shape[2] != len(parameters):
+        raise ValueError("Expected values shaped (site, sensor, parameter, time) matching 'parameters'.")
+    limits = np.array([thresholds.get(p, np.inf) for p in parameters], dtype=np.float64)
+    limits = limits.reshape(1, 1, -1, 1)
+
+    status = np.zeros(values.shape, dtype=np.int8)
+    # Comparisons with NaN are False, so missing readings fall through every mask below.
+    in_range = (values >= VALID_MIN) & (values <= VALID_MAX)
+    status[values > pre_warning_ratio * limits] = STATUS_PRE_WARNING
+    status[values > limits] = STATUS_VIOLATION
+    status[~in_range] = STATUS_FAULTY
+    status[np.isnan(values)] = STATUS_MISSING
+    return status
+
+
+def summarize_block(values, status, parameters, thresholds, recommend=None, sites=None, sensors=None,
+                    timestamps=None, max_flagged=1000):
+    """Counts per parameter and status, plus readable rows for flagged readings only.
+
+    Only the first `max_flagged` flagged readings are turned into dicts and strings;
+    the counts always cover the whole block. `sites`, `sensors` and `timestamps`, when
+    given, label the matching axes and must be at least as long; ValueError otherwise.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    for axis, (name, labels) in enumerate((("sites", sites), ("sensors", sensors))):
+        if labels is not None and len(labels) < status.shape[axis]:
+            raise ValueError(f"'{name}' has {len(labels)} labels for {status.shape[axis]} {name} in the block.")
+    if timestamps is not None and len(timestamps) < status.shape[3]:
+        raise ValueError(f"'timestamps' has {len(timestamps)} labels for {status.shape[3]} readings per sensor.")
+    counts = {}
+    for p, param in enumerate(parameters):
+        codes = np.bincount(status[:, :, p, :].ravel(), minlength=len(BATCH_STATUS_NAMES))
+        counts[param] = {BATCH_STATUS_NAMES[code]: int(n) for code, n in enumerate(codes)}
+
+    flat_flagged = np.flatnonzero(status != STATUS_OK)
+    n_flagged = int(flat_flagged.size)
+    site_idx, sensor_idx, param_idx, time_idx = np.unravel_index(flat_flagged[:max_flagged], status.shape)
+
+    flagged = []
+    for s, n, p, t in zip(site_idx.tolist(), sensor_idx.tolist(), param_idx.tolist(), time_idx.tolist()):
+        param = parameters[p]
+        code = int(status[s, n, p, t])
+        value = values[s, n, p, t]
+        value = None if np.isnan(value) else float(value)
+        if code == STATUS_MISSING:
+            recommendation = f"Provide {param} sensor data."
+        elif code == STATUS_FAULTY:
+            recommendation = f"Check {param} sensor for faulty or out-of-range value: {value}"
+        elif code == STATUS_VIOLATION:
+            recommendation = recommend(param, value) if recommend else f"Take action to reduce {param}."
+        else:
+            recommendation = f"Monitor {param} closely; value is approaching unsafe limit."
+        flagged.append({
+            "site": sites[s] if sites is not None else s,
+            "sensor": sensors[n] if sensors is not None else n,
+            "parameter": param,
+            "time": timestamps[t] if timestamps is not None else t,
+            "value": value,
+            "threshold": thresholds.get(param),
+            "status": BATCH_STATUS_NAMES[code],
+            "recommendation": recommendation,
+        })
+
+    return {
+        "readings": int(status.size),
+        "flagged_count": n_flagged,
+        "flagged_truncated": n_flagged > len(flagged),
+        "counts": counts,
+        "flagged": flagged,
+    }
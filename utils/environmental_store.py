@@ -0,0 +1,324 @@
+import atexit
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from utils.environmental_stream import LOG_SCALE_PARAMS
+
+# 11 bytes per raw reading (a JSON record of the same reading is ~70 bytes).
+# Timestamps are milliseconds since the start of the partition's UTC day.
+RAW_DTYPE = np.dtype([("ms", "<u4"), ("sensor", "<u2"), ("param", "u1"), ("value", "<f4")])
+ROLLUP_DTYPE = np.dtype([
+    ("bucket", "<u4"), ("sensor", "<u2"), ("param", "u1"),
+    ("count", "<u4"), ("min", "<f4"), ("max", "<f4"), ("sum", "<f8"),
+])
+ROLLUPS = {"1m": 60, "1h": 3600}
+DAY_SECONDS = 86400
+
+# Site names become directory names: no separators, no "." or ".." and no hidden entries
+_SITE_NAME = re.compile(r"[\w-][\w .-]{0,127}")
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_start(day):
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def _read(path, dtype):
+    # Memory-mapped, read-only view of an append-only file; nothing is parsed or copied.
+    if not os.path.exists(path):
+        return np.empty(0, dtype=dtype)
+    size = os.path.getsize(path) // dtype.itemsize
+    if size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(size,))
+
+
+def _rollup(records, bucket_seconds):
+    # Group by (bucket, sensor, param) and reduce count/min/max/sum in one sorted pass.
+    buckets = records["ms"] // np.uint32(bucket_seconds * 1000)
+    key = (buckets.astype(np.uint64) << np.uint64(24)) | (records["sensor"].astype(np.uint64) << np.uint64(8)) \
+        | records["param"].astype(np.uint64)
+    order = np.argsort(key, kind="stable")
+    key, values = key[order], records["value"][order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    out = np.empty(starts.size, dtype=ROLLUP_DTYPE)
+    unique = key[starts]
+    out["bucket"] = unique >> np.uint64(24)
+    out["sensor"] = (unique >> np.uint64(8)) & np.uint64(0xFFFF)
+    out["param"] = unique & np.uint64(0xFF)
+    out["count"] = np.diff(np.r_[starts, key.size])
+    out["min"] = np.minimum.reduceat(values, starts)
+    out["max"] = np.maximum.reduceat(values, starts)
+    out["sum"] = np.add.reduceat(values.astype(np.float64), starts)
+    return out
+
+
+def _rollup_key(rows):
+    return (rows["bucket"].astype(np.uint64) << np.uint64(24)) | (rows["sensor"].astype(np.uint64) << np.uint64(8)) \
+        | rows["param"].astype(np.uint64)
+
+
+def _merge_rollups(rows):
+    # Combine rows for the same (bucket, sensor, param); the result is sorted by that key.
+    if rows.size == 0:
+        return rows
+    key = _rollup_key(rows)
+    order = np.argsort(key, kind="stable")
+    key, rows = key[order], rows[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    if starts.size == rows.size:
+        return rows
+    out = rows[starts].copy()
+    out["count"] = np.add.reduceat(rows["count"], starts)
+    out["min"] = np.minimum.reduceat(rows["min"], starts)
+    out["max"] = np.maximum.reduceat(rows["max"], starts)
+    out["sum"] = np.add.reduceat(rows["sum"], starts)
+    return out
+
+
+def _write_rollup(path, rows):
+    """Merge `rows` into a rollup file kept sorted by (bucket, sensor, param), one row per key.
+
+    Only the tail from the earliest bucket in `rows` onwards is read and rewritten; with
+    readings arriving in time order that is the currently open bucket.
+    """
+    existing = _read(path, ROLLUP_DTYPE)
+    start = int(np.searchsorted(existing["bucket"], rows["bucket"].min(), side="left")) if existing.size else 0
+    merged = _merge_rollups(np.concatenate([np.asarray(existing[start:]), rows]))
+    del existing  # release the memory map before the file is changed
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.seek(start * ROLLUP_DTYPE.itemsize)
+        f.write(merged.tobytes())
+        f.truncate()
+
+
+class EnvironmentalStore:
+    """Append-only columnar history of sensor readings.
+
+    Layout: <root>/<site>/<YYYY-MM-DD>/raw.bin plus rollup_1m.bin and rollup_1h.bin,
+    all fixed-width NumPy records that are memory-mapped on read. Sensor names are
+    mapped to small integer ids per site, parameter names to ids per store.
+
+    Readings are buffered and written once `flush_every` are pending or `flush_seconds`
+    have passed since the last write; queries flush first. Rollup files hold exactly one
+    row per (bucket, sensor, parameter): a flush merges into the open bucket's row.
+    """
+
+    def __init__(self, root="data/env_store", flush_every=10000, flush_seconds=5.0):
+        self.root = root
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self._buffered = 0
+        self._flushed_at = time.monotonic()
+        os.makedirs(root, exist_ok=True)
+        self._params = self._load_json(os.path.join(root, "params.json"), [])
+        self._sensors = {}
+
+    @staticmethod
+    def _load_json(path, default):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return default
+
+    @staticmethod
+    def _save_json(path, data):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _site_dir(self, site):
+        if not isinstance(site, str) or not _SITE_NAME.fullmatch(site) or site.strip(" .") == "":
+            raise ValueError(f"Invalid site name: {site!r}")
+        return os.path.join(self.root, site)
+
+    def _site_sensors(self, site):
+        if site not in self._sensors:
+            self._sensors[site] = self._load_json(os.path.join(self._site_dir(site), "sensors.json"), {})
+        return self._sensors[site]
+
+    def _sensor_id(self, site, sensor, create=True):
+        sensors = self._site_sensors(site)
+        sensor = str(sensor)
+        if sensor not in sensors:
+            if not create:
+                return None
+            if len(sensors) >= 0xFFFF:
+                raise ValueError(f"Too many sensors for site {site}")
+            sensors[sensor] = len(sensors)
+            os.makedirs(self._site_dir(site), exist_ok=True)
+            self._save_json(os.path.join(self._site_dir(site), "sensors.json"), sensors)
+        return sensors[sensor]
+
+    def _param_id(self, param, create=True):
+        if param not in self._params:
+            if not create:
+                return None
+            if len(self._params) >= 0xFF:
+                raise ValueError("Too many parameters")
+            self._params.append(param)
+            self._save_json(os.path.join(self.root, "params.json"), self._params)
+        return self._params.index(param)
+
+    def append(self, site, sensor, readings, ts):
+        """Buffer one snapshot ({parameter: value}); non-numeric values are skipped."""
+        items = [(p, v) for p, v in readings.items()
+                 if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)]
+        if not items:
+            return
+        with self._lock:
+            sensor_id = self._sensor_id(site, sensor)
+            buffer = self._buffers.setdefault(site, [])
+            for param, value in items:
+                buffer.append((ts, sensor_id, self._param_id(param), value))
+            self._buffered += len(items)
+            if self._buffered >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        for site, buffer in self._buffers.items():
+            if not buffer:
+                continue
+            ts, sensor, param, value = (np.array(col) for col in zip(*buffer))
+            days = np.floor(ts / DAY_SECONDS).astype(np.int64)
+            for day_number in np.unique(days):
+                mask = days == day_number
+                day = _day(day_number * DAY_SECONDS)
+                records = np.empty(int(mask.sum()), dtype=RAW_DTYPE)
+                records["ms"] = np.round((ts[mask] - day_number * DAY_SECONDS) * 1000).astype(np.uint32)
+                records["sensor"] = sensor[mask]
+                records["param"] = param[mask]
+                records["value"] = value[mask]
+                directory = os.path.join(self._site_dir(site), day)
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, "raw.bin"), "ab") as f:
+                    f.write(records.tobytes())
+                for name, seconds in ROLLUPS.items():
+                    _write_rollup(os.path.join(directory, f"rollup_{name}.bin"), _rollup(records, seconds))
+            buffer.clear()
+        self._buffered = 0
+        self._flushed_at = time.monotonic()
+
+    def _partitions(self, site, start, end):
+        day = datetime.fromtimestamp(start, tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        while day.timestamp() < end:
+            name = day.strftime("%Y-%m-%d")
+            directory = os.path.join(self._site_dir(site), name)
+            if os.path.isdir(directory):
+                yield directory, _day_start(name)
+            day += timedelta(days=1)
+
+    def query(self, site, start, end, sensor=None, parameter=None, resolution="raw"):
+        """Readings (or 1m/1h rollups) for one site in [start, end), as NumPy columns."""
+        self.flush()
+        sensors = self._site_sensors(site)
+        names = {v: k for k, v in sensors.items()}
+        sensor_id = self._sensor_id(site, sensor, create=False) if sensor is not None else None
+        param_id = self._param_id(parameter, create=False) if parameter is not None else None
+        if (sensor is not None and sensor_id is None) or (parameter is not None and param_id is None):
+            return self._columns(np.empty(0, dtype=RAW_DTYPE if resolution == "raw" else ROLLUP_DTYPE),
+                                 np.empty(0), names, resolution)
+
+        parts, offsets = [], []
+        for directory, day_start in self._partitions(site, start, end):
+            if resolution == "raw":
+                rows = _read(os.path.join(directory, "raw.bin"), RAW_DTYPE)
+                ts = day_start + rows["ms"] / 1000.0
+            else:
+                bucket_seconds = ROLLUPS[resolution]
+                rows = _read(os.path.join(directory, f"rollup_{resolution}.bin"), ROLLUP_DTYPE)
+                ts = day_start + rows["bucket"].astype(np.float64) * bucket_seconds
+            mask = (ts >= start) & (ts < end)
+            if sensor_id is not None:
+                mask &= rows["sensor"] == sensor_id
+            if param_id is not None:
+                mask &= rows["param"] == param_id
+            parts.append(rows[mask])
+            offsets.append(ts[mask])
+        dtype = RAW_DTYPE if resolution == "raw" else ROLLUP_DTYPE
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        ts = np.concatenate(offsets) if offsets else np.empty(0)
+        order = np.argsort(ts, kind="stable")
+        return self._columns(rows[order], ts[order], names, resolution)
+
+    def _columns(self, rows, ts, sensor_names, resolution):
+        # Id -> name through lookup tables, so decoding stays vectorized
+        sensor_lookup = np.empty(max(sensor_names, default=-1) + 1, dtype=object)
+        for sensor_id, name in sensor_names.items():
+            sensor_lookup[sensor_id] = name
+        param_lookup = np.array(self._params + [None], dtype=object)
+        columns = {
+            "ts": ts,
+            "sensor": sensor_lookup[rows["sensor"]],
+            "parameter": param_lookup[rows["param"]],
+        }
+        if resolution == "raw":
+            columns["value"] = rows["value"].astype(np.float64)
+        else:
+            columns["count"] = rows["count"].astype(np.int64)
+            columns["min"] = rows["min"].astype(np.float64)
+            columns["max"] = rows["max"].astype(np.float64)
+            columns["mean"] = rows["sum"] / np.maximum(rows["count"], 1)
+        return columns
+
+    def twa(self, site, sensor, parameter, end=None, hours=8, max_gap_seconds=60):
+        """Time-weighted average over the `hours` before `end`; noise is energy-averaged."""
+        end = datetime.now(tz=timezone.utc).timestamp() if end is None else end
+        window = hours * 3600.0
+        data = self.query(site, end - window, end, sensor=sensor, parameter=parameter)
+        ts, values = data["ts"], data["value"]
+        if ts.size == 0:
+            return None
+        # Each reading covers the time since the previous one, as in the streaming monitor.
+        dt = np.minimum(np.diff(ts, prepend=ts[0]), max_gap_seconds)
+        if parameter in LOG_SCALE_PARAMS:
+            energy = np.sum(10 ** (values / 10) * dt) / window
+            return float(10 * np.log10(energy)) if energy > 0 else 0.0
+        return float(np.sum(values * dt) / window)
+
+    def stats(self, site=None):
+        self.flush()
+        sites = [site] if site else [d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d))]
+        total_bytes = raw_bytes = 0
+        for s in sites:
+            for dirpath, _, files in os.walk(self._site_dir(s)):
+                for name in files:
+                    size = os.path.getsize(os.path.join(dirpath, name))
+                    total_bytes += size
+                    if name == "raw.bin":
+                        raw_bytes += size
+        readings = raw_bytes // RAW_DTYPE.itemsize
+        return {
+            "readings": readings,
+            "bytes_on_disk": total_bytes,
+            "bytes_per_reading": round(total_bytes / readings, 2) if readings else None,
+        }
+
+
+_store = None
+
+
+def get_environmental_store(root=None):
+    global _store
+    if _store is None:
+        _store = EnvironmentalStore(root or os.getenv("ENV_STORE_PATH", "data/env_store"))
+        # Readings still buffered at exit are written rather than lost
+        atexit.register(_store.flush)
+    return _store
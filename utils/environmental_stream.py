@@ -0,0 +1,200 @@
+import math
+import time
+
+import numpy as np
+
+# Parameters whose exposure limits are energy-averaged (decibels) rather than arithmetic.
+LOG_SCALE_PARAMS = {"noise_dB"}
+
+# 8-hour TWA limits; other parameters are only checked against instantaneous thresholds.
+DEFAULT_TWA_LIMITS = {
+    "noise_dB": 85,    # dB(A) 8-hour equivalent level
+    "PM2.5": 35,       # μg/m³
+}
+
+STATUS_OK, STATUS_PRE_WARNING, STATUS_VIOLATION, STATUS_FAULTY = 0, 1, 2, 3
+STATUS_NAMES = {
+    STATUS_OK: "OK",
+    STATUS_PRE_WARNING: "pre-warning",
+    STATUS_VIOLATION: "violation",
+    STATUS_FAULTY: "faulty",
+}
+
+
+class StreamingMonitor:
+    """Incremental exposure metrics for many sensors.
+
+    Every (site, sensor) pair owns one row in a set of fixed-size NumPy arrays:
+    a ring buffer of the last `window` readings per parameter (rolling mean) and a
+    ring of per-bucket exposure integrals covering `twa_hours` (time-weighted average).
+    Both are updated with running sums, so each reading costs O(1).
+    """
+
+    def __init__(self, thresholds, twa_limits=None, window=60, twa_hours=8, bucket_seconds=60,
+                 max_gap_seconds=60, pre_warning_ratio=0.9, capacity=256, alerts=None):
+        self.params = list(thresholds)
+        self.param_index = {p: i for i, p in enumerate(self.params)}
+        self.thresholds = np.array([thresholds[p] for p in self.params], dtype=np.float64)
+        limits = DEFAULT_TWA_LIMITS if twa_limits is None else twa_limits
+        self.twa_limits = np.array([limits.get(p, np.nan) for p in self.params], dtype=np.float64)
+        self.log_scale = np.array([p in LOG_SCALE_PARAMS for p in self.params])
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = int(twa_hours * 3600 // bucket_seconds)
+        self.twa_seconds = float(self.n_buckets * bucket_seconds)
+        self.max_gap_seconds = max_gap_seconds
+        self.pre_warning_ratio = pre_warning_ratio
+        # Optional AlertTracker: threshold alerts then go through its hysteresis and hold
+        # times instead of firing on every status change.
+        self.alerts = alerts
+        self._rows = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        n_params = len(self.params)
+        self.capacity = capacity
+        self._ring = np.zeros((capacity, n_params, self.window), dtype=np.float64)
+        self._ring_pos = np.zeros((capacity, n_params), dtype=np.int64)
+        self._ring_count = np.zeros((capacity, n_params), dtype=np.int64)
+        self._ring_sum = np.zeros((capacity, n_params), dtype=np.float64)
+        self._dose = np.zeros((capacity, n_params, self.n_buckets), dtype=np.float64)
+        self._dose_total = np.zeros((capacity, n_params), dtype=np.float64)
+        self._bucket = np.full((capacity, n_params), -1, dtype=np.int64)
+        self._last_ts = np.full((capacity, n_params), np.nan, dtype=np.float64)
+        self._status = np.zeros((capacity, n_params), dtype=np.int8)
+        self._twa_breached = np.zeros((capacity, n_params), dtype=bool)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in (
+            "_ring", "_ring_pos", "_ring_count", "_ring_sum", "_dose", "_dose_total",
+            "_bucket", "_last_ts", "_status", "_twa_breached")}
+        n = self.capacity
+        self._allocate(n * 2)
+        for name, array in old.items():
+            getattr(self, name)[:n] = array
+
+    def _row(self, site, sensor):
+        key = (site, sensor)
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._rows)
+            if row >= self.capacity:
+                self._grow()
+            self._rows[key] = row
+        return row
+
+    def ingest(self, site, sensor, readings, ts=None):
+        """Add one snapshot ({parameter: value}) and return the breach events it raised."""
+        ts = time.time() if ts is None else float(ts)
+        row = self._row(site, sensor)
+        events = []
+        for param, value in readings.items():
+            i = self.param_index.get(param)
+            if i is None:
+                continue
+            event = self._update(row, i, value, ts)
+            if event:
+                events.extend(dict(e, site=site, sensor=sensor, parameter=param, timestamp=ts) for e in event)
+            if self.alerts is not None:
+                events.extend(self.alerts.update(site, sensor, param, value, ts))
+        return events
+
+    def _update(self, row, i, value, ts):
+        threshold = self.thresholds[i]
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not (0 <= value <= 10000):
+            return self._transition(row, i, STATUS_FAULTY, value, threshold)
+        value = float(value)
+
+        # Rolling mean over the last `window` readings
+        pos = self._ring_pos[row, i]
+        if self._ring_count[row, i] == self.window:
+            self._ring_sum[row, i] -= self._ring[row, i, pos]
+        else:
+            self._ring_count[row, i] += 1
+        self._ring[row, i, pos] = value
+        self._ring_sum[row, i] += value
+        self._ring_pos[row, i] = (pos + 1) % self.window
+
+        # Exposure integral: the reading covers the time since the previous one
+        last_ts = self._last_ts[row, i]
+        dt = 0.0 if math.isnan(last_ts) else min(max(ts - last_ts, 0.0), self.max_gap_seconds)
+        self._last_ts[row, i] = ts
+        bucket = int(ts // self.bucket_seconds)
+        current = self._bucket[row, i]
+        if bucket > current:
+            # Expire buckets that fell out of the TWA window (at most n_buckets of them)
+            for b in range(max(current + 1, bucket - self.n_buckets + 1), bucket + 1):
+                slot = b % self.n_buckets
+                self._dose_total[row, i] -= self._dose[row, i, slot]
+                self._dose[row, i, slot] = 0.0
+            self._bucket[row, i] = bucket
+        exposure = (10 ** (value / 10) if self.log_scale[i] else value) * dt
+        self._dose[row, i, bucket % self.n_buckets] += exposure
+        self._dose_total[row, i] += exposure
+
+        if value > threshold:
+            status = STATUS_VIOLATION
+        elif value > self.pre_warning_ratio * threshold:
+            status = STATUS_PRE_WARNING
+        else:
+            status = STATUS_OK
+        transition = self._transition(row, i, status, value, threshold)
+        # With an AlertTracker attached, threshold alerts come from the tracker instead
+        events = transition if transition and self.alerts is None else []
+
+        limit = self.twa_limits[i]
+        if not math.isnan(limit):
+            twa = self._twa(row, i)
+            breached = twa > limit
+            if breached != self._twa_breached[row, i]:
+                self._twa_breached[row, i] = breached
+                events.append({
+                    "type": "twa_breach" if breached else "twa_cleared",
+                    "value": value,
+                    "twa": round(twa, 2),
+                    "twa_limit": float(limit),
+                })
+        return events
+
+    def _transition(self, row, i, status, value, threshold):
+        # Only status changes produce events; a sensor that stays in violation is quiet.
+        previous = self._status[row, i]
+        if status == previous:
+            return None
+        self._status[row, i] = status
+        return [{
+            "type": "cleared" if status == STATUS_OK else STATUS_NAMES[status],
+            "previous": STATUS_NAMES[int(previous)],
+            "value": value,
+            "threshold": float(threshold),
+            "rolling_mean": self._rolling_mean(row, i),
+        }]
+
+    def _rolling_mean(self, row, i):
+        count = self._ring_count[row, i]
+        return round(float(self._ring_sum[row, i] / count), 3) if count else None
+
+    def _twa(self, row, i):
+        total = max(self._dose_total[row, i], 0.0)
+        if self.log_scale[i]:
+            return 10 * math.log10(total / self.twa_seconds) if total > 0 else 0.0
+        return total / self.twa_seconds
+
+    def metrics(self, site, sensor):
+        """Current rolling mean, TWA and status per parameter for one sensor."""
+        row = self._rows.get((site, sensor))
+        if row is None:
+            return None
+        return {
+            param: {
+                "rolling_mean": self._rolling_mean(row, i),
+                "twa": round(self._twa(row, i), 3),
+                "twa_limit": None if math.isnan(self.twa_limits[i]) else float(self.twa_limits[i]),
+                "status": STATUS_NAMES[int(self._status[row, i])],
+                "twa_breached": bool(self._twa_breached[row, i]),
+            }
+            for param, i in self.param_index.items()
+        }
+
+    def sensors(self):
+        return list(self._rows)
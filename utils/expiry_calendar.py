@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+
+from utils.training_db import RECORD_COLUMNS, get_training_store
+
+NOTIFICATIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS expiry_notifications (
+        worker_id TEXT,
+        cert_type TEXT,
+        expiry_date TEXT,
+        notified_at TEXT,
+        PRIMARY KEY (worker_id, cert_type, expiry_date)
+    )
+"""
+
+_WORKER, _ROLE, _CERT, _EXPIRY, _SITE = (
+    RECORD_COLUMNS.index(c) for c in ("worker_id", "role", "cert_type", "expiry_date", "site")
+)
+
+# Up to this many entries changed in a scope are bisected in place rather than merged
+_SMALL_CHANGE = 16
+
+
+class ExpiryCalendar:
+    """In-memory certification expiry index kept in step with training_records.
+
+    Certificates are held in lists sorted by expiry date, one per (site, role) scope plus
+    the site-only, role-only and global scopes, so "expiring in the next N days" is two
+    bisections and a slice. It loads the table once and then follows the store's upserts;
+    a renewal moves the certificate to its new date.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._scopes = {}   # (site, role) with None as wildcard -> sorted [(expiry, worker_id, cert_type)]
+        self._records = {}  # (worker_id, cert_type) -> row tuple in RECORD_COLUMNS order
+        with store.transaction() as conn:
+            conn.execute(NOTIFICATIONS_SCHEMA)
+        # Listen before loading, with the lock already held: an upsert racing the load waits
+        # on it and is re-applied over the loaded row instead of being loaded a second time.
+        # The store calls listeners under its write lock, so chunks arrive in commit order.
+        with self._lock:
+            store.add_listener(self.apply)
+            # Rows arrive in expiry order (idx_training_expiry), so plain appends stay sorted;
+            # ties on the date are put in (worker_id, cert_type) order by a final sort pass.
+            with store.connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(RECORD_COLUMNS)} FROM training_records "
+                    "WHERE expiry_date IS NOT NULL ORDER BY expiry_date"
+                ).fetchall()
+            for row in rows:
+                self._records[(row[_WORKER], row[_CERT])] = row
+                entry = (row[_EXPIRY], row[_WORKER], row[_CERT])
+                for scope in self._scope_keys(row):
+                    self._scopes.setdefault(scope, []).append(entry)
+            for entries in self._scopes.values():
+                entries.sort()  # near-sorted input: timsort runs in linear time
+
+    @staticmethod
+    def _scope_keys(row):
+        site, role = row[_SITE], row[_ROLE]
+        return {(site, role), (site, None), (None, role), (None, None)}
+
+    def apply(self, rows):
+        """Apply upserted rows (RECORD_COLUMNS tuples); called by the store after commit.
+
+        A chunk is applied per scope in one pass: stale entries are filtered out and the
+        new ones merged in with a single sort, instead of a bisect and insert per row.
+        """
+        latest = {(row[_WORKER], row[_CERT]): row for row in rows}  # last one wins, as in the upsert
+        removed, added = {}, {}
+        with self._lock:
+            for key, row in latest.items():
+                old = self._records.pop(key, None)
+                if old is not None:
+                    entry = (old[_EXPIRY], old[_WORKER], old[_CERT])
+                    for scope in self._scope_keys(old):
+                        removed.setdefault(scope, []).append(entry)
+                if row[_EXPIRY] is None:
+                    continue
+                row = tuple(row)
+                self._records[key] = row
+                entry = (row[_EXPIRY], row[_WORKER], row[_CERT])
+                for scope in self._scope_keys(row):
+                    added.setdefault(scope, []).append(entry)
+            for scope in removed.keys() | added.keys():
+                entries = self._scopes.setdefault(scope, [])
+                stale, new = removed.get(scope, ()), added.get(scope, ())
+                if len(stale) + len(new) <= _SMALL_CHANGE:
+                    # A renewal or two: bisecting beats rebuilding a large scope
+                    for entry in stale:
+                        i = bisect_left(entries, entry)
+                        if i < len(entries) and entries[i] == entry:
+                            del entries[i]
+                    for entry in new:
+                        insort(entries, entry)
+                    continue
+                if stale:
+                    stale = set(stale)
+                    entries[:] = [entry for entry in entries if entry not in stale]
+                entries.extend(new)
+                entries.sort()  # two sorted runs (or a few): timsort merges them in linear time
+
+    def expiring(self, days=30, site=None, role=None, as_of=None, limit=None):
+        """Certificates with as_of <= expiry_date < as_of + days, soonest first."""
+        start = as_of or date.today().isoformat()
+        end = (date.fromisoformat(start) + timedelta(days=days)).isoformat()
+        with self._lock:
+            entries = self._scopes.get((site, role), [])
+            lo = bisect_left(entries, (start,))
+            hi = bisect_left(entries, (end,))
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            rows = [self._records[(worker_id, cert_type)] for _, worker_id, cert_type in entries[lo:hi]]
+        return [dict(zip(RECORD_COLUMNS, row)) for row in rows]
+
+    def count(self, days=30, site=None, role=None, as_of=None):
+        start = as_of or date.today().isoformat()
+        end = (date.fromisoformat(start) + timedelta(days=days)).isoformat()
+        with self._lock:
+            entries = self._scopes.get((site, role), [])
+            return bisect_left(entries, (end,)) - bisect_left(entries, (start,))
+
+    def pending_notifications(self, days=30, site=None, role=None, as_of=None):
+        """Upcoming expiries not yet notified. A renewal has a new date and is notified again."""
+        due = self.expiring(days, site=site, role=role, as_of=as_of)
+        if not due:
+            return []
+        with self.store.connection() as conn:
+            sent = set(conn.execute(
+                "SELECT worker_id, cert_type, expiry_date FROM expiry_notifications WHERE expiry_date >= ?",
+                (due[0]["expiry_date"],)
+            ).fetchall())
+        return [r for r in due if (r["worker_id"], r["cert_type"], r["expiry_date"]) not in sent]
+
+    def mark_notified(self, records):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.store.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO expiry_notifications VALUES (?, ?, ?, ?)",
+                [(r["worker_id"], r["cert_type"], r["expiry_date"], now) for r in records]
+            )
+
+
+async def run_notification_job(calendar, notify, days=30, interval_seconds=86400, site=None, role=None):
+    """Periodically hand newly due expiries to `notify(records)` (sync or async), once each."""
+    while True:
+        pending = calendar.pending_notifications(days, site=site, role=role)
+        if pending:
+            result = notify(pending)
+            if inspect.isawaitable(result):
+                await result
+            calendar.mark_notified(pending)
+        await asyncio.sleep(interval_seconds)
+
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+
+def get_expiry_calendar(db_path="data/training.db"):
+    with _calendars_lock:
+        if db_path not in _calendars:
+            _calendars[db_path] = ExpiryCalendar(get_training_store(db_path))
+        return _calendars[db_path]
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import errno
+import mmap
+import os
+
+import numpy as np
+
+
+def decode_image(source):
+    """Decode an inspection image straight into a BGR uint8 array (the model's input format).
+
+    Accepts a file path (memory-mapped, never read into a Python bytes object), raw
+    bytes / bytearray / memoryview / mmap buffers (wrapped without copying), a base64
+    string, an already-decoded ndarray, or a PIL image. A path that does not exist (and,
+    for a string, is not valid base64 either) raises FileNotFoundError.
+    """
+    import cv2
+
+    if isinstance(source, np.ndarray):
+        return source
+    if hasattr(source, "convert") and hasattr(source, "size"):  # PIL image
+        return np.asarray(source.convert("RGB"))[:, :, ::-1]
+
+    if isinstance(source, (str, os.PathLike)) and os.path.exists(source):
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoded = np.frombuffer(mapped, dtype=np.uint8)
+            image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+            del encoded  # release the buffer export before the map is closed
+    elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        image = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), cv2.IMREAD_COLOR)
+    elif isinstance(source, os.PathLike):
+        raise FileNotFoundError(errno.ENOENT, "Image file not found", os.fspath(source))
+    elif isinstance(source, str):
+        try:
+            # Strict: a missing path such as "site/a.jpg" must not decode as base64 garbage
+            data = base64.b64decode("".join(source.split()), validate=True)
+        except binascii.Error:
+            raise FileNotFoundError(errno.ENOENT, "Image file not found", source) from None
+        # base64 still costs one decoded copy; everything after it is zero-copy
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        raise TypeError(f"Unsupported image source type: {type(source).__name__}")
+
+    if image is None:
+        raise ValueError("Could not decode image data")
+    return image
+
+
+def image_size(image):
+    """(width, height) of a decoded array or PIL image."""
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
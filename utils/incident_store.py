@@ -0,0 +1,268 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+# MinHash/LSH parameters: 16 bands x 4 rows puts the LSH "knee" near 0.5 Jaccard,
+# so near-duplicates (>= 0.8) are found with very high probability.
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "at", "for", "by", "with",
+    "was", "were", "is", "are", "be", "been", "it", "his", "her", "their", "he", "she",
+    "they", "this", "that", "from", "as", "had", "has", "have", "while", "when",
+}
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def minhash_signature(tokens):
+    # Word shingles hashed to 31 bits, then NUM_PERM universal hash permutations in one
+    # vectorized pass: (a * x + b) mod p stays below 2**62, so uint64 never overflows.
+    if len(tokens) >= SHINGLE_SIZE:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    else:
+        shingles = {" ".join(tokens)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    hashes %= _MERSENNE_PRIME
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def lsh_buckets(signature):
+    # One signed 64-bit bucket key per band; the band number is mixed into the key so a
+    # single indexed column serves all bands.
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + rows, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def _json_default(obj):
+    # Sub-agent results come back as RuntimeContext objects; keep only their output.
+    if hasattr(obj, "output"):
+        return obj.output
+    return str(obj)
+
+
+class IncidentStore:
+    """SQLite-backed history of analyzed incident reports.
+
+    Each report is indexed with a MinHash signature (LSH buckets) for near-duplicate
+    detection and with TF-IDF postings for top-k similar-incident search.
+    """
+
+    def __init__(self, db_path="data/incidents.db", max_postings_per_term=5000, max_df_ratio=0.2):
+        self.db_path = db_path
+        self.max_postings_per_term = max_postings_per_term
+        self.max_df_ratio = max_df_ratio
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_db()
+
+    def _init_db(self):
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS incidents (
+                    incident_id INTEGER PRIMARY KEY,
+                    created_at TEXT,
+                    location TEXT,
+                    reporter TEXT,
+                    report_text TEXT,
+                    root_cause TEXT,
+                    signature BLOB,
+                    norm REAL,
+                    duplicate_of INTEGER,
+                    result TEXT
+                );
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    bucket INTEGER,
+                    incident_id INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh_buckets(bucket);
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT,
+                    incident_id INTEGER,
+                    tf REAL,
+                    PRIMARY KEY (term, incident_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def _count(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM incidents WHERE duplicate_of IS NULL"
+        ).fetchone()[0]
+
+    def _idf(self, df, n_docs):
+        return math.log((n_docs + 1) / (df + 1)) + 1.0
+
+    def find_duplicate(self, report_text, threshold=DUPLICATE_THRESHOLD):
+        """Return the closest stored report with estimated Jaccard >= threshold, or None."""
+        tokens = tokenize(report_text)
+        if not tokens:
+            return None
+        signature = minhash_signature(tokens)
+        buckets = lsh_buckets(signature)
+        placeholders = ",".join("?" * len(buckets))
+        with self._lock:
+            rows = self.conn.execute(
+                f"""SELECT i.incident_id, i.signature, i.result FROM incidents i
+                    WHERE i.incident_id IN (
+                        SELECT DISTINCT incident_id FROM lsh_buckets WHERE bucket IN ({placeholders}))""",
+                buckets,
+            ).fetchall()
+        best = None
+        for incident_id, blob, result in rows:
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= threshold and (best is None or similarity > best["similarity"]):
+                best = {"incident_id": incident_id, "similarity": round(similarity, 3), "result": json.loads(result)}
+        return best
+
+    def similar(self, report_text, k=5, exclude_id=None):
+        """Top-k stored incidents by TF-IDF cosine similarity, with their root causes."""
+        counts = Counter(tokenize(report_text))
+        if not counts:
+            return []
+        with self._lock:
+            n_docs = self._count()
+            if not n_docs:
+                return []
+            terms = list(counts)
+            placeholders = ",".join("?" * len(terms))
+            dfs = dict(self.conn.execute(f"SELECT term, df FROM terms WHERE term IN ({placeholders})", terms))
+            scores = Counter()
+            query_norm = 0.0
+            for term, count in counts.items():
+                df = dfs.get(term, 0)
+                weight = count * self._idf(df, n_docs)
+                query_norm += weight * weight
+                # Very common terms carry almost no signal and have the longest posting lists.
+                if not df or df > max(self.max_df_ratio * n_docs, 10):
+                    continue
+                idf = self._idf(df, n_docs)
+                for incident_id, tf in self.conn.execute(
+                    "SELECT incident_id, tf FROM postings WHERE term = ? ORDER BY incident_id DESC LIMIT ?",
+                    (term, self.max_postings_per_term),
+                ):
+                    scores[incident_id] += weight * tf * idf
+            if exclude_id is not None:
+                scores.pop(exclude_id, None)
+            top = scores.most_common(k * 3)
+            if not top:
+                return []
+            ids = [incident_id for incident_id, _ in top]
+            rows = self.conn.execute(
+                f"""SELECT incident_id, norm, root_cause, location, created_at, report_text FROM incidents
+                    WHERE incident_id IN ({",".join("?" * len(ids))})""",
+                ids,
+            ).fetchall()
+        query_norm = math.sqrt(query_norm) or 1.0
+        matches = []
+        for incident_id, norm, root_cause, location, created_at, text in rows:
+            matches.append({
+                "incident_id": incident_id,
+                "similarity": round(scores[incident_id] / (query_norm * (norm or 1.0)), 3),
+                "root_cause": root_cause,
+                "location": location,
+                "date": created_at,
+                "summary": text[:200],
+            })
+        matches.sort(key=lambda m: m["similarity"], reverse=True)
+        return matches[:k]
+
+    def add(self, report_text, result, location=None, reporter=None, root_cause=None, duplicate_of=None):
+        """Store an analyzed report and index it; returns the new incident_id."""
+        tokens = tokenize(report_text)
+        signature = minhash_signature(tokens) if tokens else np.zeros(NUM_PERM, dtype=np.uint32)
+        payload = json.dumps(result, default=_json_default)
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                """INSERT INTO incidents (created_at, location, reporter, report_text, root_cause,
+                                          signature, norm, duplicate_of, result)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), location, reporter, report_text,
+                 root_cause, signature.tobytes(), None, duplicate_of, payload),
+            )
+            incident_id = cur.lastrowid
+            # Duplicates point at their original and stay out of the search indexes.
+            if duplicate_of is not None or not tokens:
+                return incident_id
+
+            self.conn.executemany(
+                "INSERT INTO lsh_buckets (bucket, incident_id) VALUES (?, ?)",
+                [(bucket, incident_id) for bucket in lsh_buckets(signature)],
+            )
+            counts = Counter(tokens)
+            total = float(sum(counts.values()))
+            self.conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                [(term,) for term in counts],
+            )
+            self.conn.executemany(
+                "INSERT INTO postings (term, incident_id, tf) VALUES (?, ?, ?)",
+                [(term, incident_id, count / total) for term, count in counts.items()],
+            )
+            # The document norm uses the IDF at insertion time, which keeps inserts O(terms).
+            n_docs = self._count()
+            placeholders = ",".join("?" * len(counts))
+            dfs = dict(self.conn.execute(f"SELECT term, df FROM terms WHERE term IN ({placeholders})", list(counts)))
+            norm = math.sqrt(sum(
+                (count / total * self._idf(dfs[term], n_docs)) ** 2 for term, count in counts.items()
+            ))
+            self.conn.execute("UPDATE incidents SET norm = ? WHERE incident_id = ?", (norm, incident_id))
+        return incident_id
+
+    def get(self, incident_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT incident_id, created_at, location, reporter, root_cause, duplicate_of, result "
+                "FROM incidents WHERE incident_id = ?",
+                (incident_id,),
+            ).fetchone()
+        if not row:
+            return None
+        keys = ["incident_id", "created_at", "location", "reporter", "root_cause", "duplicate_of", "result"]
+        record = dict(zip(keys, row))
+        record["result"] = json.loads(record["result"])
+        return record
+
+
+_stores = {}
+
+
+def get_incident_store(db_path=None):
+    # One shared connection per database file, reused across agent instances.
+    db_path = db_path or os.getenv("INCIDENT_STORE_PATH", "data/incidents.db")
+    if db_path not in _stores:
+        _stores[db_path] = IncidentStore(db_path)
+    return _stores[db_path]
@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.image_intake import decode_image
+from utils.pdf_extract import file_digest
+
+OCR_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ocr_text (
+        digest TEXT,
+        options TEXT,
+        text TEXT,
+        PRIMARY KEY (digest, options)
+    )
+"""
+
+DEFAULT_OPTIONS = {"grayscale": True, "max_side": 2000, "deskew": False, "lang": "eng"}
+
+
+def preprocess(image, grayscale=True, max_side=2000, deskew=False):
+    """Cheap clean-up before tesseract: grayscale, area downscale, optional small-angle deskew."""
+    import cv2
+
+    if grayscale and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if max_side and max(image.shape[:2]) > max_side:
+        scale = max_side / max(image.shape[:2])
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if deskew:
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        coords = np.column_stack(np.nonzero(ink))[:, ::-1].astype(np.float32)
+        if len(coords) > 50:
+            _, (w, h), angle = cv2.minAreaRect(coords)
+            # Angle of the box's long side (the text lines), folded into [-90, 90)
+            angle = ((angle - 90 if w < h else angle) + 90) % 180 - 90
+            if 0.1 < abs(angle) < 15:
+                h, w = image.shape[:2]
+                matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+                image = cv2.warpAffine(image, matrix, (w, h), flags=cv2.INTER_LINEAR,
+                                       borderMode=cv2.BORDER_REPLICATE)
+    return image
+
+
+def _ocr_one(path, options):
+    # Runs in a worker process
+    import pytesseract
+
+    image = preprocess(decode_image(path), options["grayscale"], options["max_side"], options["deskew"])
+    return pytesseract.image_to_string(image, lang=options["lang"])
+
+
+class OcrCache:
+    """OCR text per image content hash and preprocessing options, in one sqlite file."""
+
+    def __init__(self, db_path):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.execute(OCR_SCHEMA)
+
+    def get_many(self, digests, options_key):
+        found = {}
+        digests = list(digests)
+        with self._lock:
+            for i in range(0, len(digests), 500):
+                batch = digests[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT digest, text FROM ocr_text WHERE options = ? "
+                    f"AND digest IN ({', '.join('?' * len(batch))})",
+                    [options_key] + batch
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, items, options_key):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ocr_text VALUES (?, ?, ?)",
+                [(digest, options_key, text) for digest, text in items]
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OcrCache(os.getenv("OCR_CACHE_PATH", "data/.cache/ocr.db"))
+        return _cache
+
+
+def ocr_images(paths, workers=None, **options):
+    """OCR a batch of image files across a process pool, skipping images already seen.
+
+    Results are cached by content hash and preprocessing options, so a re-scanned or
+    renamed copy of the same permit is not OCR'd again; duplicates within the batch run
+    once. Options: grayscale, max_side (px, 0 to keep size), deskew, lang.
+    An image that cannot be read or OCR'd gets text None and an "error" in its result;
+    the rest of the batch is still returned and cached.
+    """
+    start = time.perf_counter()
+    options = {**DEFAULT_OPTIONS, **options}
+    options_key = json.dumps(options, sort_keys=True)
+    cache = get_ocr_cache()
+
+    errors = {}  # digest (or path, when it could not be hashed) -> message
+    digests = []
+    for path in paths:
+        try:
+            digests.append(file_digest(path))
+        except OSError as e:
+            digests.append(path)
+            errors[path] = str(e)
+    texts = cache.get_many({d for d in digests if d not in errors}, options_key)
+    todo = {}
+    for path, digest in zip(paths, digests):
+        if digest not in texts and digest not in errors:
+            todo.setdefault(digest, path)
+
+    workers = min(workers or os.cpu_count() or 1, len(todo)) or 1
+    if todo:
+        import pytesseract  # noqa: F401  (a missing install fails the call, not every image)
+
+        items = list(todo.items())
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_ocr_one, path, options) for _, path in items]
+                outcomes = []
+                for future in futures:
+                    try:
+                        outcomes.append((future.result(), None))
+                    except Exception as e:
+                        outcomes.append((None, e))
+        else:
+            outcomes = []
+            for _, path in items:
+                try:
+                    outcomes.append((_ocr_one(path, options), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+        done = []
+        for (digest, _), (text, error) in zip(items, outcomes):
+            if error is None:
+                done.append((digest, text))
+            else:
+                errors[digest] = str(error) or type(error).__name__
+        cache.put_many(done, options_key)
+        texts.update(done)
+
+    elapsed = time.perf_counter() - start
+    hits = sum(1 for d in digests if d not in todo and d not in errors)
+    results = []
+    for path, digest in zip(paths, digests):
+        item = {"path": path, "text": texts.get(digest), "cached": digest not in todo and digest not in errors}
+        if digest in errors:
+            item["error"] = errors[digest]
+        results.append(item)
+    return {
+        "results": results,
+        "images": len(paths),
+        "ocr_runs": len(todo),
+        "errors": sum(1 for item in results if "error" in item),
+        "cache_hits": hits,
+        "hit_rate": round(hits / len(paths), 3) if paths else None,
+        "workers": workers if todo else 0,
+        "elapsed_sec": round(elapsed, 3),
+        "images_per_sec": round(len(paths) / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,238 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+CACHE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS pdf_pages (
+        digest TEXT,
+        page INTEGER,
+        text TEXT,
+        PRIMARY KEY (digest, page)
+    )""",
+    """CREATE TABLE IF NOT EXISTS pdf_tables (
+        digest TEXT,
+        pages TEXT,
+        payload TEXT,
+        PRIMARY KEY (digest, pages)
+    )""",
+]
+
+
+def file_digest(file_path, block_size=1 << 20):
+    """sha256 of the file contents; the cache key, so renamed or copied PDFs still hit."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _page_number(text, spec):
+    try:
+        page = int(text)
+    except ValueError:
+        raise ValueError(f"Invalid page spec {spec!r}: {text.strip()!r} is not a page number; "
+                         f"use e.g. \"3\", \"1-5\", \"4-\" or \"1-5,8\"") from None
+    if page < 1:
+        raise ValueError(f"Invalid page spec {spec!r}: pages are numbered from 1")
+    return page
+
+
+def parse_pages(pages, page_count):
+    """1-based page numbers from None/"all", an int, an iterable, or a spec like "1-5,8".
+
+    "4-" runs to the last page. Pages past the end of the document are ignored; malformed
+    specs, pages below 1 and reversed ranges raise ValueError.
+    """
+    if pages is None or pages == "all":
+        return list(range(1, page_count + 1))
+    if isinstance(pages, str):
+        selected = []
+        for part in pages.split(","):
+            part = part.strip()
+            if "-" in part:
+                first, last = part.split("-", 1)
+                if not first.strip():
+                    raise ValueError(f"Invalid page spec {pages!r}: range {part!r} has no first page; "
+                                     f"pages are numbered from 1, e.g. \"1-{last.strip()}\"")
+                first = _page_number(first, pages)
+                last = _page_number(last, pages) if last.strip() else max(page_count, first)
+                if last < first:
+                    raise ValueError(f"Invalid page spec {pages!r}: range {part!r} ends before it starts")
+                selected.extend(range(first, last + 1))
+            elif part:
+                selected.append(_page_number(part, pages))
+    else:
+        selected = [_page_number(str(p), pages) for p in ([pages] if isinstance(pages, int) else pages)]
+    return sorted({p for p in selected if p <= page_count})
+
+
+def page_count(file_path):
+    try:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+    except ImportError:
+        import PyPDF2
+        with open(file_path, "rb") as f:
+            return len(PyPDF2.PdfReader(f).pages)
+
+
+def _extract_range(file_path, pages):
+    # Runs in a worker process: open the document once, extract a contiguous page range
+    try:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return [(p, pdf.pages[p - 1].extract_text() or "") for p in pages]
+    except ImportError:
+        import PyPDF2
+        with open(file_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            return [(p, reader.pages[p - 1].extract_text() or "") for p in pages]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_pool():
+    """The process pool shared by all extractions, started on first use (PDF_WORKERS, default CPU count)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=int(os.getenv("PDF_WORKERS", 0)) or os.cpu_count() or 1)
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def _reset_pdf_pool(pool):
+    # A worker that died (e.g. killed for memory) breaks the pool for good; the next call starts a new one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _split(pages, parts):
+    # Contiguous runs keep each worker's page access sequential within the file
+    size = max(1, -(-len(pages) // parts))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+class PdfPageCache:
+    """Extracted page text and tables per file hash, in one sqlite file."""
+
+    def __init__(self, db_path):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            for statement in CACHE_SCHEMA:
+                self.conn.execute(statement)
+
+    def pages(self, digest, pages):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT page, text FROM pdf_pages WHERE digest = ?", (digest,)
+            ).fetchall()
+        wanted = set(pages)
+        return {page: text for page, text in rows if page in wanted}
+
+    def store_pages(self, digest, extracted):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pdf_pages VALUES (?, ?, ?)",
+                [(digest, page, text) for page, text in extracted]
+            )
+
+    def tables(self, digest, pages):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload FROM pdf_tables WHERE digest = ? AND pages = ?", (digest, pages)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store_tables(self, digest, pages, payload):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pdf_tables VALUES (?, ?, ?)", (digest, pages, json.dumps(payload))
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfPageCache(os.getenv("PDF_CACHE_PATH", "data/.cache/pdf_pages.db"))
+        return _cache
+
+
+def extract_pdf_text(file_path, pages=None, workers=None, min_pages_per_worker=8):
+    """Text of the selected pages, extracted across a process pool and cached per page.
+
+    Returns {"pages": [(page, text), ...], "page_count", "cached_pages", "extracted_pages",
+    "workers", "elapsed_sec"}. Large extractions are split into `workers` runs on the
+    shared pool (get_pdf_pool); small ones stay in-process, where the hand-off to other
+    processes would cost more than it saves. Invalid page specs raise ValueError.
+    """
+    start = time.perf_counter()
+    cache = get_pdf_cache()
+    count = page_count(file_path)
+    selected = parse_pages(pages, count)
+    digest = file_digest(file_path)
+
+    texts = cache.pages(digest, selected)
+    missing = [p for p in selected if p not in texts]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(missing) // min_pages_per_worker))
+    if missing:
+        if workers > 1:
+            pool = get_pdf_pool()
+            try:
+                futures = [pool.submit(_extract_range, file_path, run) for run in _split(missing, workers)]
+                extracted = [item for future in futures for item in future.result()]
+            except BrokenProcessPool:
+                _reset_pdf_pool(pool)
+                raise
+        else:
+            extracted = _extract_range(file_path, missing)
+        cache.store_pages(digest, extracted)
+        texts.update(extracted)
+
+    return {
+        "pages": [(p, texts[p]) for p in selected],
+        "page_count": count,
+        "cached_pages": len(selected) - len(missing),
+        "extracted_pages": len(missing),
+        "workers": workers if missing else 0,
+        "elapsed_sec": round(time.perf_counter() - start, 3),
+    }
+
+
+def extract_pdf_tables(file_path, pages="all"):
+    """Tables on the selected pages as DataFrames (camelot), cached per file hash and page spec."""
+    selected = parse_pages(pages, page_count(file_path))  # validates string specs before camelot sees them
+    digest = file_digest(file_path)
+    spec = pages if isinstance(pages, str) else ",".join(str(p) for p in selected)
+    cache = get_pdf_cache()
+    payload = cache.tables(digest, spec)
+    if payload is None:
+        import camelot
+        tables = camelot.read_pdf(file_path, pages=spec)
+        payload = [t.df.to_dict(orient="split") for t in tables]
+        cache.store_tables(digest, spec, payload)
+    return [pd.DataFrame(t["data"], index=t["index"], columns=t["columns"]) for t in payload]
@@ -0,0 +1,188 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from utils.logger import logger
+
+RUNS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        agent TEXT,
+        task TEXT,
+        output TEXT,
+        created_at TEXT,
+        reflection_status TEXT,
+        reflection TEXT,
+        reflected_at TEXT
+    )
+"""
+
+# Lower runs first; failures and compliance answers are audited before routine output
+PRIORITY_FAILED, PRIORITY_COMPLIANCE, PRIORITY_DEFAULT = 0, 1, 5
+
+
+class RunStore:
+    """Agent runs and the reflections later attached to them."""
+
+    def __init__(self, db_path):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.execute(RUNS_SCHEMA)
+
+    def record(self, agent, task, output, reflection_status="none"):
+        run_id = uuid.uuid4().hex
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO runs (run_id, agent, task, output, created_at, reflection_status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, agent, str(task), json.dumps(output, default=str),
+                 datetime.now().isoformat(timespec="seconds"), reflection_status)
+            )
+        return run_id
+
+    def set_reflection(self, run_id, status, reflection=None):
+        # reflected_at records when a reflection finished, not when it was queued
+        reflected_at = datetime.now().isoformat(timespec="seconds") if status in ("done", "error") else None
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE runs SET reflection_status = ?, reflection = ?, reflected_at = ? WHERE run_id = ?",
+                (status, reflection, reflected_at, run_id)
+            )
+
+    def get(self, run_id):
+        with self._lock:
+            cursor = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,))
+            row = cursor.fetchone()
+            keys = [d[0] for d in cursor.description]
+        if row is None:
+            return None
+        record = dict(zip(keys, row))
+        record["output"] = json.loads(record["output"])
+        return record
+
+
+def default_priority(agent, output):
+    if isinstance(output, dict) and ("error" in output or output.get("status") in ("failed", "error")):
+        return PRIORITY_FAILED
+    if "compliance" in (agent or ""):
+        return PRIORITY_COMPLIANCE
+    return PRIORITY_DEFAULT
+
+
+class ReflectionQueue:
+    """Background reflection on agent outputs, off the request path.
+
+    Runs are sampled at `sample_rate`, queued by priority and reviewed by `workers`
+    asyncio tasks on the serving event loop, so the async `reflect(agent, output, llm)`
+    callable runs on the loop the LLM client is bound to. The reflection (or error) is
+    written back to the run record from a worker thread. When the queue is full new runs
+    are marked dropped rather than blocking the caller.
+    """
+
+    def __init__(self, reflect, store, workers=2, sample_rate=1.0, max_pending=1000):
+        self.reflect = reflect
+        self.store = store
+        self.sample_rate = sample_rate
+        self.workers = workers
+        self.max_pending = max_pending
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        self._order = itertools.count()  # FIFO within a priority
+        self._counts = {"queued": 0, "sampled_out": 0, "dropped": 0, "done": 0, "error": 0}
+
+    def _ensure_workers(self):
+        # Started from the first submit on a loop; a new loop (e.g. a restarted server)
+        # gets a fresh queue, since the old loop's tasks can no longer run.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue(self.max_pending)
+            self._tasks = [loop.create_task(self._run(), name=f"reflection-{i}") for i in range(self.workers)]
+        return self._queue
+
+    def submit(self, run_id, agent, output, llm, priority=None, sample_rate=None):
+        """Queue a stored run for reflection; returns its reflection status.
+
+        Must be called from the serving event loop, which the workers share.
+        """
+        rate = self.sample_rate if sample_rate is None else sample_rate
+        if random.random() >= rate:
+            self._counts["sampled_out"] += 1
+            self.store.set_reflection(run_id, "skipped")
+            return "skipped"
+        if priority is None:
+            priority = default_priority(agent, output)
+        try:
+            self._ensure_workers().put_nowait((priority, next(self._order), run_id, agent, output, llm))
+        except asyncio.QueueFull:
+            self._counts["dropped"] += 1
+            self.store.set_reflection(run_id, "dropped")
+            return "dropped"
+        # Workers share this loop, so none can finish the run before it is marked queued
+        self.store.set_reflection(run_id, "queued")
+        self._counts["queued"] += 1
+        return "queued"
+
+    async def wait(self):
+        # Waits until every queued reflection is stored (tests, shutdown)
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self):
+        return dict(self._counts, pending=self._queue.qsize() if self._queue is not None else 0)
+
+    async def _run(self):
+        while True:
+            _, _, run_id, agent, output, llm = await self._queue.get()
+            try:
+                try:
+                    reflection, status = await self.reflect(agent, output, llm), "done"
+                except Exception as e:
+                    reflection, status = str(e), "error"
+                self._counts[status] += 1
+                await asyncio.to_thread(self.store.set_reflection, run_id, status, reflection)
+            except Exception as e:
+                # A failed write must not stop the worker
+                logger.error(f"Could not store reflection for run {run_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_run_store = None
+_queue = None
+_lock = threading.Lock()
+
+
+def get_run_store():
+    global _run_store
+    with _lock:
+        if _run_store is None:
+            _run_store = RunStore(os.getenv("RUN_STORE_PATH", "data/runs.db"))
+        return _run_store
+
+
+def get_reflection_queue(reflect):
+    """The process-wide queue; `reflect` is only used the first time it is created."""
+    global _queue
+    store = get_run_store()
+    with _lock:
+        if _queue is None:
+            _queue = ReflectionQueue(
+                reflect,
+                store,
+                workers=int(os.getenv("REFLECTION_WORKERS", 2)),
+                sample_rate=float(os.getenv("REFLECTION_SAMPLE_RATE", 1.0)),
+                max_pending=int(os.getenv("REFLECTION_MAX_PENDING", 1000)),
+            )
+        return _queue
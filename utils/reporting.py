@@ -1,19 +1,194 @@
+import os
+import queue
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+import numpy as np
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 
-def generate_inspection_report(violations, filename="inspection_report.pdf"):
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 50
+LINE_HEIGHT = 16
+THUMB_SIZE = 96
+MAX_THUMBNAILS = 24
+
+
+def _new_page(c, title, page):
+    if page > 1:
+        c.showPage()
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(MARGIN, PAGE_HEIGHT - MARGIN, title)
+    c.setFont("Helvetica", 8)
+    c.drawRightString(PAGE_WIDTH - MARGIN, MARGIN / 2, f"Page {page}")
+    c.setFont("Helvetica", 10)
+    return PAGE_HEIGHT - MARGIN - 2 * LINE_HEIGHT
+
+
+def _render(inspection, filename):
+    # Lines first, then a grid of detection thumbnails; new pages as the cursor runs out
+    title = inspection.get("title") or "Site Inspection Report"
     c = canvas.Canvas(filename, pagesize=letter)
-    c.drawString(100, 750, "Site Inspection Report")
-    
-    y = 700
-    for v in violations:
-        c.drawString(100, y, f"- {v}")
-        y -= 20
+    page = 1
+    y = _new_page(c, title, page)
+    c.drawString(MARGIN, y, f"Generated: {inspection.get('created_at', '')}")
+    y -= 2 * LINE_HEIGHT
+
+    for line in inspection.get("lines", []):
+        if y < MARGIN + LINE_HEIGHT:
+            page += 1
+            y = _new_page(c, title, page)
+        c.drawString(MARGIN, y, f"- {line}")
+        y -= LINE_HEIGHT
+
+    thumbnails = inspection.get("thumbnails", [])
+    if thumbnails:
+        from PIL import Image
 
+        y -= LINE_HEIGHT
+        per_row = int((PAGE_WIDTH - 2 * MARGIN) // (THUMB_SIZE + 10))
+        x = MARGIN
+        for i, (crop, caption) in enumerate(thumbnails):
+            if i % per_row == 0:
+                x = MARGIN
+                if y - THUMB_SIZE - LINE_HEIGHT < MARGIN:
+                    page += 1
+                    y = _new_page(c, title, page)
+                y -= THUMB_SIZE
+            thumb = Image.fromarray(crop[:, :, ::-1])  # BGR -> RGB
+            thumb.thumbnail((THUMB_SIZE, THUMB_SIZE))
+            c.drawImage(ImageReader(thumb), x, y, width=thumb.width, height=thumb.height)
+            c.setFont("Helvetica", 7)
+            c.drawString(x, y - 10, caption[:22])
+            c.setFont("Helvetica", 10)
+            x += THUMB_SIZE + 10
+            if i % per_row == per_row - 1:
+                y -= LINE_HEIGHT
     c.save()
 
-# Example:
-generate_inspection_report([
-    "Missing helmet detected at zone_3",
-    "Obstructed fire exit near zone_1"
-])
+
+def generate_inspection_report(violations, filename="inspection_report.pdf"):
+    _render({"lines": violations, "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}, filename)
+
+
+def _as_bgr(crop):
+    # A copy either way, so the crop never pins the full image in memory
+    if crop.ndim == 2:
+        return np.repeat(crop[:, :, None], 3, axis=2)
+    if crop.shape[2] == 1:
+        return np.repeat(crop, 3, axis=2)
+    return crop[:, :, :3].copy()  # drops alpha from BGRA
+
+
+def detection_thumbnails(image, detections, limit=MAX_THUMBNAILS):
+    """Small BGR crops of detected boxes, taken while the full image is still in memory.
+
+    Grayscale and BGRA images give 3-channel BGR crops too, as the report renderer expects.
+    """
+    crops = []
+    height, width = image.shape[:2]
+    for det in detections[:limit]:
+        if not det.get("bbox"):
+            continue
+        x1, y1, x2, y2 = (int(v) for v in det["bbox"])
+        x1, y1, x2, y2 = max(x1, 0), max(y1, 0), min(x2, width), min(y2, height)
+        if x2 > x1 and y2 > y1:
+            crops.append((_as_bgr(image[y1:y2, x1:x2]), f"{det['label']} {det['confidence']:.2f}"))
+    return crops
+
+
+class ReportService:
+    """Background PDF rendering so inspections return a report handle immediately.
+
+    Jobs queue up for one worker thread, which renders them one at a time in submission
+    order; each pass takes up to `max_batch` waiting jobs. Every report gets its own file
+    under `output_dir`. The status of the last `keep_finished` rendered (or failed)
+    reports is kept; older ones are forgotten and status() returns None for them.
+    """
+
+    def __init__(self, output_dir="reports", max_batch=8, keep_finished=1000):
+        self.output_dir = output_dir
+        self.max_batch = max_batch
+        self.keep_finished = keep_finished
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._finished = deque()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="report-renderer", daemon=True)
+        self._worker.start()
+
+    def submit(self, lines, title=None, thumbnails=None):
+        report_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.output_dir, f"inspection_{report_id}.pdf")
+        job = {
+            "report_id": report_id,
+            "path": path,
+            "title": title,
+            "lines": list(lines),
+            "thumbnails": thumbnails or [],
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._lock:
+            self._jobs[report_id] = {"status": "queued", "path": path, "error": None}
+        self._queue.put(job)
+        return {"report_id": report_id, "path": path, "status": "queued"}
+
+    def status(self, report_id):
+        with self._lock:
+            job = self._jobs.get(report_id)
+            return dict(job, report_id=report_id) if job else None
+
+    def wait(self):
+        # Blocks until every queued report is rendered (tests, shutdown)
+        self._queue.join()
+
+    def _set(self, report_id, **fields):
+        with self._lock:
+            self._jobs[report_id].update(fields)
+            if fields.get("status") in ("done", "error"):
+                self._finished.append(report_id)
+                while len(self._finished) > self.keep_finished:
+                    self._jobs.pop(self._finished.popleft(), None)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for job in batch:
+                self._set(job["report_id"], status="rendering")
+                try:
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    _render(job, job["path"])
+                    self._set(job["report_id"], status="done")
+                except Exception as e:
+                    self._set(job["report_id"], status="error", error=str(e))
+                finally:
+                    self._queue.task_done()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_report_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ReportService(os.getenv("REPORTS_DIR", "reports"),
+                                     keep_finished=int(os.getenv("REPORTS_KEEP_FINISHED", 1000)))
+        return _service
+
+
+if __name__ == "__main__":
+    # Example:
+    generate_inspection_report([
+        "Missing helmet detected at zone_3",
+        "Obstructed fire exit near zone_1"
+    ])
@@ -0,0 +1,345 @@
+import asyncio
+import json
+import math
+import random
+import struct
+import time
+from collections import defaultdict
+
+# Compact binary reading: magic byte, then ts (float64), site id, sensor id (uint16),
+# parameter index (uint8) and value (float32) - 18 bytes, little-endian.
+BINARY_MAGIC = 0xB1
+BINARY_RECORD = struct.Struct("<BdHHBf")
+
+DROP_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+# Everything a malformed message can raise while being parsed
+PARSE_ERRORS = (ValueError, TypeError, KeyError, IndexError, struct.error)
+
+
+def _timestamp(value):
+    ts = float(value)
+    if not math.isfinite(ts):
+        raise ValueError(f"Invalid timestamp: {value}")
+    return ts
+
+
+class SiteMetrics:
+    def __init__(self):
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.rejected = 0  # malformed messages, counted under "_unknown"
+        self.errors = 0  # handler failures
+        self.lag_ewma = 0.0
+        self.lag_max = 0.0
+
+    def record_lag(self, lag):
+        self.lag_ewma = lag if self.processed == 0 else 0.9 * self.lag_ewma + 0.1 * lag
+        self.lag_max = max(self.lag_max, lag)
+
+
+class SensorGateway:
+    """Asyncio TCP/UDP ingestion endpoint feeding a reading handler through a bounded queue.
+
+    Lines may be CSV (`site,sensor,parameter,value[,ts]`) or JSON objects with either
+    `parameter`/`value` or a `sensor_data` dict; binary records use BINARY_RECORD.
+    Malformed messages are counted as rejected and skipped; the connection stays open.
+    Workers hand queued readings to `handler` in batches of up to `batch_size` on a
+    worker thread, one batch at a time, so its disk writes never block the event loop.
+    The handler must therefore lock any state it shares with code on the loop.
+    `after_batch` (e.g. persisting alert state) runs on that thread after every batch,
+    and `flush` (e.g. the store's) once the queue has drained on stop().
+    `policy` decides what happens when the queue is full:
+      - block:       TCP readers wait (the socket stops being read, so senders slow down);
+                     UDP cannot be paused and falls back to drop_newest.
+      - drop_newest: the incoming reading is discarded.
+      - drop_oldest: the oldest queued reading is discarded to make room.
+    """
+
+    def __init__(self, handler, parameters, queue_size=10000, policy="block", workers=1, on_events=None,
+                 flush=None, batch_size=256, after_batch=None):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}. Choose from: {', '.join(DROP_POLICIES)}")
+        self.handler = handler
+        self.parameters = list(parameters)
+        self.policy = policy
+        self.workers = workers
+        self.on_events = on_events
+        self.flush = flush
+        self.after_batch = after_batch
+        self.batch_size = batch_size
+        self.after_batch_errors = 0
+        self._handler_lock = asyncio.Lock()  # the handler is not assumed to be thread-safe
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.site_metrics = defaultdict(SiteMetrics)
+        self.started_at = None
+        self._servers = []
+        self._transports = []
+        self._worker_tasks = []
+
+    # Parsing
+
+    def parse_line(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        if line.startswith("{"):
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise ValueError("Expected a JSON object")
+            ts = msg.get("ts")
+            ts = time.time() if ts is None else _timestamp(ts)
+            if "sensor_data" in msg:
+                readings = msg["sensor_data"]
+                if not isinstance(readings, dict):
+                    raise ValueError("'sensor_data' must be an object of parameter: value")
+            else:
+                readings = {msg["parameter"]: msg["value"]}
+            return str(msg.get("site", "default")), str(msg.get("sensor", "default")), readings, ts
+        parts = line.split(",")
+        if len(parts) not in (4, 5):
+            raise ValueError(f"Expected 4 or 5 comma-separated fields, got {len(parts)}")
+        ts = _timestamp(parts[4]) if len(parts) == 5 else time.time()
+        return parts[0], parts[1], {parts[2]: float(parts[3])}, ts
+
+    def parse_binary(self, data):
+        _, ts, site, sensor, param, value = BINARY_RECORD.unpack(data)
+        return str(site), str(sensor), {self.parameters[param]: float(value)}, ts
+
+    def encode_binary(self, site, sensor, parameter, value, ts):
+        return BINARY_RECORD.pack(BINARY_MAGIC, ts, int(site), int(sensor), self.parameters.index(parameter), value)
+
+    # Queueing
+
+    async def _offer(self, reading):
+        if self.policy == "block":
+            self.site_metrics[reading[0]].received += 1
+            await self.queue.put(reading)
+        else:
+            self._offer_nowait(reading)
+
+    def _offer_nowait(self, reading):
+        metrics = self.site_metrics[reading[0]]
+        metrics.received += 1
+        if self.queue.full():
+            if self.policy == "drop_oldest":
+                dropped = self.queue.get_nowait()
+                self.queue.task_done()
+                self.site_metrics[dropped[0]].dropped += 1
+            else:
+                metrics.dropped += 1
+                return
+        self.queue.put_nowait(reading)
+
+    def _handle_batch(self, batch):
+        # Runs on a worker thread; metrics are updated back on the loop
+        results = []
+        for site, sensor, readings, ts in batch:
+            try:
+                events = self.handler(site, sensor, readings, ts)
+                results.append((site, max(time.time() - ts, 0.0), events, False))
+            except Exception:
+                results.append((site, 0.0, None, True))
+        if self.after_batch:
+            try:
+                self.after_batch()
+            except Exception:
+                self.after_batch_errors += 1  # the readings were handled; keep serving
+        return results
+
+    async def _worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                async with self._handler_lock:
+                    results = await asyncio.to_thread(self._handle_batch, batch)
+                for site, lag, events, failed in results:
+                    metrics = self.site_metrics[site]
+                    if failed:
+                        metrics.errors += 1
+                        continue
+                    metrics.record_lag(lag)
+                    metrics.processed += 1
+                    if events and self.on_events:
+                        self.on_events(events)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    # Transports
+
+    async def _handle_tcp(self, reader, writer):
+        try:
+            while True:
+                first = await reader.read(1)
+                if not first:
+                    break
+                if first[0] == BINARY_MAGIC:
+                    data = first + await reader.readexactly(BINARY_RECORD.size - 1)
+                    parse = self.parse_binary
+                else:
+                    data = (first + await reader.readline()).decode("utf-8", errors="replace")
+                    parse = self.parse_line
+                try:
+                    reading = parse(data)
+                except PARSE_ERRORS:
+                    self.site_metrics["_unknown"].rejected += 1
+                    continue
+                if reading:
+                    await self._offer(reading)
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    def _handle_datagram(self, data):
+        # A datagram may hold several binary records or several lines; bad ones are skipped
+        if data and data[0] == BINARY_MAGIC:
+            parse = self.parse_binary
+            messages = [data[offset:offset + BINARY_RECORD.size]
+                        for offset in range(0, len(data) - BINARY_RECORD.size + 1, BINARY_RECORD.size)]
+        else:
+            parse = self.parse_line
+            messages = data.decode("utf-8", errors="replace").splitlines()
+        for message in messages:
+            try:
+                reading = parse(message)
+            except PARSE_ERRORS:
+                self.site_metrics["_unknown"].rejected += 1
+                continue
+            if reading:
+                self._offer_nowait(reading)
+
+    async def start(self, host="127.0.0.1", tcp_port=9009, udp_port=None):
+        self.started_at = time.time()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if tcp_port is not None:
+            server = await asyncio.start_server(self._handle_tcp, host, tcp_port)
+            self._servers.append(server)
+        if udp_port is not None:
+            gateway = self
+
+            class _Protocol(asyncio.DatagramProtocol):
+                def datagram_received(self, data, addr):
+                    gateway._handle_datagram(data)
+
+            transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                _Protocol, local_addr=(host, udp_port))
+            self._transports.append(transport)
+        return self
+
+    def addresses(self):
+        addrs = {}
+        for server in self._servers:
+            addrs["tcp"] = server.sockets[0].getsockname()[:2]
+        for transport in self._transports:
+            addrs["udp"] = transport.get_extra_info("sockname")[:2]
+        return addrs
+
+    async def stop(self, drain=True):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for transport in self._transports:
+            transport.close()
+        if drain:
+            await self.queue.join()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._servers, self._transports, self._worker_tasks = [], [], []
+        if self.flush:
+            await asyncio.to_thread(self.flush)
+
+    def metrics(self):
+        elapsed = max(time.time() - (self.started_at or time.time()), 1e-9)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "policy": self.policy,
+            "after_batch_errors": self.after_batch_errors,
+            "sites": {
+                site: {
+                    "received": m.received,
+                    "processed": m.processed,
+                    "dropped": m.dropped,
+                    "rejected": m.rejected,
+                    "errors": m.errors,
+                    "throughput_per_sec": round(m.processed / elapsed, 1),
+                    "lag_ms_avg": round(m.lag_ewma * 1000, 2),
+                    "lag_ms_max": round(m.lag_max * 1000, 2),
+                }
+                for site, m in self.site_metrics.items()
+            },
+        }
+
+
+async def simulate_fleet(host, port, parameters, sites=2, sensors_per_site=50, rate_hz=1.0, duration=5.0,
+                         protocol="tcp", binary=False):
+    """Local simulated sensor fleet: every sensor sends one reading per parameter at rate_hz."""
+    ranges = {"PM2.5": (5, 45), "noise_dB": (60, 95), "CO_ppm": (0, 60), "temperature_C": (15, 48), "humidity_%": (30, 95)}
+    gateway = SensorGateway(lambda *args: None, parameters)  # only used for encoding
+    sent = 0
+
+    def batch(now):
+        out = []
+        for site in range(sites):
+            for sensor in range(sensors_per_site):
+                for parameter in parameters:
+                    low, high = ranges.get(parameter, (0, 100))
+                    value = random.uniform(low, high)
+                    if binary:
+                        out.append(gateway.encode_binary(site, sensor, parameter, value, now))
+                    else:
+                        out.append(f"{site},{sensor},{parameter},{value:.2f},{now:.3f}\n".encode("utf-8"))
+        return out
+
+    loop = asyncio.get_running_loop()
+    if protocol == "udp":
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(host, port))
+    else:
+        _, writer = await asyncio.open_connection(host, port)
+    end = time.time() + duration
+    try:
+        while time.time() < end:
+            tick = time.time()
+            records = batch(tick)
+            if protocol == "udp":
+                # Pack records into datagrams well under typical MTU-safe sizes
+                per_datagram = 60 if binary else 20
+                for i in range(0, len(records), per_datagram):
+                    transport.sendto(b"".join(records[i:i + per_datagram]))
+            else:
+                writer.write(b"".join(records))
+                await writer.drain()
+            sent += len(records)
+            await asyncio.sleep(max(0.0, 1.0 / rate_hz - (time.time() - tick)))
+    finally:
+        if protocol == "udp":
+            transport.close()
+        else:
+            writer.close()
+    return sent
+
+
+if __name__ == "__main__":
+    # Demo: gateway feeding the environmental agent, driven by a simulated fleet
+    import sys
+    sys.path.insert(0, ".")
+    from agents.environmental_monitoring_agent import get_agent
+
+    async def main():
+        agent = get_agent()
+        gateway = SensorGateway(agent.ingest, list(agent.thresholds), queue_size=5000, policy="drop_oldest",
+                                flush=agent.store.flush, after_batch=agent.save_alert_state)
+        await gateway.start(tcp_port=0, udp_port=0)
+        tcp_port = gateway.addresses()["tcp"][1]
+        sent = await simulate_fleet("127.0.0.1", tcp_port, gateway.parameters, sites=4, sensors_per_site=250, duration=5)
+        await gateway.stop()
+        print(f"Sent {sent} readings")
+        print(json.dumps(gateway.metrics(), indent=2))
+
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+
+
+def choose_tile_size(width, height, model_size=640, max_downscale=1.5):
+    """Tile side so the model never shrinks a tile by more than `max_downscale`.
+
+    Returns None when the whole image already fits that budget and tiling would not help.
+    """
+    long_side = max(width, height)
+    if long_side <= model_size * max_downscale:
+        return None
+    tiles_per_side = math.ceil(long_side / (model_size * max_downscale))
+    return max(model_size, math.ceil(long_side / tiles_per_side))
+
+
+def make_tiles(width, height, tile_size, overlap=0.2):
+    """Overlapping (x0, y0, x1, y1) windows covering the image; edge tiles are shifted inward."""
+    stride = max(int(tile_size * (1 - overlap)), 1)
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        points = list(range(0, length - tile_size, stride))
+        points.append(length - tile_size)
+        return points
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def nms(boxes, scores, classes, threshold=0.5, metric="ios"):
+    """Class-aware non-maximum suppression; returns the indices of kept boxes.
+
+    metric="ios" (intersection over the smaller box) also removes the truncated
+    half-boxes a tile border leaves next to the full detection from the neighbour tile;
+    metric="iou" is classic NMS.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    boxes = np.asarray(boxes, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    classes = np.asarray(classes)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-scores)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        if metric == "ios":
+            overlap = inter / np.maximum(np.minimum(areas[i], areas[rest]), 1e-9)
+        else:
+            overlap = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        suppressed = (overlap > threshold) & (classes[rest] == classes[i])
+        order = rest[~suppressed]
+    return np.array(keep, dtype=np.int64)
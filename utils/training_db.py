@@ -0,0 +1,235 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.logger import logger
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS training_records (
+        worker_id TEXT,
+        name TEXT,
+        role TEXT,
+        cert_type TEXT,
+        issued_date TEXT,
+        expiry_date TEXT,
+        site TEXT
+    )
+"""
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_training_expiry ON training_records(expiry_date)",
+    "CREATE INDEX IF NOT EXISTS idx_training_role_expiry ON training_records(role, expiry_date)",
+    "CREATE INDEX IF NOT EXISTS idx_training_site_expiry ON training_records(site, expiry_date)",
+]
+
+RECORD_COLUMNS = ["worker_id", "name", "role", "cert_type", "issued_date", "expiry_date", "site"]
+
+# One row per (worker_id, cert_type): a renewal overwrites the previous certificate
+UPSERT_SQL = (
+    f"INSERT INTO training_records ({', '.join(RECORD_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(RECORD_COLUMNS))}) "
+    "ON CONFLICT(worker_id, cert_type) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in RECORD_COLUMNS if c not in ("worker_id", "cert_type"))
+)
+
+
+DUPLICATES_SQL = """
+    SELECT worker_id, cert_type, COUNT(*) FROM training_records
+    GROUP BY worker_id, cert_type HAVING COUNT(*) > 1 ORDER BY worker_id, cert_type
+"""
+
+
+class TrainingRecordStore:
+    """Data access layer for training_records.
+
+    A small pool of WAL-mode connections is shared by every agent instance in the
+    process, the schema and indexes are set up once per database file, and queries
+    are filtered in SQL and paginated with a keyset cursor.
+    """
+
+    def __init__(self, db_path="data/training.db", pool_size=4):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        # Writers are serialized; readers proceed concurrently under WAL
+        self._write_lock = threading.Lock()
+        self._listeners = []
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache per connection
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        with self._write_lock, self.connection() as conn:
+            with conn:
+                yield conn
+
+    def add_listener(self, callback):
+        """Call `callback(rows)` after every committed upsert; rows follow RECORD_COLUMNS.
+
+        Callbacks run under the write lock, so they see upserts in commit order.
+        """
+        self._listeners.append(callback)
+
+    def upsert(self, rows):
+        """Insert or renew certificates in one transaction. `rows` are RECORD_COLUMNS tuples."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        with self._write_lock:
+            with self.connection() as conn:
+                with conn:
+                    conn.executemany(UPSERT_SQL, rows)
+            for callback in self._listeners:
+                callback(rows)
+        return len(rows)
+
+    def _init_db(self):
+        with self.transaction() as conn:
+            conn.execute(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(training_records)")}
+            if "site" not in columns:
+                # Databases created before site tracking
+                conn.execute("ALTER TABLE training_records ADD COLUMN site TEXT")
+            for statement in INDEXES:
+                conn.execute(statement)
+            self._ensure_unique_certificates(conn)
+
+    def _ensure_unique_certificates(self, conn):
+        # One row per (worker_id, cert_type) so imports and renewals can upsert.
+        # Older databases may hold repeats; those are reported, never dropped silently.
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_training_worker_cert'"
+        ).fetchone()
+        if exists:
+            return
+        conflicts = conn.execute(DUPLICATES_SQL).fetchall()
+        if conflicts:
+            for worker_id, cert_type, copies in conflicts[:20]:
+                logger.error(f"training_records: {copies} rows for worker {worker_id!r}, certificate {cert_type!r}")
+            raise ValueError(
+                f"{self.db_path} has {len(conflicts)} duplicated (worker_id, cert_type) certificates. "
+                f"Review them, then run dedupe_certificates({self.db_path!r}) to keep the latest row of each."
+            )
+        conn.execute(
+            "CREATE UNIQUE INDEX idx_training_worker_cert ON training_records(worker_id, cert_type)"
+        )
+        # Its worker_id prefix serves per-worker lookups; one less index to maintain on import
+        conn.execute("DROP INDEX IF EXISTS idx_training_worker")
+
+    @staticmethod
+    def _filters(role=None, site=None, worker_id=None):
+        # Fixed clause order keeps the SQL text stable, so sqlite's statement cache is reused
+        clauses, params = [], []
+        for column, value in (("role", role), ("site", site), ("worker_id", worker_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return clauses, params
+
+    @staticmethod
+    def _page(rows, limit):
+        # rows carry rowid last; a full page yields a cursor for the next one
+        records = [dict(zip(RECORD_COLUMNS, row[:-1])) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last[RECORD_COLUMNS.index('expiry_date')]}|{last[-1]}"
+        return records, next_cursor
+
+    def expired_certifications(self, as_of=None, role=None, site=None, worker_id=None, limit=100, cursor=None):
+        """Certificates with expiry_date before `as_of`, oldest first, one page at a time."""
+        as_of = as_of or datetime.now().strftime("%Y-%m-%d")
+        return self.expiring_between(None, as_of, role=role, site=site, worker_id=worker_id,
+                                     limit=limit, cursor=cursor)
+
+    def expiring_between(self, start, end, role=None, site=None, worker_id=None, limit=100, cursor=None):
+        """Certificates with start <= expiry_date < end (start=None means no lower bound)."""
+        clauses, params = self._filters(role, site, worker_id)
+        clauses.append("expiry_date < ?")
+        params.append(end)
+        if start is not None:
+            clauses.append("expiry_date >= ?")
+            params.append(start)
+        if cursor:
+            try:
+                after_date, after_rowid = cursor.rsplit("|", 1)
+                after_rowid = int(after_rowid)
+            except ValueError:
+                raise ValueError(f"Invalid cursor {cursor!r}; pass the next_cursor of the previous page") from None
+            clauses.append("(expiry_date, rowid) > (?, ?)")
+            params.extend([after_date, after_rowid])
+        sql = (
+            f"SELECT {', '.join(RECORD_COLUMNS)}, rowid FROM training_records "
+            f"WHERE {' AND '.join(clauses)} ORDER BY expiry_date, rowid LIMIT ?"
+        )
+        with self.connection() as conn:
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+        return self._page(rows, limit)
+
+    def records(self, role=None, site=None, worker_id=None, limit=100, cursor=None):
+        clauses, params = self._filters(role, site, worker_id)
+        if cursor:
+            if not str(cursor).isdigit():
+                raise ValueError(f"Invalid cursor {cursor!r}; pass the next_cursor of the previous page")
+            clauses.append("rowid > ?")
+            params.append(int(cursor))
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        sql = f"SELECT {', '.join(RECORD_COLUMNS)}, rowid FROM training_records {where}ORDER BY rowid LIMIT ?"
+        with self.connection() as conn:
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+        records = [dict(zip(RECORD_COLUMNS, row[:-1])) for row in rows[:limit]]
+        return records, (str(rows[limit - 1][-1]) if len(rows) > limit else None)
+
+
+def dedupe_certificates(db_path="data/training.db"):
+    """Delete repeated (worker_id, cert_type) rows, keeping the most recently inserted one.
+
+    A one-off migration for databases created before certificates were unique; the
+    store refuses to open them until this has run. Returns the number of rows deleted.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'training_records'"
+            ).fetchone():
+                return 0
+            deleted = conn.execute("""
+                DELETE FROM training_records WHERE rowid NOT IN (
+                    SELECT MAX(rowid) FROM training_records GROUP BY worker_id, cert_type
+                )
+            """).rowcount
+    finally:
+        conn.close()
+    logger.info(f"training_records: removed {deleted} duplicated certificates from {db_path}")
+    return deleted
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_training_store(db_path="data/training.db"):
+    with _stores_lock:
+        if db_path not in _stores:
+            _stores[db_path] = TrainingRecordStore(db_path)
+        return _stores[db_path]
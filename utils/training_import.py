@@ -0,0 +1,78 @@
+import time
+
+import pandas as pd
+
+from utils.advanced_data_loader import iter_data
+from utils.training_db import RECORD_COLUMNS, get_training_store
+
+REQUIRED_COLUMNS = ["worker_id", "cert_type", "expiry_date"]
+DATE_COLUMNS = ["issued_date", "expiry_date"]
+
+
+def _normalize_dates(series):
+    # ISO dates parse on the fast path; anything else (e.g. 31/12/2025, Excel datetimes)
+    # goes through the flexible parser, still column-at-a-time. Only text that does not
+    # start with a year is read day-first, so "2025-01-02 00:00:00" stays 2 January.
+    parsed = pd.to_datetime(series, errors="coerce", format="%Y-%m-%d")
+    retry = parsed.isna() & series.notna()
+    if retry.any():
+        year_first = series.astype("string").str.strip().str.match(r"\d{4}\D").fillna(False).astype(bool)
+        for mask, dayfirst in ((retry & year_first, False), (retry & ~year_first, True)):
+            if mask.any():
+                parsed[mask] = pd.to_datetime(series[mask], errors="coerce", format="mixed", dayfirst=dayfirst)
+    return parsed.dt.strftime("%Y-%m-%d")
+
+
+def normalize_chunk(df, column_map=None):
+    """Rename, validate and normalize one chunk; returns (clean frame, rejected row count)."""
+    df = df.rename(columns=lambda c: str(c).strip().lower().replace(" ", "_"))
+    if column_map:
+        df = df.rename(columns=column_map)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    out = pd.DataFrame(index=df.index)
+    for column in RECORD_COLUMNS:
+        if column not in df.columns:
+            out[column] = None
+        elif column in DATE_COLUMNS:
+            out[column] = _normalize_dates(df[column])
+        else:
+            values = df[column].astype("string").str.strip()
+            out[column] = values.mask(values == "")
+
+    valid = out[REQUIRED_COLUMNS].notna().all(axis=1)
+    out = out[valid]
+    # Last occurrence wins, matching what the upsert does across chunks
+    out = out.drop_duplicates(subset=["worker_id", "cert_type"], keep="last")
+    # Key order keeps the unique index's B-tree writes local
+    out = out.sort_values(["worker_id", "cert_type"])
+    out = out.astype(object).where(out.notna(), None)
+    return out, int((~valid).sum())
+
+
+def import_training_records(file_name, db_path="data/training.db", chunk_size=50000, column_map=None,
+                            sheet_name=None, on_progress=None):
+    """Stream an HR export (CSV/Excel) into training_records, upserting on (worker_id, cert_type).
+
+    Each chunk is validated in vectorized form and written with executemany inside its own
+    transaction; store listeners (e.g. the expiry calendar) see every chunk.
+    `on_progress` receives the running totals after every chunk.
+    """
+    store = get_training_store(db_path)
+    start = time.perf_counter()
+    stats = {"rows_read": 0, "rows_upserted": 0, "rows_rejected": 0, "chunks": 0}
+
+    for chunk in iter_data(file_name, chunk_size=chunk_size, sheet_name=sheet_name, dtype=str):
+        stats["rows_read"] += len(chunk)
+        clean, rejected = normalize_chunk(chunk, column_map)
+        stats["rows_rejected"] += rejected
+        stats["rows_upserted"] += store.upsert(list(clean.itertuples(index=False, name=None)))
+        stats["chunks"] += 1
+        elapsed = time.perf_counter() - start
+        stats["elapsed_sec"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["rows_read"] / elapsed) if elapsed else None
+        if on_progress:
+            on_progress(dict(stats))
+    return stats
@@ -0,0 +1,259 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.logger import logger
+
+LANGUAGES = [
+    "French",
+    "Spanish",
+    "Arabic",
+    "Hausa (Nigeria)",
+    "Yoruba (Nigeria)",
+    "Swahili (East Africa)",
+    "Zulu (South Africa)",
+    "Igbo (Nigeria)",
+    "Portuguese (Mozambique, Angola)",
+    "Amharic (Ethiopia)",
+]
+
+TM_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS translation_memory (
+        segment TEXT,
+        language TEXT,
+        model TEXT,
+        translation TEXT,
+        hits INTEGER DEFAULT 0,
+        created_at TEXT,
+        PRIMARY KEY (segment, language, model)
+    )
+"""
+
+# Rows of memories created before translations were keyed by model; they are kept under
+# this model name, which no LLM reports, so they are never served.
+UNKNOWN_MODEL = "unknown"
+
+_NUMBERED = re.compile(r"^\s*(\d+)[.)]\s*(.*)$")
+
+
+def normalize_segment(text):
+    """Translation-memory key: whitespace collapsed and case folded."""
+    return " ".join(str(text).split()).casefold()
+
+
+def model_name(llm):
+    """The name translations from `llm` are stored under in the translation memory."""
+    for attr in ("model", "model_name", "name"):
+        value = getattr(llm, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(llm).__name__
+
+
+def _is_stub_llm(llm):
+    # adk_local's SimpleLLM echoes the prompt back; its numbered lines are the source text
+    return type(llm).__name__ == "SimpleLLM" and type(llm).__module__ == "adk_local"
+
+
+class TranslationMemory:
+    """Translations per (normalized segment, language, model) in sqlite, shared by all agents."""
+
+    def __init__(self, db_path):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(translation_memory)")}
+            if columns and "model" not in columns:
+                self._add_model_key()
+            self.conn.execute(TM_SCHEMA)
+
+    def _add_model_key(self):
+        # The primary key gains `model`, which sqlite can only do by rebuilding the table
+        self.conn.execute("ALTER TABLE translation_memory RENAME TO translation_memory_unkeyed")
+        self.conn.execute(TM_SCHEMA)
+        moved = self.conn.execute(
+            "INSERT INTO translation_memory (segment, language, model, translation, hits, created_at) "
+            "SELECT segment, language, ?, translation, hits, created_at FROM translation_memory_unkeyed",
+            (UNKNOWN_MODEL,)
+        ).rowcount
+        self.conn.execute("DROP TABLE translation_memory_unkeyed")
+        logger.warning(f"Translation memory: {moved} translations from before model keys are kept as "
+                       f"model {UNKNOWN_MODEL!r} and will not be reused")
+
+    def lookup(self, segments, language, model):
+        """{segment: translation} for the normalized segments `model` already translated."""
+        found = {}
+        segments = list(segments)
+        with self._lock, self.conn:
+            for i in range(0, len(segments), 500):
+                batch = segments[i:i + 500]
+                marks = ", ".join("?" * len(batch))
+                found.update(self.conn.execute(
+                    f"SELECT segment, translation FROM translation_memory "
+                    f"WHERE language = ? AND model = ? AND segment IN ({marks})", [language, model] + batch
+                ).fetchall())
+                self.conn.execute(
+                    f"UPDATE translation_memory SET hits = hits + 1 "
+                    f"WHERE language = ? AND model = ? AND segment IN ({marks})", [language, model] + batch
+                )
+        return found
+
+    def store(self, translations, language, model):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO translation_memory "
+                "(segment, language, model, translation, hits, created_at) VALUES (?, ?, ?, ?, 0, ?)",
+                [(segment, language, model, text, now) for segment, text in translations.items()]
+            )
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory(os.getenv("TRANSLATION_MEMORY_PATH", "data/translation_memory.db"))
+        return _memory
+
+
+def make_batches(segments, max_chars=2000, max_segments=40):
+    """Split segments into prompt-sized batches by total characters and count."""
+    batches, batch, size = [], [], 0
+    for segment in segments:
+        if batch and (size + len(segment) > max_chars or len(batch) >= max_segments):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(segment)
+        size += len(segment)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def batch_prompt(segments, language):
+    lines = "\n".join(f"{i}. {segment}" for i, segment in enumerate(segments, 1))
+    return (
+        "You are a professional translator specializing in critical construction and field operations "
+        "instructions, ensuring clarity, accuracy, and tone suitable for workers on construction sites. "
+        f"Translate each numbered line into {language}. Reply with exactly {len(segments)} lines, "
+        "keeping the same numbers and order, and nothing else.\n\n"
+        f"{lines}"
+    )
+
+
+def parse_numbered(text, expected):
+    """Translations by line number, or None when the reply does not line up with the request."""
+    found = {}
+    for line in text.splitlines():
+        match = _NUMBERED.match(line)
+        if match:
+            found[int(match.group(1))] = match.group(2).strip()
+    if sorted(found) != list(range(1, expected + 1)):
+        return None
+    return [found[i] for i in range(1, expected + 1)]
+
+
+def _usable(source, text):
+    # An empty line or the source echoed back (some models and stubs repeat the prompt)
+    # is not a translation and must not reach the memory
+    if not text or normalize_segment(text) == normalize_segment(source):
+        return None
+    return text
+
+
+async def _translate_batch(llm, texts, language):
+    # Returns (translations in input order, prompts used); None marks a segment the model
+    # gave no usable line for. Unparsed replies may be error messages and are never kept.
+    try:
+        result = await llm.complete(batch_prompt(texts, language))
+    except Exception:
+        return [None] * len(texts), 1  # the call itself failed; per-segment retries would too
+    parsed = parse_numbered(result.text, len(texts))
+    if parsed is not None:
+        return [_usable(source, text) for source, text in zip(texts, parsed)], 1
+    # The model merged or dropped lines: retry one segment at a time
+    singles = await asyncio.gather(*(llm.complete(batch_prompt([t], language)) for t in texts),
+                                   return_exceptions=True)
+    out = []
+    for source, reply in zip(texts, singles):
+        parsed = None if isinstance(reply, Exception) else parse_numbered(reply.text, 1)
+        out.append(_usable(source, parsed[0]) if parsed else None)
+    return out, 1 + len(texts)
+
+
+async def translate_segments(segments, languages=None, llm=None, memory=None,
+                             max_chars=2000, max_segments=40, concurrency=8):
+    """Translate segments into each language, through the translation memory.
+
+    Segments are normalized and deduplicated first; only memory misses are sent to the
+    model, in numbered batches bounded by characters and count. Languages (and batches
+    within them) run concurrently, up to `concurrency` prompts in flight.
+    Returns ({language: {normalized segment: translation}}, stats). Segments the model
+    did not translate (including replies that just repeat the source) are left out of
+    the result and the memory, counted as "failed" and listed per language under
+    stats["untranslated"]; the next call retries them. Memory rows are keyed by
+    model_name(llm), so one model's output is never served as another's.
+    Without an LLM, or with adk_local's echoing stub, stub translations are returned
+    and nothing is stored.
+    """
+    languages = languages or LANGUAGES
+    memory = memory or get_translation_memory()
+    if llm is not None and _is_stub_llm(llm):
+        llm = None
+    model = model_name(llm) if llm is not None else None
+    # Normalized key -> first spelling seen; the model gets the original casing
+    originals = {}
+    for segment in segments:
+        if str(segment).strip():
+            originals.setdefault(normalize_segment(segment), " ".join(str(segment).split()))
+    unique = list(originals)
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"segments": len(segments), "unique_segments": len(unique), "languages": len(languages),
+             "hits": 0, "misses": 0, "failed": 0, "prompts": 0}
+
+    async def run_batch(batch, language):
+        async with semaphore:
+            translated, prompts = await _translate_batch(llm, [originals[k] for k in batch], language)
+        return dict(zip(batch, translated)), prompts
+
+    async def one_language(language):
+        if llm is None:
+            stats["misses"] += len(unique)
+            return language, {s: f"[Stub] {language}: {originals[s]}" for s in unique}
+        known = memory.lookup(unique, language, model)
+        misses = [s for s in unique if s not in known]
+        stats["hits"] += len(known)
+        stats["misses"] += len(misses)
+        if not misses:
+            return language, known
+        results = await asyncio.gather(*(run_batch(b, language)
+                                         for b in make_batches(misses, max_chars, max_segments)))
+        fresh, failed = {}, []
+        for translated, prompts in results:
+            for segment, text in translated.items():
+                if text is None:
+                    failed.append(originals[segment])
+                else:
+                    fresh[segment] = text
+            stats["prompts"] += prompts
+        if failed:
+            stats["failed"] += len(failed)
+            stats.setdefault("untranslated", {})[language] = failed
+        if fresh:
+            memory.store(fresh, language, model)
+        return language, {**known, **fresh}
+
+    translations = dict(await asyncio.gather(*(one_language(lang) for lang in languages)))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+    return translations, stats
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def iter_sampled_frames(path, sample_fps=1.0):
+    """Yield (frame_index, timestamp_sec, BGR frame) at roughly `sample_fps` from a local video."""
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        step = max(int(round(fps / sample_fps)), 1) if sample_fps else 1
+        index = 0
+        while True:
+            # grab() skips decoding of frames we do not sample; retrieve() decodes only the kept ones
+            if not capture.grab():
+                break
+            if index % step == 0:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                yield index, index / fps, frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def video_info(path):
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        return {
+            "fps": round(fps, 3),
+            "frame_count": frames,
+            "duration_sec": round(frames / fps, 2) if fps else None,
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        capture.release()
+
+
+def dhash(frame, hash_size=8):
+    """64-bit difference hash of a BGR or grayscale frame."""
+    import cv2
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return np.packbits(bits).view(">u8")[0].astype(np.uint64)
+
+
+class FrameDeduplicator:
+    """Remembers the hashes of analyzed frames and flags new frames that add nothing."""
+
+    def __init__(self, max_distance=6):
+        self.max_distance = max_distance
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def is_new(self, frame_hash):
+        if self._hashes.size:
+            distances = np.bitwise_count(self._hashes ^ np.uint64(frame_hash))
+            if int(distances.min()) <= self.max_distance:
+                return False
+        return True
+
+    def add(self, frame_hash):
+        self._hashes = np.append(self._hashes, np.uint64(frame_hash))
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class ViolationTracker:
+    """Merges per-frame detections of the same label and overlapping boxes into tracks."""
+
+    def __init__(self, iou_threshold=0.3, max_gap_sec=3.0):
+        self.iou_threshold = iou_threshold
+        self.max_gap_sec = max_gap_sec
+        self.tracks = []
+
+    def update(self, frame_index, timestamp, detections):
+        for det in detections:
+            best, best_iou = None, self.iou_threshold
+            for track in self.tracks:
+                if track["label"] != det["label"] or track["last_frame"] == frame_index \
+                        or timestamp - track["last_seen_sec"] > self.max_gap_sec:
+                    continue
+                overlap = iou(track["bbox"], det["bbox"]) if det["bbox"] and track["bbox"] else 0.0
+                if overlap >= best_iou:
+                    best, best_iou = track, overlap
+            if best is None:
+                self.tracks.append({
+                    "track_id": len(self.tracks) + 1,
+                    "label": det["label"],
+                    "bbox": det["bbox"],
+                    "first_frame": frame_index,
+                    "last_frame": frame_index,
+                    "first_seen_sec": round(timestamp, 2),
+                    "last_seen_sec": round(timestamp, 2),
+                    "max_confidence": det["confidence"],
+                    "hits": 1,
+                    "recommendation": det.get("recommendation"),
+                })
+            else:
+                best.update({
+                    "bbox": det["bbox"],
+                    "last_frame": frame_index,
+                    "last_seen_sec": round(timestamp, 2),
+                    "max_confidence": max(best["max_confidence"], det["confidence"]),
+                    "hits": best["hits"] + 1,
+                })